@@ -0,0 +1,15 @@
+"""
+Package for Picgenius benchmarks.
+Benchmarks have the concern to measure the performance of the rendering stages.
+UpscaleBenchmark imports torch, it's only imported when accessed.
+"""
+from .stages import StageBenchmark, StageBenchmarkResult, StageComparison
+from .synthetic import SyntheticAssets
+
+
+def __getattr__(name: str):
+    if name in ("UpscaleBenchmark", "UpscaleBenchmarkResult"):
+        from . import upscale  # pylint: disable=import-outside-toplevel
+
+        return getattr(upscale, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
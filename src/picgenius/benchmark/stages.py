@@ -0,0 +1,243 @@
+"""Module for StageBenchmark class declaration."""
+import json
+import os
+import platform
+import shutil
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, ClassVar, Iterable, Optional
+
+from PIL import Image
+
+from picgenius import __version__
+from picgenius import processing as im
+from picgenius.controller import Controller
+from picgenius.models import Design
+from picgenius.renderers import DesignRenderer, TemplateRenderer, VideoRenderer
+from .synthetic import SyntheticAssets
+
+
+@dataclass
+class StageBenchmarkResult:
+    """Timings of a renderer stage."""
+
+    name: str
+    best_seconds: float
+    mean_seconds: float
+    runs: int
+
+    def format(self) -> str:
+        """Returns a line of the benchmark table."""
+        return (
+            f"{self.name:<24} {self.best_seconds * 1000:>10.2f}ms "
+            f"{self.mean_seconds * 1000:>10.2f}ms {self.runs:>5}"
+        )
+
+
+@dataclass
+class StageComparison:
+    """Timing of a stage compared to its baseline."""
+
+    name: str
+    baseline_seconds: float
+    current_seconds: float
+    threshold: float
+
+    @property
+    def ratio(self) -> float:
+        """Returns the current time over the baseline time."""
+        return self.current_seconds / self.baseline_seconds
+
+    @property
+    def is_regression(self) -> bool:
+        """Returns True if the stage is slower than the baseline beyond threshold."""
+        return self.ratio > 1 + self.threshold
+
+    def format(self) -> str:
+        """Returns a line of the comparison table."""
+        flag = "REGRESSION" if self.is_regression else ""
+        return (
+            f"{self.name:<24} {self.baseline_seconds * 1000:>10.2f}ms "
+            f"{self.current_seconds * 1000:>10.2f}ms {self.ratio:>7.2f}x {flag}"
+        )
+
+
+class StageBenchmark:
+    """
+    Time every renderer stage on synthetic assets.
+
+    Designs, a template, a font and a product type are generated
+    deterministically in workdir, at the given size. Each stage runs once to
+    warm up, then repeat times, and its best and mean durations are kept.
+    The video stage times the frames generation only, and the end to end
+    controller run skips the video, so that no encoder is needed.
+    """
+
+    TABLE_HEADER: ClassVar[str] = f"{'stage':<24} {'best':>12} {'mean':>12} {'runs':>5}"
+    COMPARISON_HEADER: ClassVar[
+        str
+    ] = f"{'stage':<24} {'baseline':>12} {'current':>12} {'ratio':>8}"
+    DEFAULT_THRESHOLD: ClassVar[float] = 0.1
+
+    workdir: str
+    size: int
+    repeat: int
+    assets: SyntheticAssets
+
+    def __init__(self, workdir: str, size: int = 1024, repeat: int = 5, seed: int = 0):
+        """
+        Args:
+            workdir (str): Directory of the synthetic assets and outputs.
+            size (int): Width of the designs and templates, in pixels.
+            repeat (int): Timed runs of each stage.
+            seed (int): Seed of the synthetic assets.
+        """
+        self.workdir = workdir
+        self.size = size
+        self.repeat = repeat
+        self.assets = SyntheticAssets(os.path.join(workdir, "assets"), size, seed)
+
+    def get_stages(self) -> dict[str, Callable[[], object]]:
+        """Returns the benchmarked stages, by name."""
+        product_type = self.assets.create_product_type()
+        template = product_type.templates[0]
+        designs = [
+            Design(
+                self.assets.create_design(
+                    os.path.join(self.assets.directory, f"design-{index}.png"), index
+                )
+            )
+            for index in range(2)
+        ]
+        image = designs[0].load_image()
+        template_image = Image.open(template.path).convert("RGBA")
+        watermark = template.watermarks[0]
+        font = im.load_font(watermark.font_path, self.size // 16)
+        perspective_element = template.elements[1]
+        video_settings = product_type.video_settings
+        video_image = im.resize_and_crop(image, *video_settings.format)
+        designs_root = self.assets.create_designs_tree(products_count=4)
+        end_to_end_type = self.assets.create_product_type(video=False)
+        output_dir = os.path.join(self.workdir, "products")
+
+        # pylint: disable=protected-access
+        def find_font_size():
+            # The font sizes are cached by text and width
+            im._find_font_size.cache_clear()
+            return im.find_font_size(watermark.text, watermark.font_path, self.size)
+
+        def perspective():
+            return TemplateRenderer._fit_design_in_transformed_template(
+                template_image.copy(), image, perspective_element.position
+            )
+
+        def controller():
+            end_to_end_controller = Controller(designs_root, end_to_end_type)
+            end_to_end_controller.logger.setLevel("WARNING")
+            end_to_end_controller.generate_products_all_assets(output_dir, force=True)
+
+        return {
+            "resize_and_crop": lambda: im.resize_and_crop(
+                image, self.size * 3 // 4, self.size * 3 // 4
+            ),
+            "crop_to_ratio": lambda: im.crop_to_ratio(image, (1, 1)),
+            "zoom": lambda: im.zoom(image, 1.5),
+            "find_font_size": find_font_size,
+            "paste_text_on_image": lambda: im.paste_text_on_image(
+                template_image, watermark.text, font, (10, 10)
+            ),
+            "perspective": perspective,
+            "generate_template": lambda: TemplateRenderer.generate_template(
+                template, designs
+            ),
+            "formats": lambda: list(
+                DesignRenderer.generate_design_formats(designs[0], product_type.formats)
+            ),
+            "video_frames": lambda: VideoRenderer.generate_video_frames(
+                video_image, video_settings.frames, video_settings.step
+            ),
+            "controller": controller,
+        }
+
+    def run(self, names: Optional[Iterable[str]] = None) -> list[StageBenchmarkResult]:
+        """Time the stages, or only the named ones."""
+        stages = self.get_stages()
+        if names is not None:
+            names = list(names)
+            unknown_names = set(names) - set(stages)
+            if unknown_names:
+                raise ValueError(
+                    f"Unknown stages {sorted(unknown_names)}: {list(stages)}"
+                )
+            stages = {name: stages[name] for name in names}
+
+        results = []
+        try:
+            for name, stage in stages.items():
+                stage()
+                durations = []
+                for _ in range(self.repeat):
+                    start = time.perf_counter()
+                    stage()
+                    durations.append(time.perf_counter() - start)
+                results.append(
+                    StageBenchmarkResult(
+                        name=name,
+                        best_seconds=min(durations),
+                        mean_seconds=sum(durations) / len(durations),
+                        runs=len(durations),
+                    )
+                )
+        finally:
+            shutil.rmtree(os.path.join(self.workdir, "products"), ignore_errors=True)
+        return results
+
+    def to_json(self, results: list[StageBenchmarkResult]) -> dict:
+        """Returns the results with the run environment."""
+        return {
+            "picgenius": __version__,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "size": self.size,
+            "repeat": self.repeat,
+            "results": [asdict(result) for result in results],
+        }
+
+    def save(self, results: list[StageBenchmarkResult], path: str):
+        """Save the results as JSON."""
+        with open(path, "w", encoding="utf-8") as results_file:
+            json.dump(self.to_json(results), results_file, indent=2)
+
+    @staticmethod
+    def load(path: str) -> dict[str, float]:
+        """Returns the best seconds of each stage of a saved results file."""
+        with open(path, "r", encoding="utf-8") as results_file:
+            data = json.load(results_file)
+        return {result["name"]: result["best_seconds"] for result in data["results"]}
+
+    @staticmethod
+    def compare(
+        baseline: dict[str, float],
+        current: dict[str, float],
+        threshold: float = DEFAULT_THRESHOLD,
+    ) -> list[StageComparison]:
+        """Returns the comparison of the stages timed in both runs."""
+        return [
+            StageComparison(name, baseline[name], seconds, threshold)
+            for name, seconds in current.items()
+            if name in baseline
+        ]
+
+    @staticmethod
+    def format_results(results: list[StageBenchmarkResult]) -> str:
+        """Returns the results as a table."""
+        lines = [StageBenchmark.TABLE_HEADER]
+        lines.extend(result.format() for result in results)
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_comparisons(comparisons: list[StageComparison]) -> str:
+        """Returns the comparisons as a table."""
+        lines = [StageBenchmark.COMPARISON_HEADER]
+        lines.extend(comparison.format() for comparison in comparisons)
+        return "\n".join(lines)
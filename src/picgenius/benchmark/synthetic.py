@@ -0,0 +1,149 @@
+"""Module for SyntheticAssets class declaration."""
+import os
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from picgenius.models import (
+    Format,
+    ProductType,
+    Template,
+    TemplateElement,
+    VideoSettings,
+    Watermark,
+)
+
+
+class SyntheticAssets:
+    """
+    Designs, templates, fonts and product types generated deterministically,
+    without any network access, for the benchmarks.
+
+    Assets are written once in a <size>-<seed> subdirectory of directory, so
+    that runs with other sizes or seeds never reuse them.
+    """
+
+    FONT_FILENAME = "synthetic.ttf"
+
+    directory: str
+    size: int
+    seed: int
+
+    def __init__(self, directory: str, size: int = 1024, seed: int = 0):
+        """
+        Args:
+            directory (str): Root directory of the assets.
+            size (int): Width of the designs and templates, in pixels.
+            seed (int): Seed of the generated pixels.
+        """
+        self.directory = os.path.join(directory, f"{size}-{seed}")
+        self.size = size
+        self.seed = seed
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def create_image(size: tuple[int, int] = (256, 256), seed: int = 0) -> Image.Image:
+        """Returns a deterministic image mixing flat areas, gradients and noise."""
+        width, height = size
+        rng = np.random.default_rng(seed)
+        gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+        pixels = np.repeat(np.repeat(gradient, height, axis=0), 3, axis=2)
+        pixels[: height // 2] += rng.normal(0, 24, (height // 2, width, 3))
+        image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+        draw = ImageDraw.Draw(image)
+        for index in range(8):
+            left = int(rng.integers(0, width))
+            top = int(rng.integers(height // 2, height))
+            color = tuple(int(value) for value in rng.integers(0, 256, 3))
+            draw.ellipse((left, top, left + width // 8, top + height // 8), fill=color)
+            draw.line((0, index * height // 8, width, height - 1), fill=color, width=2)
+        return image
+
+    def create_design(self, path: str, seed: int = 0) -> str:
+        """Write a design of 4:5 ratio, returns its path."""
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            size = (self.size, self.size * 5 // 4)
+            self.create_image(size, self.seed + seed).save(path)
+        return path
+
+    def create_template_image(self) -> str:
+        """Write a RGBA template background, returns its path."""
+        path = os.path.join(self.directory, "template.png")
+        if not os.path.exists(path):
+            image = self.create_image((self.size, self.size), self.seed + 1000)
+            image.convert("RGBA").save(path)
+        return path
+
+    def create_font(self) -> str:
+        """Write the font embedded in Pillow, returns its path."""
+        path = os.path.join(self.directory, self.FONT_FILENAME)
+        if not os.path.exists(path):
+            font = ImageFont.load_default(size=10)
+            if not isinstance(font, ImageFont.FreeTypeFont):
+                raise RuntimeError("Pillow is built without FreeType support.")
+            with open(path, "wb") as font_file:
+                font_file.write(font.font_bytes)
+        return path
+
+    def create_designs_tree(self, products_count: int, designs_count: int = 2) -> str:
+        """Write products_count products of designs_count designs, returns the root."""
+        root = os.path.join(self.directory, "designs")
+        for product_index in range(products_count):
+            for design_index in range(designs_count):
+                path = os.path.join(
+                    root, f"product-{product_index}", f"design-{design_index}.png"
+                )
+                self.create_design(path, product_index * designs_count + design_index)
+        return root
+
+    def create_template(self) -> Template:
+        """Returns a template with a plain and a perspective element, and a watermark."""
+        size = self.size
+        return Template(
+            path=self.create_template_image(),
+            elements=[
+                TemplateElement(
+                    position=(size // 16, size // 8),
+                    size=(size * 3 // 8, size * 15 // 32),
+                ),
+                TemplateElement(
+                    position=(
+                        (size * 9 // 16, size // 8),
+                        (size * 15 // 16, size // 6),
+                        (size * 9 // 16, size * 3 // 4),
+                        (size * 15 // 16, size * 2 // 3),
+                    )
+                ),
+            ],
+            watermarks=[self.create_watermark()],
+        )
+
+    def create_watermark(self) -> Watermark:
+        """Returns a watermark using the synthetic font."""
+        return Watermark(
+            font_path=self.create_font(),
+            text="PICGENIUS BENCHMARK",
+            color=(255, 255, 255, 120),
+            width="60%",
+        )
+
+    def create_product_type(self, video: bool = True) -> ProductType:
+        """Returns a product type of two designs, one template and two formats."""
+        video_settings = None
+        if video:
+            video_settings = VideoSettings(
+                movement="zoom_in",
+                # The zoom crops one pixel per side and frame
+                frames=max(1, min(20, self.size // 8)),
+                format=(self.size // 2, self.size // 2),
+                watermarks=[self.create_watermark()],
+            )
+        ppi = max(1, self.size // 16)
+        return ProductType(
+            designs_count=2,
+            templates=[self.create_template()],
+            formats=[Format(ppi, (8, 10)), Format(ppi, (16, 20))],
+            video_settings=video_settings,
+        )
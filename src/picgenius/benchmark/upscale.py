@@ -0,0 +1,124 @@
+"""Module for UpscaleBenchmark class declaration."""
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+import torch
+
+from picgenius import processing as im
+from picgenius.upscaling.runtime import InferenceSettings, Upscaler
+from .synthetic import SyntheticAssets
+
+
+@dataclass
+class UpscaleBenchmarkResult:
+    """Timings and accuracy of an upscale with given inference settings."""
+
+    settings: InferenceSettings
+    best_seconds: float
+    mean_seconds: float
+    psnr: Optional[float] = None
+
+    def format(self, reference_seconds: float) -> str:
+        """Returns a line of the benchmark table."""
+        psnr = "ref" if self.psnr is None else f"{self.psnr:.1f} dB"
+        speedup = reference_seconds / self.best_seconds
+        return (
+            f"{self.settings.label:<28} {self.best_seconds:>8.3f}s "
+            f"{self.mean_seconds:>8.3f}s {speedup:>7.2f}x {psnr:>10}"
+        )
+
+
+class UpscaleBenchmark:
+    """Compare the speed and accuracy of inference settings on a fixed image."""
+
+    TABLE_HEADER = (
+        f"{'settings':<28} {'best':>9} {'mean':>9} {'speedup':>8} {'psnr':>10}"
+    )
+
+    image: Image.Image
+    scale: int
+    repeat: int
+
+    def __init__(self, image: Image.Image, scale: int = 4, repeat: int = 3):
+        self.image = image.convert("RGB")
+        self.scale = scale
+        self.repeat = repeat
+
+    @staticmethod
+    def create_image(size: tuple[int, int] = (256, 256), seed: int = 0) -> Image.Image:
+        """Returns a deterministic image mixing flat areas, gradients and noise."""
+        return SyntheticAssets.create_image(size, seed)
+
+    @staticmethod
+    def get_default_settings(threads: Optional[int] = None) -> list[InferenceSettings]:
+        """Returns the CPU modes compared by default, the reference first."""
+        return [
+            InferenceSettings(intra_op_threads=threads),
+            InferenceSettings(channels_last=True, intra_op_threads=threads),
+            InferenceSettings(
+                precision="bf16", channels_last=True, intra_op_threads=threads
+            ),
+        ]
+
+    def run(
+        self, settings_list: list[InferenceSettings], cpu: bool = True
+    ) -> list[UpscaleBenchmarkResult]:
+        """
+        Upscale the image with each settings, the first being the reference
+        whose output the other outputs are compared to.
+        """
+        results = []
+        reference = None
+        initial_threads = torch.get_num_threads()
+        for settings in settings_list:
+            # Warm up: loads the model, and lets torch pick its kernels
+            upscaled_image = im.upscale_image(
+                self.image, self.scale, cpu=cpu, settings=settings
+            )
+
+            durations = []
+            for _ in range(self.repeat):
+                start = time.perf_counter()
+                upscaled_image = im.upscale_image(
+                    self.image, self.scale, cpu=cpu, settings=settings
+                )
+                durations.append(time.perf_counter() - start)
+
+            pixels = np.asarray(upscaled_image, dtype=np.float32)
+            psnr = None
+            if reference is None:
+                reference = pixels
+            else:
+                psnr = self.compute_psnr(reference, pixels)
+
+            results.append(
+                UpscaleBenchmarkResult(
+                    settings=settings,
+                    best_seconds=min(durations),
+                    mean_seconds=sum(durations) / len(durations),
+                    psnr=psnr,
+                )
+            )
+            Upscaler.clear()
+            torch.set_num_threads(initial_threads)
+        return results
+
+    @staticmethod
+    def compute_psnr(reference: np.ndarray, pixels: np.ndarray) -> float:
+        """Returns the peak signal to noise ratio of pixels against reference."""
+        mse = float(np.mean((reference - pixels) ** 2))
+        if mse == 0:
+            return float("inf")
+        return 10 * np.log10(255**2 / mse)
+
+    @staticmethod
+    def format_results(results: list[UpscaleBenchmarkResult]) -> str:
+        """Returns the results as a table."""
+        reference_seconds = results[0].best_seconds
+        lines = [UpscaleBenchmark.TABLE_HEADER]
+        lines.extend(result.format(reference_seconds) for result in results)
+        return "\n".join(lines)
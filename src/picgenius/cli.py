@@ -3,12 +3,31 @@ from dataclasses import dataclass, field
 from typing import Optional
 
 import click
+from PIL import Image
 
 from picgenius import __version__
+from picgenius.benchmark import StageBenchmark
 from picgenius.config import ConfigLoader
 from picgenius.models import ProductType
 from picgenius.controller import Controller
+from picgenius.discovery import DirectoryIndex
 from picgenius.logger import PicGeniusLogger
+from picgenius.memory import MemoryProfiler
+from picgenius.preflight import Preflight, PreflightError
+from picgenius.profiling import ProductProfiler
+from picgenius.progress import ProgressReporter
+from picgenius.renderers import DesignRenderer, TemplateRenderer
+from picgenius.server import RenderServer
+from picgenius.sharding import Shard, Sharding, WorkClaims
+from picgenius.tracing import Tracer
+from picgenius.watcher import DesignWatcher
+from picgenius.upscaling import (
+    InferenceSettings,
+    TiledUpscaler,
+    UpscaleCache,
+    UpscalePlan,
+    WeightsLoader,
+)
 
 
 @dataclass
@@ -16,10 +35,13 @@ class ContextObject:
     """Context object to pass between commands."""
 
     config: ConfigLoader
+    index: DirectoryIndex
     product_types: dict[str, ProductType] = field(init=False)
     selected_product_type: ProductType = field(init=False)
     design_path: str = field(init=False)
     output_dir: str = field(init=False)
+    sharding: Optional[Sharding] = field(init=False, default=None)
+    preflight: Optional[Preflight] = field(init=False, default=None)
 
     def load_product_types(self):
         """Load product types from config file."""
@@ -29,24 +51,239 @@ class ContextObject:
 @click.group
 @click.option("--config", "-f", "config_path", default="./picgenius.yml", type=str)
 @click.option("--debug", is_flag=True)
+@click.option(
+    "--no-config-cache",
+    is_flag=True,
+    help="Parse the config file instead of loading its compiled cache, "
+    "stored in $XDG_CACHE_HOME/picgenius/config.",
+)
+@click.option(
+    "--index",
+    "index_path",
+    type=str,
+    help="Design directories index file, updated incrementally between runs.",
+)
+@click.option(
+    "--trace",
+    "trace_path",
+    type=str,
+    help="Record the spans of the rendering stages, saved as a Chrome trace JSON.",
+)
+@click.option(
+    "--memory-profile",
+    "memory_profile_path",
+    type=str,
+    help="Sample the memory of the rendering stages, the report saved as JSON.",
+)
+@click.option(
+    "--tracemalloc",
+    "use_tracemalloc",
+    is_flag=True,
+    help="Also trace the Python allocations of the memory profile, much slower.",
+)
 @click.pass_context
-def picgenius(ctx, config_path: str, debug: bool):
+def picgenius(
+    ctx,
+    config_path: str,
+    debug: bool,
+    no_config_cache: bool,
+    index_path: Optional[str],
+    trace_path: Optional[str],
+    memory_profile_path: Optional[str],
+    use_tracemalloc: bool,
+):
     """Root group for pic genius commands."""
     logger = PicGeniusLogger()
     if debug:
         logger.setLevel("DEBUG")
 
-    config_loader = ConfigLoader(config_path)
-    context_object = ContextObject(config_loader)
+    if memory_profile_path is not None:
+        Tracer.start(MemoryProfiler(use_tracemalloc=use_tracemalloc))
+    elif trace_path is not None:
+        Tracer.start()
+    if Tracer.active is not None:
+        ctx.call_on_close(lambda: _stop_tracing(trace_path, memory_profile_path))
+
+    config_cache_dir = None if no_config_cache else ConfigLoader.DEFAULT_CACHE_DIR
+    config_loader = ConfigLoader(config_path, config_cache_dir)
+    context_object = ContextObject(config_loader, DirectoryIndex(index_path))
     ctx.obj = context_object
 
 
+def _stop_tracing(trace_path: Optional[str], memory_profile_path: Optional[str]):
+    """Stop tracing, and save the recorded spans and memory profile."""
+    logger = PicGeniusLogger()
+    tracer = Tracer.stop()
+    if trace_path is not None:
+        tracer.save(trace_path)
+        logger.info("Trace saved to %s", trace_path)
+    if memory_profile_path is not None:
+        print(tracer.format_report())
+        tracer.save_report(memory_profile_path)
+        logger.info("Memory profile saved to %s", memory_profile_path)
+
+
+def _parse_scales(value: str) -> list[int]:
+    """Parse comma separated upscale scales."""
+    try:
+        scales = [int(scale) for scale in value.split(",") if scale.strip()]
+    except ValueError as exc:
+        raise click.BadParameter(f"Invalid scales: {value}") from exc
+
+    for scale in scales:
+        if scale not in UpscalePlan.AVAILABLE_SCALES:
+            raise click.BadParameter(
+                f"Scale {scale} isn't available: {UpscalePlan.AVAILABLE_SCALES}"
+            )
+    if not scales:
+        raise click.BadParameter("At least one scale must be given.")
+    return scales
+
+
+def _parse_shard(value: Optional[str]) -> Optional[Shard]:
+    """Parse a i/N shard."""
+    if value is None:
+        return None
+    try:
+        return Shard.parse(value)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc)) from exc
+
+
+def _create_sharding(
+    shard: Optional[Shard], steal: Optional[str], output_dir: str
+) -> Optional[Sharding]:
+    """Returns the sharding of the sharding options."""
+    if shard is None:
+        if steal is not None:
+            raise click.BadParameter("--steal requires --shard.")
+        return None
+
+    claims = None
+    if steal is not None:
+        claims = WorkClaims(Sharding.get_claims_dir(output_dir, steal))
+    return Sharding(shard, claims)
+
+
+def sharding_options(function):
+    """Decorate a command with the options to split the work across nodes."""
+    function = click.option(
+        "--steal",
+        "steal",
+        type=str,
+        metavar="RUN_NAME",
+        help=(
+            "Claim work through lock files in the output directory, and steal "
+            "the leftovers of the other shards. Every node of a run must give "
+            "the same RUN_NAME, and a new run a new one."
+        ),
+    )(function)
+    function = click.option(
+        "--shard",
+        type=str,
+        metavar="i/N",
+        callback=lambda ctx, param, value: _parse_shard(value),
+        help="Only process the i-th of N shards, assigned by a stable path hash.",
+    )(function)
+    return function
+
+
 @picgenius.command()
 def version():
     """Print the version of picgenius."""
     print(f"Picgenius version: {__version__}")
 
 
+@picgenius.command
+@click.pass_obj
+def check(context_object: ContextObject):
+    """Check the assets of every product type, without rendering."""
+    context_object.load_product_types()
+
+    preflight = Preflight()
+    issues = []
+    for name, product_type in context_object.product_types.items():
+        try:
+            preflight.check(product_type, name)
+        except PreflightError as exc:
+            issues.extend(exc.issues)
+    if issues:
+        raise PreflightError(issues)
+    print(f"{len(context_object.product_types)} product types checked.")
+
+
+def inference_options(function):
+    """Decorate a command with the ESRGAN inference options."""
+    function = click.option(
+        "--tile-size",
+        type=int,
+        help=(
+            "Size of the tiles distributed to the workers. "
+            f"Default: {InferenceSettings.DEFAULT_TILE_SIZE}"
+        ),
+    )(function)
+    function = click.option(
+        "--workers",
+        type=int,
+        help=(
+            "Number of worker processes upscaling the tiles of each image on CPU, "
+            "each with --threads threads. Default: no workers"
+        ),
+    )(function)
+    function = click.option(
+        "--flat-resample",
+        type=click.Choice(list(TiledUpscaler.RESAMPLE_FILTERS)),
+        default="bicubic",
+        help="Interpolation of the flat tiles. Default: bicubic",
+    )(function)
+    function = click.option(
+        "--skip-flat-tiles",
+        "flat_tile_tolerance",
+        type=float,
+        help=(
+            "Interpolate instead of inferring the tiles whose pixels standard "
+            "deviation is below this tolerance, in 0-255 levels, e.g. 2."
+        ),
+    )(function)
+    function = click.option(
+        "--download-weights",
+        is_flag=True,
+        type=bool,
+        default=False,
+        help="Allow the download of missing ESRGAN weights.",
+    )(function)
+    function = click.option(
+        "--models-dir",
+        type=str,
+        default=WeightsLoader.DEFAULT_DIRECTORY,
+        help=f"ESRGAN weights directory. Default: {WeightsLoader.DEFAULT_DIRECTORY}",
+    )(function)
+    function = click.option(
+        "--interop-threads",
+        type=int,
+        help="Number of torch inter-op threads. Default: torch default",
+    )(function)
+    function = click.option(
+        "--threads",
+        type=int,
+        help="Number of torch intra-op threads. Default: torch default",
+    )(function)
+    function = click.option(
+        "--channels-last",
+        is_flag=True,
+        type=bool,
+        default=False,
+        help="Use channels last memory format, usually faster on CPU.",
+    )(function)
+    function = click.option(
+        "--precision",
+        type=click.Choice(InferenceSettings.AVAILABLE_PRECISIONS),
+        default="fp32",
+        help="Inference precision, bf16 is faster on recent CPUs. Default: fp32",
+    )(function)
+    return function
+
+
 @picgenius.command
 @click.argument("design_path", type=str)
 @click.option(
@@ -59,10 +296,14 @@ def version():
 @click.option(
     "--scale",
     "-s",
-    "scale",
-    type=int,
-    default=2,
-    help="Available scale multiplicators: 2, 4, 8, 10, 12 and 16. Default: 2",
+    "scales",
+    type=str,
+    default="2",
+    callback=lambda ctx, param, value: _parse_scales(value),
+    help=(
+        "Available scale multiplicators: 2, 4, 8, 10, 12 and 16. "
+        "Several comma separated scales can be given, e.g. 4,10,12. Default: 2"
+    ),
 )
 @click.option(
     "--cpu",
@@ -74,7 +315,10 @@ def version():
 @click.option(
     "--suffix",
     type=str,
-    help="Suffix to be added to output file names. Default: -x{scale}-upscaled",
+    help=(
+        "Suffix to be added to output file names, {scale} is replaced by the scale. "
+        "Default: -x{scale}-upscaled"
+    ),
 )
 @click.option(
     "--extension",
@@ -82,18 +326,76 @@ def version():
     default="jpg",
     help="Extension to be set to output file names. Default: jpg",
 )
+@click.option(
+    "--cache-dir",
+    type=str,
+    default=UpscaleCache.DEFAULT_DIRECTORY,
+    help=f"Upscale cache directory. Default: {UpscaleCache.DEFAULT_DIRECTORY}",
+)
+@click.option(
+    "--cache-size",
+    type=int,
+    default=UpscaleCache.DEFAULT_MAX_SIZE // 1024**2,
+    help="Maximum size of the upscale cache, in MB. Default: 2048",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    type=bool,
+    default=False,
+    help="Disable the upscale cache.",
+)
+@inference_options
+@sharding_options
+@click.pass_obj
 def upscale(
+    context_object: ContextObject,
     design_path: str,
     output_dir: str,
-    scale: int,
+    scales: list[int],
     cpu: bool,
     suffix: str,
     extension: str,
+    cache_dir: str,
+    cache_size: int,
+    no_cache: bool,
+    precision: str,
+    channels_last: bool,
+    threads: Optional[int],
+    interop_threads: Optional[int],
+    models_dir: str,
+    download_weights: bool,
+    flat_tile_tolerance: Optional[float],
+    flat_resample: str,
+    workers: Optional[int],
+    tile_size: Optional[int],
+    shard: Optional[Shard],
+    steal: Optional[str],
 ):
     """Upscale given design."""
-    controller = Controller(design_path)
+    InferenceSettings.default = InferenceSettings(
+        precision=precision,
+        channels_last=channels_last,
+        intra_op_threads=threads,
+        inter_op_threads=interop_threads,
+        flat_tile_tolerance=flat_tile_tolerance,
+        flat_tile_resample=flat_resample,
+        workers=workers,
+        tile_size=tile_size,
+    )
+    WeightsLoader.default = WeightsLoader(models_dir, download=download_weights)
+    if no_cache:
+        DesignRenderer.upscale_cache = None
+    else:
+        DesignRenderer.upscale_cache = UpscaleCache(cache_dir, cache_size * 1024**2)
+
+    controller = Controller(
+        design_path,
+        index=context_object.index,
+        sharding=_create_sharding(shard, steal, output_dir),
+    )
     controller.upscale_designs(
-        output_dir, scale, cpu=cpu, suffix=suffix, file_extension=extension
+        output_dir, scales, cpu=cpu, suffix=suffix, file_extension=extension
     )
 
 
@@ -107,12 +409,21 @@ def upscale(
     default="./products",
     help="Output directory. Default: ./products",
 )
+@click.option(
+    "--skip-preflight",
+    is_flag=True,
+    help="Don't check the product type assets before rendering.",
+)
+@sharding_options
 @click.pass_obj
 def product(
     context_object: ContextObject,
     product_type: str,
     design_path: str,
     output_dir: str,
+    skip_preflight: bool,
+    shard: Optional[Shard],
+    steal: Optional[str],
 ):
     """Generate specified product visuals."""
     context_object.load_product_types()
@@ -120,23 +431,196 @@ def product(
     selected_product_type = context_object.product_types.get(product_type)
     if selected_product_type is None:
         raise ValueError(f'Product type "{product_type}" doesn\'t exist.')
+    if not skip_preflight:
+        context_object.preflight = Preflight()
+        context_object.preflight.check(selected_product_type, product_type)
+        TemplateRenderer.add_sources(context_object.preflight.sources.values())
 
     context_object.selected_product_type = selected_product_type
     context_object.design_path = design_path
     context_object.output_dir = output_dir
+    context_object.sharding = _create_sharding(shard, steal, output_dir)
+
+
+def auto_upscale_options(function):
+    """Decorate a command with the formats auto upscale options."""
+    function = click.option(
+        "--cpu",
+        is_flag=True,
+        type=bool,
+        default=False,
+        help="Force usage of CPU to auto upscale.",
+    )(function)
+    function = click.option(
+        "--auto-upscale",
+        is_flag=True,
+        type=bool,
+        default=False,
+        help="Upscale designs at the minimum scale needed by the largest format.",
+    )(function)
+    return function
+
+
+def force_option(function):
+    """Decorate a command with the option to regenerate up to date outputs."""
+    return click.option(
+        "--force",
+        is_flag=True,
+        type=bool,
+        default=False,
+        help="Regenerate outputs even if their inputs didn't change.",
+    )(function)
+
+
+def dry_run_option(function):
+    """Decorate a command with the option to print its execution plan only."""
+    return click.option(
+        "--dry-run",
+        is_flag=True,
+        type=bool,
+        default=False,
+        help="Print the execution plan and its estimated cost, without rendering.",
+    )(function)
+
+
+def profile_options(function):
+    """Decorate a command with the options to profile the products generation."""
+    function = click.option(
+        "--profile-top",
+        type=int,
+        default=ProductProfiler.DEFAULT_TOP,
+        help=(
+            "Number of functions of the logged profile summary. "
+            f"Default: {ProductProfiler.DEFAULT_TOP}"
+        ),
+    )(function)
+    function = click.option(
+        "--profile-product",
+        "profile_products",
+        type=str,
+        multiple=True,
+        help="Only generate and profile the given product, can be repeated.",
+    )(function)
+    function = click.option(
+        "--profile",
+        "profile_dir",
+        type=str,
+        help="Profile each product with cProfile, saved as DIR/<product>.prof.",
+    )(function)
+    return function
+
+
+def _create_profiler(
+    profile_dir: Optional[str], profile_products: tuple[str, ...], profile_top: int
+) -> Optional[ProductProfiler]:
+    """Returns the products profiler of the options, if profiling."""
+    if profile_dir is None:
+        if profile_products:
+            raise click.BadParameter(
+                "--profile-product requires --profile.", param_hint="--profile-product"
+            )
+        return None
+    return ProductProfiler(profile_dir, profile_products or None, profile_top)
+
+
+def print_execution_plan(
+    context_object: ContextObject,
+    assets: tuple[str, ...],
+    max_threads: int = 1,
+    profiler: Optional[ProductProfiler] = None,
+):
+    """Print the estimated cost of generating the assets of the products."""
+    sharding = context_object.sharding
+    if sharding is not None:
+        # Only estimate the shard of this node, without claiming its work
+        sharding = Sharding(sharding.shard)
+    if profiler is not None:
+        # Profiled products are generated one at a time
+        max_threads = 1
+    controller = Controller(
+        context_object.design_path,
+        product_type=context_object.selected_product_type,
+        index=context_object.index,
+        sharding=sharding,
+        profiler=profiler,
+    )
+    plan = controller.estimate_plan(
+        context_object.output_dir, assets, max_threads=max_threads
+    )
+    print(plan.format())
 
 
 @product.command
+@auto_upscale_options
+@force_option
+@dry_run_option
+@profile_options
+@click.option(
+    "--resume",
+    is_flag=True,
+    type=bool,
+    default=False,
+    help="Only run the tasks left unfinished or failed by the previous run.",
+)
+@click.option(
+    "--progress",
+    "progress_mode",
+    type=click.Choice(["auto", *ProgressReporter.MODES]),
+    help=(
+        "Report the progress and ETA to stderr, as a progress bar or JSON lines. "
+        "auto renders a bar on a TTY, JSON lines otherwise."
+    ),
+)
+@click.option(
+    "--progress-interval",
+    type=float,
+    help="Seconds between two progress reports. Default: 0.5 for bar, 10 for json",
+)
 @click.pass_obj
-def generate_all(context_object: ContextObject):
+def generate_all(
+    context_object: ContextObject,
+    auto_upscale: bool,
+    cpu: bool,
+    force: bool,
+    dry_run: bool,
+    resume: bool,
+    progress_mode: Optional[str],
+    progress_interval: Optional[float],
+    profile_dir: Optional[str],
+    profile_products: tuple[str, ...],
+    profile_top: int,
+):
     """Generate all medias of product type."""
+    profiler = _create_profiler(profile_dir, profile_products, profile_top)
+    if dry_run:
+        print_execution_plan(
+            context_object,
+            Controller.PRODUCT_ASSETS,
+            max_threads=Controller.DEFAULT_MAX_THREADS,
+            profiler=profiler,
+        )
+        return
 
     product_type = context_object.selected_product_type
     design_path = context_object.design_path
     output_dir = context_object.output_dir
 
-    controller = Controller(design_path, product_type=product_type)
-    controller.generate_products_all_assets(output_dir)
+    controller = Controller(
+        design_path,
+        product_type=product_type,
+        index=context_object.index,
+        sharding=context_object.sharding,
+        profiler=profiler,
+    )
+    if progress_mode is not None:
+        mode = ProgressReporter.get_mode(progress_mode)
+        ProgressReporter.start(ProgressReporter(mode, progress_interval))
+    try:
+        controller.generate_products_all_assets(
+            output_dir, auto_upscale=auto_upscale, cpu=cpu, force=force, resume=resume
+        )
+    finally:
+        ProgressReporter.stop()
 
 
 @product.command
@@ -146,39 +630,334 @@ def generate_all(context_object: ContextObject):
     "template_name",
     help="Optional template name.",
 )
+@force_option
+@dry_run_option
+@profile_options
 @click.pass_obj
-def generate_templates(context_object: ContextObject, template_name: Optional[str]):
+def generate_templates(
+    context_object: ContextObject,
+    template_name: Optional[str],
+    force: bool,
+    dry_run: bool,
+    profile_dir: Optional[str],
+    profile_products: tuple[str, ...],
+    profile_top: int,
+):
     """Generate templates of product type."""
+    profiler = _create_profiler(profile_dir, profile_products, profile_top)
+    if dry_run:
+        print_execution_plan(context_object, ("templates",), profiler=profiler)
+        return
 
     product_type = context_object.selected_product_type
     design_path = context_object.design_path
     output_dir = context_object.output_dir
 
-    controller = Controller(design_path, product_type=product_type)
-    controller.generate_products_templates(output_dir, template_name)
+    controller = Controller(
+        design_path,
+        product_type=product_type,
+        index=context_object.index,
+        sharding=context_object.sharding,
+        profiler=profiler,
+    )
+    controller.generate_products_templates(output_dir, template_name, force=force)
 
 
 @product.command
+@force_option
+@dry_run_option
+@profile_options
 @click.pass_obj
-def generate_video(context_object: ContextObject):
+def generate_video(
+    context_object: ContextObject,
+    force: bool,
+    dry_run: bool,
+    profile_dir: Optional[str],
+    profile_products: tuple[str, ...],
+    profile_top: int,
+):
     """Generate templates of product type."""
+    profiler = _create_profiler(profile_dir, profile_products, profile_top)
+    if dry_run:
+        print_execution_plan(context_object, ("video",), profiler=profiler)
+        return
 
     product_type = context_object.selected_product_type
     design_path = context_object.design_path
     output_dir = context_object.output_dir
 
-    controller = Controller(design_path, product_type=product_type)
-    controller.generate_products_video(output_dir)
+    controller = Controller(
+        design_path,
+        product_type=product_type,
+        index=context_object.index,
+        sharding=context_object.sharding,
+        profiler=profiler,
+    )
+    controller.generate_products_video(output_dir, force=force)
 
 
 @product.command
+@auto_upscale_options
+@force_option
+@dry_run_option
+@profile_options
 @click.pass_obj
-def format_designs(context_object: ContextObject):
+def format_designs(
+    context_object: ContextObject,
+    auto_upscale: bool,
+    cpu: bool,
+    force: bool,
+    dry_run: bool,
+    profile_dir: Optional[str],
+    profile_products: tuple[str, ...],
+    profile_top: int,
+):
     """Generate templates of product type."""
+    profiler = _create_profiler(profile_dir, profile_products, profile_top)
+    if dry_run:
+        print_execution_plan(context_object, ("formats",), profiler=profiler)
+        return
 
     product_type = context_object.selected_product_type
     design_path = context_object.design_path
     output_dir = context_object.output_dir
 
-    controller = Controller(design_path, product_type=product_type)
-    controller.generate_products_formatted_designs(output_dir)
+    controller = Controller(
+        design_path,
+        product_type=product_type,
+        index=context_object.index,
+        sharding=context_object.sharding,
+        profiler=profiler,
+    )
+    controller.generate_products_formatted_designs(
+        output_dir, auto_upscale=auto_upscale, cpu=cpu, force=force
+    )
+
+
+@product.command
+@auto_upscale_options
+@click.option(
+    "--interval",
+    type=float,
+    default=DesignWatcher.DEFAULT_INTERVAL,
+    help=f"Seconds between two polls. Default: {DesignWatcher.DEFAULT_INTERVAL}",
+)
+@click.option(
+    "--settle",
+    type=float,
+    default=DesignWatcher.DEFAULT_SETTLE,
+    help=(
+        "Seconds without modification before a product is rendered. "
+        f"Default: {DesignWatcher.DEFAULT_SETTLE}"
+    ),
+)
+@click.option(
+    "--initial",
+    is_flag=True,
+    type=bool,
+    default=False,
+    help="Also render the products already present at start.",
+)
+@click.pass_obj
+def watch(
+    context_object: ContextObject,
+    auto_upscale: bool,
+    cpu: bool,
+    interval: float,
+    settle: float,
+    initial: bool,
+):
+    """Render new or changed products as soon as they land in the design path."""
+    controller = Controller(
+        context_object.design_path,
+        product_type=context_object.selected_product_type,
+        index=context_object.index,
+    )
+    watcher = DesignWatcher(
+        controller,
+        context_object.output_dir,
+        interval=interval,
+        settle=settle,
+        auto_upscale=auto_upscale,
+        cpu=cpu,
+    )
+    try:
+        watcher.run(initial=initial)
+    except KeyboardInterrupt:
+        pass
+
+
+@picgenius.command
+@click.option(
+    "--socket",
+    "socket_path",
+    default=RenderServer.DEFAULT_SOCKET_PATH,
+    type=str,
+    help=f"Unix socket to listen on. Default: {RenderServer.DEFAULT_SOCKET_PATH}",
+)
+@click.option(
+    "--http",
+    "use_http",
+    is_flag=True,
+    help="Listen on host:port instead of the Unix socket.",
+)
+@click.option(
+    "--host", default="127.0.0.1", help="Host to listen on. Default: 127.0.0.1"
+)
+@click.option("--port", "-p", default=8765, type=int, help="Default: 8765")
+@click.option(
+    "--token",
+    type=str,
+    envvar="PICGENIUS_TOKEN",
+    help="Bearer token of the API, or $PICGENIUS_TOKEN. Default: generated",
+)
+@click.option(
+    "--workers",
+    default=1,
+    type=int,
+    help="Number of jobs rendered at once. Default: 1",
+)
+@click.pass_obj
+def serve(
+    context_object: ContextObject,
+    socket_path: str,
+    use_http: bool,
+    host: str,
+    port: int,
+    token: Optional[str],
+    workers: int,
+):
+    """Render the jobs submitted to a local HTTP API, keeping caches warm."""
+    logger = PicGeniusLogger()
+    render_server = RenderServer(
+        context_object.config, context_object.index, workers, token
+    )
+    render_server.get_product_types()
+
+    if use_http:
+        http_server = render_server.create_http_server(host, port)
+        logger.info("Serving on http://%s:%d", host, port)
+    else:
+        http_server = render_server.create_unix_server(socket_path)
+        logger.info("Serving on %s", socket_path)
+    if token is None:
+        logger.info("API token: %s", render_server.token)
+
+    try:
+        http_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        http_server.server_close()
+        render_server.close()
+
+
+@picgenius.group
+def benchmark():
+    """Measure the performance of picgenius stages."""
+
+
+@benchmark.command(name="upscale")
+@click.argument("image_path", type=str, required=False)
+@click.option(
+    "--scale",
+    "-s",
+    "scale",
+    type=click.Choice(["2", "4", "8"]),
+    default="4",
+    help="ESRGAN model scale. Default: 4",
+)
+@click.option(
+    "--size",
+    type=int,
+    default=256,
+    help="Size of the generated image when no image is given. Default: 256",
+)
+@click.option("--repeat", type=int, default=3, help="Runs per mode. Default: 3")
+@click.option(
+    "--threads",
+    type=int,
+    help="Number of torch intra-op threads. Default: torch default",
+)
+def benchmark_upscale(
+    image_path: Optional[str],
+    scale: str,
+    size: int,
+    repeat: int,
+    threads: Optional[int],
+):
+    """Compare the CPU inference modes of the upscaler on a fixed image."""
+    from picgenius.benchmark import (  # pylint: disable=import-outside-toplevel
+        UpscaleBenchmark,
+    )
+
+    if image_path is None:
+        image = UpscaleBenchmark.create_image((size, size))
+    else:
+        image = Image.open(image_path)
+
+    upscale_benchmark = UpscaleBenchmark(image, int(scale), repeat=repeat)
+    results = upscale_benchmark.run(UpscaleBenchmark.get_default_settings(threads))
+    print(UpscaleBenchmark.format_results(results))
+
+
+@benchmark.command(name="stages")
+@click.option(
+    "--size",
+    type=int,
+    default=1024,
+    help="Width of the synthetic designs and templates. Default: 1024",
+)
+@click.option("--repeat", type=int, default=5, help="Runs per stage. Default: 5")
+@click.option(
+    "--stage",
+    "stage_names",
+    type=str,
+    multiple=True,
+    help="Only run the given stage, can be repeated. Default: all stages",
+)
+@click.option(
+    "--workdir",
+    type=str,
+    default="./.picgenius-cache/benchmark",
+    help="Directory of the synthetic assets. Default: ./.picgenius-cache/benchmark",
+)
+@click.option("--output", "-o", "output_path", type=str, help="JSON results file.")
+def benchmark_stages(
+    size: int,
+    repeat: int,
+    stage_names: tuple[str, ...],
+    workdir: str,
+    output_path: Optional[str],
+):
+    """Time every renderer stage on synthetic designs and templates."""
+    stage_benchmark = StageBenchmark(workdir, size=size, repeat=repeat)
+    results = stage_benchmark.run(stage_names or None)
+    print(StageBenchmark.format_results(results))
+    if output_path is not None:
+        stage_benchmark.save(results, output_path)
+
+
+@benchmark.command(name="compare")
+@click.argument("baseline_path", type=str)
+@click.argument("current_path", type=str)
+@click.option(
+    "--threshold",
+    type=float,
+    default=StageBenchmark.DEFAULT_THRESHOLD,
+    help=(
+        "Slowdown over the baseline flagged as a regression. "
+        f"Default: {StageBenchmark.DEFAULT_THRESHOLD}"
+    ),
+)
+@click.pass_context
+def benchmark_compare(ctx, baseline_path: str, current_path: str, threshold: float):
+    """Compare stages results to a baseline, exits with 1 on regressions."""
+    comparisons = StageBenchmark.compare(
+        StageBenchmark.load(baseline_path),
+        StageBenchmark.load(current_path),
+        threshold,
+    )
+    print(StageBenchmark.format_comparisons(comparisons))
+    if any(comparison.is_regression for comparison in comparisons):
+        ctx.exit(1)
@@ -1 +1,2 @@
 from .loader import ConfigLoader
+from .product_types import ProductTypes
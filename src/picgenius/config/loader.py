@@ -1,7 +1,13 @@
 """Module"""
+import hashlib
+import os
+import pickle
+import uuid
+from typing import Optional
 
 import yaml
 
+from picgenius import __version__
 from picgenius.models import (
     Format,
     Watermark,
@@ -12,36 +18,97 @@ from picgenius.models import (
     ProductType,
     Textbox,
 )
+from .product_types import ProductTypes
+
+# The C loader is much faster, but only available if PyYAML was built with libyaml
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 class ConfigLoader:
     """Load the given config file."""
 
+    # The user cache directory, shared by every working directory
+    DEFAULT_CACHE_DIR = os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+        "picgenius",
+        "config",
+    )
+    CACHE_VERSION = 1
+
     file_path: str
+    cache_dir: Optional[str]
     global_config: dict
-    product_types: dict[str, ProductType]
+    product_types: ProductTypes
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, cache_dir: Optional[str] = DEFAULT_CACHE_DIR):
         self.file_path = file_path
+        self.cache_dir = cache_dir
         self.global_config = {}
-        self.product_types = {}
+        self.product_types = ProductTypes({})
+
+    def load(self) -> ProductTypes:
+        """
+        Instanciate the product types from the config file.
+
+        The parsed and validated config is cached compiled in cache_dir, keyed
+        by the hash of the config file, and each product type is only
+        instanciated when it's requested.
+        """
+        with open(self.file_path, "rb") as config_file:
+            content = config_file.read()
+
+        cache_path = self.get_cache_path(content)
+        if cache_path is not None and self._load_cache(cache_path):
+            return self.product_types
 
-    def load(self) -> dict[str, ProductType]:
-        """Instanciate all the product types from the config file."""
-        with open(self.file_path, "r", encoding="ascii") as config_file:
-            config_data = yaml.safe_load(config_file)
+        config_data = yaml.load(content.decode("ascii"), Loader=YAML_LOADER)
 
         global_data = config_data.get("global", {})
         self._load_global(global_data)
 
         product_types_data = config_data.get("product_types", {})
-        for product_type_name, product_type_data in product_types_data.items():
-            self.product_types[product_type_name] = self._create_product_type(
-                product_type_data
-            )
+        self.product_types = ProductTypes.compile(
+            {
+                product_type_name: self._create_product_type(product_type_data)
+                for product_type_name, product_type_data in product_types_data.items()
+            }
+        )
 
+        if cache_path is not None:
+            self._save_cache(cache_path)
         return self.product_types
 
+    def get_cache_path(self, content: bytes) -> Optional[str]:
+        """Returns the path of the compiled config, or None without cache_dir."""
+        if self.cache_dir is None:
+            return None
+        sha256 = hashlib.sha256(content)
+        sha256.update(f"{__version__}:{self.CACHE_VERSION}".encode("ascii"))
+        return os.path.join(self.cache_dir, f"{sha256.hexdigest()}.pickle")
+
+    def _load_cache(self, cache_path: str) -> bool:
+        """Load the compiled config, returns False if it's missing or invalid."""
+        try:
+            with open(cache_path, "rb") as cache_file:
+                global_config, compiled = pickle.load(cache_file)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return False
+        self.global_config = global_config
+        self.product_types = ProductTypes(compiled)
+        return True
+
+    def _save_cache(self, cache_path: str):
+        """Save the compiled config atomically, ignoring an unwritable cache_dir."""
+        data = (self.global_config, self.product_types.compiled)
+        tmp_path = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "wb") as cache_file:
+                pickle.dump(data, cache_file, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+
     def _load_global(self, global_data: dict):
         formats_data = global_data.get("formats")
         if formats_data is not None:
@@ -0,0 +1,48 @@
+"""Module for ProductTypes class declaration."""
+import pickle
+import threading
+from collections.abc import Mapping
+from typing import Iterator
+
+from picgenius.models import ProductType
+
+
+class ProductTypes(Mapping):
+    """
+    Product types of a config, compiled to pickles and only unpickled when
+    requested, so that a command doesn't pay for the product types it doesn't
+    render.
+    """
+
+    compiled: dict[str, bytes]
+
+    def __init__(self, compiled: dict[str, bytes]):
+        self.compiled = compiled
+        self._product_types: dict[str, ProductType] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def compile(product_types: dict[str, ProductType]) -> "ProductTypes":
+        """Returns the product types compiled."""
+        compiled = ProductTypes(
+            {
+                name: pickle.dumps(product_type, pickle.HIGHEST_PROTOCOL)
+                for name, product_type in product_types.items()
+            }
+        )
+        compiled._product_types.update(product_types)
+        return compiled
+
+    def __getitem__(self, name: str) -> ProductType:
+        with self._lock:
+            product_type = self._product_types.get(name)
+            if product_type is None:
+                product_type = pickle.loads(self.compiled[name])
+                self._product_types[name] = product_type
+            return product_type
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.compiled)
+
+    def __len__(self) -> int:
+        return len(self.compiled)
@@ -1,58 +1,207 @@
 """Module for Controller class declaration."""
 import os
-from typing import Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from contextlib import contextmanager
+from typing import Callable, ClassVar, Generator, Iterable, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 
 from picgenius.models import ProductType, Product, Design
 from picgenius.renderers import ProductRenderer, DesignRenderer
 from picgenius.logger import PicGeniusLogger
-from picgenius import utils
+from picgenius.upscaling import UpscaleCache
+from picgenius.discovery import DirectoryIndex
+from picgenius.estimator import CostEstimator, ExecutionPlan
+from picgenius.manifest import BuildManifest
+from picgenius.ledger import JobLedger
+from picgenius.profiling import ProductProfiler
+from picgenius.progress import ProgressReporter
+from picgenius.sharding import Sharding
+from picgenius.tracing import Tracer
 
 
 class Controller:
     """Its responsibility is to call the different renderers, with according attributes."""
 
+    PRODUCT_ASSETS: ClassVar[tuple[str, ...]] = ("formats", "templates", "video")
+    DEFAULT_MAX_THREADS: ClassVar[int] = 4
+
     design_path: str
     product_type: Optional[ProductType]
-    products: list[Product]
+    index: DirectoryIndex
+    sharding: Optional[Sharding]
+    profiler: Optional[ProductProfiler]
 
     def __init__(
-        self, design_path: str, product_type: Optional[ProductType] = None
+        self,
+        design_path: str,
+        product_type: Optional[ProductType] = None,
+        index: Optional[DirectoryIndex] = None,
+        sharding: Optional[Sharding] = None,
+        profiler: Optional[ProductProfiler] = None,
     ) -> None:
         self.design_path = design_path
         self.product_type = product_type
-        if product_type is None:
-            self.products = []
-        else:
-            self.products = Controller.create_products(product_type, design_path)
+        self.index = index if index is not None else DirectoryIndex()
+        self.sharding = sharding
+        self.profiler = profiler
         self.logger = PicGeniusLogger()
 
+    @property
+    def products(self) -> list[Product]:
+        """Products of design_path, all discovered at once, see iter_products."""
+        return list(self.iter_products())
+
+    def iter_products(self) -> Generator[Product, None, None]:
+        """
+        Yield the products of design_path as soon as they are discovered.
+
+        Folders whose designs count doesn't match the product type are
+        logged and skipped. With sharding, only the products of this node
+        are yielded, and with a profiler, only the profiled products.
+        """
+        if self.product_type is None:
+            return
+
+        designs_count = self.product_type.designs_count
+        for product_path in self._select(
+            lambda: self.index.iter_product_paths(designs_count, self.design_path)
+        ):
+            try:
+                product = Product(
+                    self.product_type,
+                    product_path,
+                    self.index.get_image_paths(product_path),
+                )
+            except (AttributeError, OSError) as exc:
+                self.logger.warning("(%s) Skipped: %s", product_path, exc)
+                continue
+            if self.profiler is not None and not self.profiler.selects(product.name):
+                continue
+            yield product
+
+        self.index.save(root=self.design_path)
+
+    def get_work_key(self, path: str) -> str:
+        """Returns the key of a product or design path, the same on every node."""
+        return os.path.relpath(path, self.design_path).replace(os.sep, "/")
+
+    def _select(
+        self, iter_paths: Callable[[], Iterable[str]]
+    ) -> Generator[str, None, None]:
+        """Yield the paths assigned to this node."""
+        if self.sharding is None:
+            yield from iter_paths()
+        else:
+            yield from self.sharding.select(iter_paths, self.get_work_key)
+
+    def estimate_plan(
+        self,
+        output_dir: str,
+        assets: Iterable[str] = PRODUCT_ASSETS,
+        max_threads: int = 1,
+    ) -> ExecutionPlan:
+        """
+        Returns the estimated cost of generating the assets of the products,
+        without rendering anything.
+        """
+        estimator = CostEstimator(self.product_type, output_dir, max_threads)
+        return estimator.estimate(self.iter_products(), assets)
+
     @staticmethod
-    def create_products(product_type: ProductType, design_path: str) -> list[Product]:
+    def create_products(
+        product_type: ProductType,
+        design_path: str,
+        index: Optional[DirectoryIndex] = None,
+    ) -> list[Product]:
         """Instanciate all products according to the given type and path."""
+        if index is None:
+            index = DirectoryIndex()
 
-        designs_count = product_type.designs_count
-        return [
-            Product(product_type, product_path)
-            for product_path in utils.find_product_paths(designs_count, design_path)
-        ]
-
-    def generate_products_all_assets(self, output_dir: str, max_threads: int = 4):
-        """Create products from design_path, then generate all assets"""
-
-        with ThreadPoolExecutor(max_threads) as executor:
-            futures_to_products = {
-                executor.submit(
-                    self.process_product_generation, product, output_dir
-                ): product
-                for product in self.products
-            }
+        return list(Controller(design_path, product_type, index).iter_products())
 
-            for future in as_completed(futures_to_products):
+    def generate_products_all_assets(
+        self,
+        output_dir: str,
+        max_threads: int = DEFAULT_MAX_THREADS,
+        auto_upscale: bool = False,
+        cpu: bool = False,
+        force: bool = False,
+        resume: bool = False,
+    ):
+        """
+        Create products from design_path, then generate all assets.
+
+        Products are submitted as soon as they are discovered, until
+        2 * max_threads products are pending: max_threads being generated and
+        at most max_threads queued, the discovery then waiting for one to end.
+        Outputs whose inputs didn't change since the last build are skipped,
+        unless force is given. Every (product, asset) task is recorded in a
+        JobLedger, and with resume, the tasks done by the previous run are
+        skipped. With a profiler, products are generated one at a time.
+        """
+        if self.profiler is not None:
+            # The threads of a product must not overlap with other products
+            max_threads = 1
+
+        manifest = BuildManifest(output_dir, force=force)
+        ledger_name = None if self.sharding is None else self.sharding.shard.label
+        ledger = JobLedger(output_dir, resume=resume, name=ledger_name)
+        with ledger, self._saving(manifest), ThreadPoolExecutor(
+            max_threads
+        ) as executor:
+            pending_futures = set()
+            for product in self.iter_products():
+                # max_threads products running, and as many queued
+                if len(pending_futures) >= 2 * max_threads:
+                    done_futures, pending_futures = wait(
+                        pending_futures, return_when=FIRST_COMPLETED
+                    )
+                    for future in done_futures:
+                        future.result()
+
+                ProgressReporter.record(ProgressReporter.PRODUCT_FOUND)
+                for asset in self.PRODUCT_ASSETS:
+                    ProgressReporter.record(ProgressReporter.QUEUED, asset)
+                    if not ledger.is_done(product.design_path, asset):
+                        ledger.mark_pending(product.design_path, asset)
+                pending_futures.add(
+                    executor.submit(
+                        self.process_product_generation,
+                        product,
+                        output_dir,
+                        auto_upscale=auto_upscale,
+                        cpu=cpu,
+                        manifest=manifest,
+                        ledger=ledger,
+                    )
+                )
+            ProgressReporter.record(ProgressReporter.DISCOVERY_DONE)
+
+            for future in as_completed(pending_futures):
                 future.result()
 
-    def process_product_generation(self, product: Product, output_dir: str):
-        """Process the generation of all assets for the given product."""
+            failed_count = ledger.count_by_status().get(JobLedger.FAILED, 0)
+            if failed_count:
+                raise RuntimeError(
+                    f"{failed_count} tasks failed, see {ledger.path}. "
+                    "Rerun with --resume to retry only the unfinished tasks."
+                )
+
+    def process_product_generation(
+        self,
+        product: Product,
+        output_dir: str,
+        auto_upscale: bool = False,
+        cpu: bool = False,
+        manifest: Optional[BuildManifest] = None,
+        ledger: Optional[JobLedger] = None,
+    ):
+        """
+        Process the generation of all assets for the given product.
+
+        With a ledger, the assets already done are skipped, and a failed asset
+        is recorded instead of interrupting the other ones.
+        """
 
         self.logger.info("(%s) Start product all assets generation", product.name)
         self.logger.info(
@@ -62,58 +211,132 @@ class Controller:
         )
         count_formats = len(product.type.formats)
         count_templates = len(product.type.templates)
-        ProductRenderer.generate_formatted_designs(
-            product, output_dir, max_threads=count_formats
-        )
-        ProductRenderer.generate_templates(
-            product, output_dir, max_threads=count_templates
-        )
-        ProductRenderer.generate_video(product, output_dir)
+        tasks = {
+            "formats": lambda: ProductRenderer.generate_formatted_designs(
+                product,
+                output_dir,
+                max_threads=count_formats,
+                auto_upscale=auto_upscale,
+                cpu=cpu,
+                manifest=manifest,
+            ),
+            "templates": lambda: ProductRenderer.generate_templates(
+                product, output_dir, max_threads=count_templates, manifest=manifest
+            ),
+            "video": lambda: ProductRenderer.generate_video(
+                product, output_dir, manifest=manifest
+            ),
+        }
+        with self._profiling(product):
+            for asset, task in tasks.items():
+                ProgressReporter.record(ProgressReporter.STARTED, asset)
+                with Tracer.span(asset, product=product.name):
+                    if ledger is None:
+                        task()
+                    else:
+                        self._run_ledger_task(ledger, product, asset, task)
+                ProgressReporter.record(ProgressReporter.DONE, asset)
+        ProgressReporter.record(ProgressReporter.PRODUCT_DONE)
         self.logger.info("(%s) All assets generation done", product.name)
         self.logger.info("")
 
+    def _run_ledger_task(
+        self, ledger: JobLedger, product: Product, asset: str, task: Callable
+    ):
+        """Run the task unless it's already done, recording it in the ledger."""
+        if ledger.is_done(product.design_path, asset):
+            self.logger.info("(%s) %s already done", product.name, asset)
+            return
+
+        ledger.mark_running(product.design_path, asset)
+        start = time.perf_counter()
+        try:
+            task()
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            duration = time.perf_counter() - start
+            ledger.mark_failed(product.design_path, asset, duration, repr(exc))
+            self.logger.error("(%s) %s generation failed: %r", product.name, asset, exc)
+            return
+        ledger.mark_done(product.design_path, asset, time.perf_counter() - start)
+
     def generate_products_templates(
-        self, output_dir: str, template_name: Optional[str] = None
+        self,
+        output_dir: str,
+        template_name: Optional[str] = None,
+        force: bool = False,
     ):
         """Generate products templates."""
         # TODO: Add generation of specified template
-        self.log_found_products(self.products)
-        for product in self.products:
-            self.logger.info("(%s) Start templates generation", product.name)
-            self.logger.info(
-                "(%s) output directory: %s",
-                product.name,
-                os.path.join(output_dir, product.name),
-            )
-            ProductRenderer.generate_templates(product, output_dir)
-            self.logger.info("(%s) Templates generation done", product.name)
-            self.logger.info("")
+        manifest = BuildManifest(output_dir, force=force)
+        with self._saving(manifest):
+            for product in self.iter_products():
+                self.log_found_product(product)
+                self.logger.info("(%s) Start templates generation", product.name)
+                self.logger.info(
+                    "(%s) output directory: %s",
+                    product.name,
+                    os.path.join(output_dir, product.name),
+                )
+                with self._profiling(product), Tracer.span(
+                    "templates", product=product.name
+                ):
+                    ProductRenderer.generate_templates(
+                        product, output_dir, manifest=manifest
+                    )
+                self.logger.info("(%s) Templates generation done", product.name)
+                self.logger.info("")
 
-    def generate_products_video(self, output_dir: str):
+    def generate_products_video(self, output_dir: str, force: bool = False):
         """Generate products video."""
-        for product in self.products:
-            self.logger.info("(%s) Start video generation", product.name)
-            self.logger.info(
-                "(%s) output directory: %s",
-                product.name,
-                os.path.join(output_dir, product.name),
-            )
-            ProductRenderer.generate_video(product, output_dir)
-            self.logger.info("(%s) Video generation done", product.name)
-            self.logger.info("")
+        manifest = BuildManifest(output_dir, force=force)
+        with self._saving(manifest):
+            for product in self.iter_products():
+                self.logger.info("(%s) Start video generation", product.name)
+                self.logger.info(
+                    "(%s) output directory: %s",
+                    product.name,
+                    os.path.join(output_dir, product.name),
+                )
+                with self._profiling(product), Tracer.span(
+                    "video", product=product.name
+                ):
+                    ProductRenderer.generate_video(
+                        product, output_dir, manifest=manifest
+                    )
+                self.logger.info("(%s) Video generation done", product.name)
+                self.logger.info("")
 
-    def generate_products_formatted_designs(self, output_dir: str):
+    def generate_products_formatted_designs(
+        self,
+        output_dir: str,
+        auto_upscale: bool = False,
+        cpu: bool = False,
+        force: bool = False,
+    ):
         """Generate products formatted designs."""
-        for product in self.products:
-            self.logger.info("(%s) Start formatted designs generation", product.name)
-            self.logger.info(
-                "(%s) output directory: %s",
-                product.name,
-                os.path.join(output_dir, product.name),
-            )
-            ProductRenderer.generate_formatted_designs(product, output_dir)
-            self.logger.info("(%s) Formatted designs generation done", product.name)
-            self.logger.info("")
+        manifest = BuildManifest(output_dir, force=force)
+        with self._saving(manifest):
+            for product in self.iter_products():
+                self.logger.info(
+                    "(%s) Start formatted designs generation", product.name
+                )
+                self.logger.info(
+                    "(%s) output directory: %s",
+                    product.name,
+                    os.path.join(output_dir, product.name),
+                )
+                with self._profiling(product), Tracer.span(
+                    "formats", product=product.name
+                ):
+                    ProductRenderer.generate_formatted_designs(
+                        product,
+                        output_dir,
+                        auto_upscale=auto_upscale,
+                        cpu=cpu,
+                        manifest=manifest,
+                    )
+                self.logger.info("(%s) Formatted designs generation done", product.name)
+                self.logger.info("")
 
     # TODO: add design upscaling for given product
     # def generate_product_upscaled_designs(self, output_dir: str, scale: int):
@@ -131,33 +354,90 @@ class Controller:
     def upscale_designs(
         self,
         output_dir: str,
-        scale: int,
+        scales: int | list[int],
         cpu: bool = False,
         suffix: Optional[str] = None,
         file_extension: str = "jpg",
     ):
-        """Upscale designs found in design_path."""
+        """
+        Upscale designs found in design_path at each of the given scales.
+
+        The suffix can contain a {scale} placeholder, which is required
+        when several scales are given. With sharding, only the designs of this
+        node are upscaled.
+        """
+        if isinstance(scales, int):
+            scales = [scales]
         if suffix is None:
-            suffix = f"-x{scale}-upscaled"
+            suffix = "-x{scale}-upscaled"
+        elif len(set(scales)) > 1 and "{scale}" not in suffix:
+            raise ValueError(
+                "suffix must contain {scale} when upscaling at several scales."
+            )
 
-        designs = [
-            Design(design_path)
-            for design_path in utils.find_image_file_paths(self.design_path)
-        ]
+        image_paths = self.index.get_image_paths(self.design_path)
+        self.index.save(root=self.design_path)
         os.makedirs(output_dir, exist_ok=True)
 
-        self.log_found_designs(designs)
-        for design in designs:
-            upscaled_path = os.path.join(
-                output_dir, f"{design.name}{suffix}.{file_extension}"
-            )
-            self.logger.info("(%s) Start x%d upscale", design.name, scale)
-            self.logger.info("(%s) output: %s", design.name, upscaled_path)
-            upscaled_design = DesignRenderer.upscale_design(design, scale, cpu=cpu)
-            upscaled_design.save(upscaled_path)
-            self.logger.info("(%s) x%s upscale done", design.name, scale)
+        cache = DesignRenderer.upscale_cache
+
+        self.log_found_designs([Design(image_path) for image_path in image_paths])
+        for design_path in self._select(lambda: image_paths):
+            design = Design(design_path)
+            upscaled_paths = {
+                scale: os.path.join(
+                    output_dir,
+                    f"{design.name}{suffix.format(scale=scale)}.{file_extension}",
+                )
+                for scale in scales
+            }
+            for scale, upscaled_path in upscaled_paths.items():
+                self.logger.info("(%s) Start x%d upscale", design.name, scale)
+                self.logger.info("(%s) output: %s", design.name, upscaled_path)
+
+            cache_keys = {}
+            if cache is not None:
+                content_hash = UpscaleCache.hash_file(design.path)
+                for scale, upscaled_path in list(upscaled_paths.items()):
+                    cache_keys[scale] = DesignRenderer.get_upscale_cache_key(
+                        design, scale, content_hash=content_hash
+                    )
+                    if cache.fetch(cache_keys[scale], file_extension, upscaled_path):
+                        self.logger.info(
+                            "(%s) x%s upscale cache hit", design.name, scale
+                        )
+                        del upscaled_paths[scale]
+
+            if upscaled_paths:
+                for scale, upscaled_design in DesignRenderer.upscale_design_scales(
+                    design, upscaled_paths, cpu=cpu, use_cache=False
+                ):
+                    upscaled_design.save(upscaled_paths[scale])
+                    if cache is not None:
+                        cache.store(
+                            cache_keys[scale], file_extension, upscaled_paths[scale]
+                        )
+                    self.logger.info("(%s) x%s upscale done", design.name, scale)
             self.logger.info("")
 
+    @staticmethod
+    @contextmanager
+    def _saving(manifest: BuildManifest):
+        """Save the manifest on exit, even if the build failed."""
+        try:
+            yield manifest
+        finally:
+            manifest.save()
+
+    @contextmanager
+    def _profiling(self, product: Product) -> Generator[None, None, None]:
+        """Profile the generation of the product, if a profiler is given."""
+        if self.profiler is None:
+            yield
+            return
+        with self.profiler.profile(product.name):
+            yield
+
     def log_found_designs(self, designs: list[Design]):
         """Log found designs."""
         self.logger.info("Found %d designs in %s", len(designs), self.design_path)
@@ -165,11 +445,9 @@ class Controller:
             self.logger.info("\t%s (%s)", design.path, design.name)
         self.logger.info("")
 
-    def log_found_products(self, products: list[Product]):
-        """Log found products."""
-        self.logger.info("Found %d products in %s", len(products), self.design_path)
-        for product in products:
-            self.logger.info("(%s)", product.name)
-            for design in product.designs:
-                self.logger.info("\t%s", design.path)
-            self.logger.info("")
+    def log_found_product(self, product: Product):
+        """Log a product, as soon as it's found."""
+        self.logger.info("(%s) Found in %s", product.name, product.design_path)
+        for design in product.designs:
+            self.logger.info("\t%s", design.path)
+        self.logger.info("")
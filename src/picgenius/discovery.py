@@ -0,0 +1,206 @@
+"""Module for DirectoryIndex class declaration."""
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import ClassVar, Generator, Optional
+
+from picgenius import utils
+from picgenius.logger import PicGeniusLogger
+
+
+@dataclass
+class DirectoryRecord:
+    """Image files, with their (mtime, size), and subdirectories of a directory."""
+
+    mtime_ns: int
+    scanned_ns: int
+    images: list[tuple[str, int, int]] = field(default_factory=list)
+    subdirectories: list[str] = field(default_factory=list)
+
+    @property
+    def images_count(self) -> int:
+        """Returns the number of image files."""
+        return len(self.images)
+
+
+class DirectoryIndex:
+    """
+    Index of the design directories.
+
+    Each directory is listed in a single os.scandir pass recording its image
+    files (mtime, size) and subdirectories. With an index_path, the index is
+    saved on disk, and later runs only list again the directories whose mtime
+    changed.
+    """
+
+    VERSION: ClassVar[int] = 1
+    # A directory modified within this delay of its scan could have changed
+    # again in the same mtime tick, so its record isn't trusted.
+    RACY_DELAY_NS: ClassVar[int] = 2 * 10**9
+
+    index_path: Optional[str]
+    records: dict[str, DirectoryRecord]
+
+    def __init__(self, index_path: Optional[str] = None):
+        self.index_path = index_path
+        self.records = {}
+        self._visited: set[str] = set()
+        self._skipped: set[tuple[str, int]] = set()
+        self._lock = threading.Lock()
+        self.logger = PicGeniusLogger()
+        if index_path is not None and os.path.exists(index_path):
+            self.load()
+
+    def load(self):
+        """Load the index from index_path, ignoring it if it's unreadable."""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as index_file:
+                data = json.load(index_file)
+        except (OSError, ValueError):
+            return
+
+        if data.get("version") != self.VERSION:
+            return
+
+        self.records = {
+            path: DirectoryRecord(
+                mtime_ns=record["mtime_ns"],
+                scanned_ns=record["scanned_ns"],
+                images=[tuple(image) for image in record["images"]],
+                subdirectories=record["subdirectories"],
+            )
+            for path, record in data["directories"].items()
+        }
+
+    def save(self, root: Optional[str] = None):
+        """
+        Save the index to index_path.
+
+        Args:
+            root (str): If given, forget the directories under root which
+                weren't visited since the index was loaded.
+        """
+        if self.index_path is None:
+            return
+
+        with self._lock:
+            if root is not None:
+                self._prune(root)
+            data = {
+                "version": self.VERSION,
+                "directories": {
+                    path: {
+                        "mtime_ns": record.mtime_ns,
+                        "scanned_ns": record.scanned_ns,
+                        "images": record.images,
+                        "subdirectories": record.subdirectories,
+                    }
+                    for path, record in self.records.items()
+                },
+            }
+
+        index_dir = os.path.dirname(self.index_path)
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+        tmp_path = f"{self.index_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as index_file:
+            json.dump(data, index_file)
+        os.replace(tmp_path, self.index_path)
+
+    def scan(self, path: str) -> DirectoryRecord:
+        """Returns the record of the directory, listing it only if it changed."""
+        mtime_ns = os.stat(path).st_mtime_ns
+
+        with self._lock:
+            self._visited.add(path)
+            record = self.records.get(path)
+        if (
+            record is not None
+            and record.mtime_ns == mtime_ns
+            and record.scanned_ns - mtime_ns > self.RACY_DELAY_NS
+        ):
+            return record
+
+        scanned_ns = time.time_ns()
+        image_entries, directory_entries = utils.scan_directory(path)
+        images = []
+        for entry in image_entries:
+            stat = entry.stat()
+            images.append((entry.name, stat.st_mtime_ns, stat.st_size))
+
+        record = DirectoryRecord(
+            mtime_ns=mtime_ns,
+            scanned_ns=scanned_ns,
+            images=images,
+            subdirectories=[entry.name for entry in directory_entries],
+        )
+        with self._lock:
+            self.records[path] = record
+        return record
+
+    def get_image_paths(self, path: str) -> list[str]:
+        """Returns the image files paths of the given design path."""
+        if os.path.isfile(path):
+            return [path] if utils.has_image_extension(path) else []
+        return [os.path.join(path, name) for name, _, _ in self.scan(path).images]
+
+    def find_product_paths(self, designs_count: int, design_path: str) -> list[str]:
+        """Find designs paths according to the given design count."""
+        return list(self.iter_product_paths(designs_count, design_path))
+
+    def iter_product_paths(
+        self, designs_count: int, design_path: str
+    ) -> Generator[str, None, None]:
+        """
+        Yield designs paths according to the given design count, while scanning.
+        Folders holding images, but not designs_count of them, are logged and
+        skipped, once until they change.
+        """
+        if designs_count == 1:
+            yield from self.get_image_paths(design_path)
+            return
+
+        if not os.path.isdir(design_path):
+            return
+
+        record = self.scan(design_path)
+        if record.images_count == designs_count:
+            yield design_path
+            return
+
+        for name in record.subdirectories:
+            directory = os.path.join(design_path, name)
+            try:
+                subdirectory_record = self.scan(directory)
+            except FileNotFoundError:
+                continue
+            images_count = subdirectory_record.images_count
+            if images_count == designs_count:
+                yield directory
+            elif images_count:
+                self._log_skipped(directory, subdirectory_record, designs_count)
+
+    def _log_skipped(self, directory: str, record: DirectoryRecord, designs_count: int):
+        """Log a skipped folder, once until its mtime changes."""
+        key = (directory, record.mtime_ns)
+        with self._lock:
+            if key in self._skipped:
+                return
+            self._skipped.add(key)
+        self.logger.warning(
+            "(%s) Skipped: %d designs found, %d expected",
+            directory,
+            record.images_count,
+            designs_count,
+        )
+
+    def _prune(self, root: str):
+        """Forget the directories under root which weren't visited."""
+        root = os.path.join(root, "")
+        for path in list(self.records):
+            is_under_root = path == root.rstrip(os.sep) or path.startswith(root)
+            if is_under_root and path not in self._visited:
+                del self.records[path]
@@ -0,0 +1,250 @@
+"""Module for CostEstimator class declaration."""
+from dataclasses import dataclass, field
+from typing import ClassVar, Iterable, Optional
+
+from PIL import Image
+
+from picgenius.image_source import ImageSource
+from picgenius.ledger import JobLedger
+from picgenius.models import Design, Product, ProductType, Template, TemplateElement
+from picgenius.renderers import DesignRenderer, TemplateRenderer
+
+
+@dataclass
+class StageEstimate:
+    """Estimated cost of an asset, for all the products of a run."""
+
+    asset: str
+    outputs: int = 0
+    megapixels: float = 0.0
+    peak_memory: int = 0
+    seconds: float = 0.0
+    timed_tasks: int = 0
+
+    def add(self, outputs: int, megapixels: float, peak_memory: int):
+        """Add the cost of a product."""
+        self.outputs += outputs
+        self.megapixels += megapixels
+        self.peak_memory = max(self.peak_memory, peak_memory)
+
+
+@dataclass
+class ExecutionPlan:
+    """Estimated cost of a run, per asset."""
+
+    products: int
+    workers: int
+    stages: dict[str, StageEstimate] = field(default_factory=dict)
+
+    @property
+    def peak_memory(self) -> int:
+        """Returns the estimated peak memory in bytes, products running in parallel."""
+        peak_memory = max(
+            (stage.peak_memory for stage in self.stages.values()), default=0
+        )
+        return peak_memory * min(self.workers, self.products)
+
+    @property
+    def wall_time(self) -> float:
+        """Returns the estimated wall time in seconds."""
+        seconds = sum(stage.seconds for stage in self.stages.values())
+        return seconds / max(1, min(self.workers, self.products))
+
+    def format(self) -> str:
+        """Returns the plan as a printable table."""
+        lines = [
+            f"{self.products} products, {self.workers} workers",
+            "",
+            f"{'asset':<10} {'outputs':>8} {'megapixels':>11} "
+            f"{'peak memory':>12} {'time':>9}  estimated from",
+        ]
+        for stage in self.stages.values():
+            source = (
+                f"{stage.timed_tasks} timed tasks"
+                if stage.timed_tasks
+                else "default throughput"
+            )
+            lines.append(
+                f"{stage.asset:<10} {stage.outputs:>8} {stage.megapixels:>11.1f} "
+                f"{self.format_bytes(stage.peak_memory):>12} "
+                f"{self.format_duration(stage.seconds):>9}  {source}"
+            )
+        lines.append("")
+        lines.append(f"Estimated peak memory: {self.format_bytes(self.peak_memory)}")
+        lines.append(f"Estimated wall time: {self.format_duration(self.wall_time)}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_bytes(size: int) -> str:
+        """Returns the size with a binary unit."""
+        for unit in ["B", "KiB", "MiB"]:
+            if size < 1024:
+                return f"{size:.0f} {unit}"
+            size /= 1024
+        return f"{size:.1f} GiB"
+
+    @staticmethod
+    def format_duration(seconds: float) -> str:
+        """Returns the duration as h:mm:ss."""
+        minutes, seconds = divmod(round(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+class CostEstimator:
+    """
+    Estimate the cost of a run without rendering anything.
+
+    Designs and template images sizes are read from their headers. The
+    megapixels resampled and composited, and the images held in memory by a
+    product, are derived from the templates, formats and video settings. The
+    time of an asset is the mean duration of the tasks recorded by the ledgers
+    of the output directory, or its megapixels at a default throughput when
+    no task was timed yet.
+    """
+
+    # Megapixels resampled or composited per second by a single thread
+    DEFAULT_THROUGHPUT: ClassVar[dict[str, float]] = {
+        "formats": 40.0,
+        "templates": 25.0,
+        "video": 30.0,
+    }
+
+    product_type: ProductType
+    durations: dict[str, list[float]]
+
+    def __init__(
+        self,
+        product_type: ProductType,
+        output_dir: Optional[str] = None,
+        workers: int = 4,
+    ):
+        """
+        Args:
+            product_type (ProductType): Product type of the run.
+            output_dir (str): Output directory, whose ledgers give the
+                historical durations of the tasks.
+            workers (int): Number of products generated at once.
+        """
+        self.product_type = product_type
+        self.workers = workers
+        self.durations = {}
+        if output_dir is not None:
+            self.durations = JobLedger.get_durations(output_dir)
+        self._template_sizes: dict[str, tuple[int, int]] = {}
+
+    def estimate(
+        self,
+        products: Iterable[Product],
+        assets: Iterable[str] = ("formats", "templates", "video"),
+    ) -> ExecutionPlan:
+        """Returns the execution plan of the products."""
+        estimates = {
+            "formats": self.estimate_formats,
+            "templates": self.estimate_templates,
+            "video": self.estimate_video,
+        }
+        stages = {asset: StageEstimate(asset) for asset in assets}
+        products_count = 0
+        for product in products:
+            products_count += 1
+            for asset, stage in stages.items():
+                stage.add(*estimates[asset](product))
+
+        for asset, stage in stages.items():
+            durations = self.durations.get(asset, [])
+            stage.timed_tasks = len(durations)
+            if durations:
+                stage.seconds = sum(durations) / len(durations) * products_count
+            else:
+                stage.seconds = stage.megapixels / self.DEFAULT_THROUGHPUT[asset]
+        return ExecutionPlan(products_count, self.workers, stages)
+
+    def estimate_formats(self, product: Product) -> tuple[int, float, int]:
+        """Returns the outputs, megapixels and peak memory of the formats."""
+        formats = self.product_type.formats
+        format_sizes = [DesignRenderer.get_format_size(fmt) for fmt in formats]
+        megapixels = 0.0
+        peak_memory = 0
+        for design in product.designs:
+            # Every format of a design is held in memory until it's saved
+            design_bytes = self.get_image_bytes(design.source)
+            bands = Image.getmodebands(design.source.mode)
+            formats_bytes = sum(
+                width * height * bands for width, height in format_sizes
+            )
+            megapixels += sum(width * height for width, height in format_sizes) / 1e6
+            peak_memory = max(peak_memory, design_bytes + formats_bytes)
+        return (len(product.designs) * len(formats), megapixels, peak_memory)
+
+    def estimate_templates(self, product: Product) -> tuple[int, float, int]:
+        """Returns the outputs, megapixels and peak memory of the templates."""
+        megapixels = 0.0
+        peak_memory = 0
+        # The templates of a product are rendered in parallel
+        for template, designs in TemplateRenderer.iter_template_designs(
+            self.product_type.templates, product.designs
+        ):
+            width, height = self.get_template_size(template)
+            canvas_pixels = width * height
+            template_memory = canvas_pixels * 4
+            megapixels += canvas_pixels / 1e6 * (1 + len(template.watermarks))
+            for design, element in zip(designs, template.elements):
+                element_pixels = self.get_element_pixels(element, design, width)
+                megapixels += (element_pixels + canvas_pixels) / 1e6
+                template_memory += self.get_image_bytes(design.source)
+                template_memory += element_pixels * 4
+            peak_memory += template_memory
+        return (len(self.product_type.templates), megapixels, peak_memory)
+
+    def estimate_video(self, product: Product) -> tuple[int, float, int]:
+        """Returns the outputs, megapixels and peak memory of the video."""
+        video_settings = self.product_type.video_settings
+        if video_settings is None:
+            return (0, 0.0, 0)
+
+        width, height = video_settings.format
+        frames = len(range(0, video_settings.frames, video_settings.step))
+        megapixels = (
+            width * height * (1 + frames + len(video_settings.watermarks)) / 1e6
+        )
+        # Frames are held twice, as images then as arrays
+        design_bytes = self.get_image_bytes(product.designs[0].source)
+        peak_memory = design_bytes + frames * width * height * 4 * 2
+        return (1, megapixels, peak_memory)
+
+    def get_template_size(self, template: Template) -> tuple[int, int]:
+        """Returns the template size, read from its image header if any."""
+        if template.path is None:
+            return template.size
+        if template.path not in self._template_sizes:
+            source = TemplateRenderer.get_source(template.path)
+            self._template_sizes[template.path] = source.size
+        return self._template_sizes[template.path]
+
+    @staticmethod
+    def get_element_pixels(
+        element: TemplateElement, design: Design, template_width: int
+    ) -> int:
+        """Returns the number of pixels of the design resized for the element."""
+        design_width, design_height = design.source.size
+        if len(element.position) == 4:
+            # Perspective elements are resized to the template width
+            return template_width * round(template_width * design_height / design_width)
+        if element.size is not None:
+            width, height = element.size
+        elif element.width is not None:
+            width = element.width
+            height = element.height or round(width * design_height / design_width)
+        elif element.height is not None:
+            height = element.height
+            width = round(height * design_width / design_height)
+        else:
+            width, height = design_width, design_height
+        return width * height
+
+    @staticmethod
+    def get_image_bytes(source: ImageSource) -> int:
+        """Returns the memory taken by the decoded image."""
+        width, height = source.size
+        return width * height * Image.getmodebands(source.mode)
@@ -0,0 +1,136 @@
+"""Module for ImageSource class declaration."""
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import ClassVar, Iterator, Optional
+
+from PIL import Image
+
+from picgenius.tracing import Tracer
+
+
+class HandlePool:
+    """
+    Bound the number of image files open at once.
+
+    Every image file is opened through the pool, which blocks when size files
+    are already open, so the file descriptors usage stays constant whatever
+    the number of images.
+    """
+
+    DEFAULT_SIZE: ClassVar[int] = 32
+
+    size: int
+
+    def __init__(self, size: int = DEFAULT_SIZE):
+        self.size = size
+        self._semaphore = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def open(self, path: str) -> Iterator[Image.Image]:
+        """Open the image file, and close it on exit."""
+        with self._semaphore:
+            with Image.open(path) as image:
+                yield image
+
+
+class ImageSource:
+    """
+    Lazy image file.
+
+    Its metadata are read from the file header without decoding the pixels,
+    and the image is opened, decoded and closed on each load, so that no file
+    handle is kept between two uses.
+    """
+
+    handle_pool: ClassVar[HandlePool] = HandlePool()
+
+    path: str
+    name: str
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self._size: Optional[tuple[int, int]] = None
+        self._mode: Optional[str] = None
+        self._format: Optional[str] = None
+
+    def __repr__(self) -> str:
+        return f"ImageSource({self.path!r})"
+
+    @property
+    def size(self) -> tuple[int, int]:
+        """Returns the image size, read from the file header."""
+        if self._size is None:
+            self.probe()
+        return self._size
+
+    @property
+    def mode(self) -> str:
+        """Returns the image mode, read from the file header."""
+        if self._mode is None:
+            self.probe()
+        return self._mode
+
+    @property
+    def format(self) -> str:
+        """Returns the image format, read from the file header."""
+        if self._format is None:
+            self.probe()
+        return self._format
+
+    def probe(self):
+        """Read the image metadata, without decoding the pixels."""
+        with self.handle_pool.open(self.path) as image:
+            self._size = image.size
+            self._mode = image.mode
+            self._format = image.format
+
+    def load(self) -> Image.Image:
+        """Returns the decoded image, its file being already closed."""
+        with Tracer.span("decode", image=self.name), self.handle_pool.open(
+            self.path
+        ) as image:
+            image.load()
+            self._size = image.size
+            self._mode = image.mode
+            self._format = image.format
+        return image
+
+
+class ImageCache:
+    """
+    Decoded images kept in memory, for the images loaded again and again
+    such as templates backgrounds. An image is decoded again when its file
+    changes, and copies are returned so that callers can modify them.
+    """
+
+    DEFAULT_MAX_ITEMS: ClassVar[int] = 64
+
+    max_items: int
+
+    def __init__(self, max_items: int = DEFAULT_MAX_ITEMS):
+        self.max_items = max_items
+        self._images: OrderedDict[
+            str, tuple[tuple[int, int], Image.Image]
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, path: str, source: Optional[ImageSource] = None) -> Image.Image:
+        """Returns a copy of the decoded image, decoded from source if given."""
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._images.get(path)
+            if cached is not None and cached[0] == version:
+                self._images.move_to_end(path)
+                return cached[1].copy()
+
+        image = (source if source is not None else ImageSource(path)).load()
+        with self._lock:
+            self._images[path] = (version, image)
+            self._images.move_to_end(path)
+            while len(self._images) > self.max_items:
+                self._images.popitem(last=False)
+        return image.copy()
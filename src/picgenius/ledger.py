@@ -0,0 +1,184 @@
+"""Module for JobLedger class declaration."""
+import glob
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from typing import ClassVar, Optional
+
+
+class JobLedger:
+    """
+    SQLite ledger of the (product, asset) tasks of a batch run.
+
+    Each task is recorded as pending, running, done or failed, with its
+    duration and error, in the output directory. Writes are buffered and
+    flushed in a single transaction every BATCH_SIZE writes or FLUSH_INTERVAL
+    seconds, so that the ledger doesn't slow the rendering down. A resumed run
+    skips the tasks already done.
+    """
+
+    FILENAME: ClassVar[str] = ".picgenius-ledger.sqlite"
+    BATCH_SIZE: ClassVar[int] = 64
+    FLUSH_INTERVAL: ClassVar[float] = 2.0
+
+    PENDING: ClassVar[str] = "pending"
+    RUNNING: ClassVar[str] = "running"
+    DONE: ClassVar[str] = "done"
+    FAILED: ClassVar[str] = "failed"
+
+    output_dir: str
+    resume: bool
+    name: Optional[str]
+
+    def __init__(
+        self, output_dir: str, resume: bool = False, name: Optional[str] = None
+    ):
+        """
+        Args:
+            output_dir (str): The output directory, where the ledger is stored.
+            resume (bool): Keep the tasks of the previous run, instead of
+                starting a new one.
+            name (str): Name of the ledger, to keep one ledger per node
+                when several nodes share the output directory.
+        """
+        self.output_dir = output_dir
+        self.resume = resume
+        self.name = name
+        self._lock = threading.Lock()
+        self._buffer: list[tuple] = []
+        self._flushed_at = time.monotonic()
+
+        os.makedirs(output_dir, exist_ok=True)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "product TEXT NOT NULL, asset TEXT NOT NULL, status TEXT NOT NULL, "
+            "duration REAL, error TEXT, updated_at REAL NOT NULL, "
+            "PRIMARY KEY (product, asset))"
+        )
+        if not resume:
+            self._connection.execute("DELETE FROM tasks")
+        self._connection.commit()
+
+        self._done = set(
+            self._connection.execute(
+                "SELECT product, asset FROM tasks WHERE status = ?", (self.DONE,)
+            )
+        )
+
+    def __enter__(self) -> "JobLedger":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    @property
+    def path(self) -> str:
+        """Returns the ledger file path."""
+        filename = self.FILENAME
+        if self.name is not None:
+            stem, ext = os.path.splitext(filename)
+            filename = f"{stem}-{self.name.replace('/', 'of')}{ext}"
+        return os.path.join(self.output_dir, filename)
+
+    @staticmethod
+    def get_durations(output_dir: str) -> dict[str, list[float]]:
+        """
+        Returns the durations of the done tasks of each asset, recorded by
+        all the ledgers of the output directory.
+        """
+        stem, ext = os.path.splitext(JobLedger.FILENAME)
+        durations: dict[str, list[float]] = {}
+        pattern = os.path.join(glob.escape(output_dir), f"{stem}*{ext}")
+        for path in sorted(glob.glob(pattern)):
+            uri = pathlib.Path(path).resolve().as_uri()
+            connection = sqlite3.connect(f"{uri}?mode=ro", uri=True)
+            try:
+                rows = connection.execute(
+                    "SELECT asset, duration FROM tasks "
+                    "WHERE status = ? AND duration IS NOT NULL",
+                    (JobLedger.DONE,),
+                ).fetchall()
+            except sqlite3.DatabaseError:
+                rows = []
+            finally:
+                connection.close()
+            for asset, duration in rows:
+                durations.setdefault(asset, []).append(duration)
+        return durations
+
+    def is_done(self, product: str, asset: str) -> bool:
+        """Returns True if the task was done by this run or the resumed one."""
+        with self._lock:
+            return (product, asset) in self._done
+
+    def mark_pending(self, product: str, asset: str):
+        """Record a task as queued."""
+        self._write(product, asset, self.PENDING)
+
+    def mark_running(self, product: str, asset: str):
+        """Record a task as started."""
+        self._write(product, asset, self.RUNNING)
+
+    def mark_done(self, product: str, asset: str, duration: float):
+        """Record a task as successfully done."""
+        with self._lock:
+            self._done.add((product, asset))
+        self._write(product, asset, self.DONE, duration)
+
+    def mark_failed(self, product: str, asset: str, duration: float, error: str):
+        """Record a task as failed, to be queued again on resume."""
+        self._write(product, asset, self.FAILED, duration, error)
+
+    def count_by_status(self) -> dict[str, int]:
+        """Returns the number of tasks of each status."""
+        self.flush()
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT status, COUNT(*) FROM tasks GROUP BY status"
+            )
+            return dict(rows.fetchall())
+
+    def flush(self):
+        """Write the buffered records to the ledger."""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        """Flush the buffered records, and close the ledger."""
+        self.flush()
+        self._connection.close()
+
+    def _write(
+        self,
+        product: str,
+        asset: str,
+        status: str,
+        duration: Optional[float] = None,
+        error: Optional[str] = None,
+    ):
+        with self._lock:
+            self._buffer.append((product, asset, status, duration, error, time.time()))
+            is_buffer_full = len(self._buffer) >= self.BATCH_SIZE
+            if (
+                is_buffer_full
+                or self._flushed_at + self.FLUSH_INTERVAL < time.monotonic()
+            ):
+                self._flush()
+
+    def _flush(self):
+        """Write the buffered records in a single transaction, lock being held."""
+        if self._buffer:
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO tasks "
+                    "(product, asset, status, duration, error, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    self._buffer,
+                )
+            self._buffer = []
+        self._flushed_at = time.monotonic()
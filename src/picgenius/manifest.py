@@ -0,0 +1,230 @@
+"""Module for BuildManifest class declaration."""
+import dataclasses
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, ClassVar, Iterable, Iterator, Optional
+
+from picgenius import __version__
+
+
+class BuildManifest:
+    """
+    Fingerprints of the outputs generated in an output directory.
+
+    Each output is recorded with a fingerprint of its inputs: config, files
+    contents and picgenius version. An output whose fingerprint didn't change
+    since it was generated is up to date and can be skipped. Files are hashed
+    once, then again only when their size or mtime change. Saving merges the
+    outputs recorded since loading into the manifest on disk, so that
+    concurrent runs on the same output directory don't drop each other's
+    outputs. The merge holds a lock file created with O_CREAT | O_EXCL, which
+    is atomic even on shared filesystems, so that the runs of several
+    processes or nodes save one at a time. A lock older than LOCK_STALE_AGE
+    was left by a crashed run and is broken. Each lock holds a unique token,
+    and is only removed by an atomic rename checked against that token, so
+    that a lock created meanwhile by another process is never removed.
+    """
+
+    FILENAME: ClassVar[str] = ".picgenius-manifest.json"
+    VERSION: ClassVar[int] = 1
+    HASH_CHUNK_SIZE: ClassVar[int] = 1024**2
+    LOCK_TIMEOUT: ClassVar[float] = 30.0
+    LOCK_STALE_AGE: ClassVar[float] = 10.0
+    LOCK_POLL_INTERVAL: ClassVar[float] = 0.05
+
+    output_dir: str
+    force: bool
+    outputs: dict[str, str]
+    files: dict[str, tuple[int, int, str]]
+
+    def __init__(self, output_dir: str, force: bool = False):
+        """
+        Args:
+            output_dir (str): The output directory, where the manifest is saved.
+            force (bool): Consider every output as outdated.
+        """
+        self.output_dir = output_dir
+        self.force = force
+        self.outputs = {}
+        self.files = {}
+        self._recorded: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    @property
+    def path(self) -> str:
+        """Returns the manifest file path."""
+        return os.path.join(self.output_dir, self.FILENAME)
+
+    def load(self):
+        """Load the manifest, ignoring it if it's unreadable."""
+        data = self._read()
+        if data is None:
+            return
+        self.outputs = data["outputs"]
+        self.files = {path: tuple(file) for path, file in data["files"].items()}
+
+    @property
+    def lock_path(self) -> str:
+        """Returns the lock file path, held while saving."""
+        return f"{self.path}.lock"
+
+    def save(self):
+        """Save the manifest atomically in the output directory."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        with self._acquire_file_lock():
+            data = self._read() or {"outputs": {}, "files": {}}
+            with self._lock:
+                data["version"] = self.VERSION
+                data["outputs"].update(self._recorded)
+                data["files"].update(self.files)
+
+            tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+                json.dump(data, manifest_file)
+            os.replace(tmp_path, self.path)
+
+    def fingerprint(self, *inputs: Any, files: Iterable[Optional[str]] = ()) -> str:
+        """
+        Returns the fingerprint of an output.
+
+        Args:
+            inputs: Config of the output, dataclasses being compared by value.
+            files: Paths of the input files, whose contents are hashed.
+        """
+        data = {
+            "picgenius": __version__,
+            "inputs": [self._serialize(value) for value in inputs],
+            "files": [None if path is None else self.hash_file(path) for path in files],
+        }
+        serialized = json.dumps(data, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def hash_file(self, path: str) -> str:
+        """Returns the sha256 of the file, hashing it only if it changed."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            file = self.files.get(path)
+        if file is not None and file[:2] == (stat.st_size, stat.st_mtime_ns):
+            return file[2]
+
+        sha256 = hashlib.sha256()
+        with open(path, "rb") as input_file:
+            for chunk in iter(lambda: input_file.read(self.HASH_CHUNK_SIZE), b""):
+                sha256.update(chunk)
+        content_hash = sha256.hexdigest()
+
+        with self._lock:
+            self.files[path] = (stat.st_size, stat.st_mtime_ns, content_hash)
+        return content_hash
+
+    def is_up_to_date(self, output_path: str, fingerprint: str) -> bool:
+        """Returns True if the output exists and was generated from the same inputs."""
+        if self.force:
+            return False
+        with self._lock:
+            recorded = self.outputs.get(self._get_key(output_path))
+        return recorded == fingerprint and os.path.exists(output_path)
+
+    def record(self, output_path: str, fingerprint: str):
+        """Record the fingerprint of a generated output."""
+        key = self._get_key(output_path)
+        with self._lock:
+            self.outputs[key] = fingerprint
+            self._recorded[key] = fingerprint
+
+    @contextmanager
+    def _acquire_file_lock(self) -> Iterator[None]:
+        """Hold the lock file, waiting for other processes to release it."""
+        token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+        deadline = time.monotonic() + self.LOCK_TIMEOUT
+        while True:
+            try:
+                fd = os.open(
+                    self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644
+                )
+                break
+            except FileExistsError:
+                if self._break_stale_lock():
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(  # pylint: disable=raise-missing-from
+                        f"The manifest {self.path} is locked by {self.lock_path}"
+                    )
+                time.sleep(self.LOCK_POLL_INTERVAL)
+
+        with os.fdopen(fd, "w", encoding="utf-8") as lock_file:
+            lock_file.write(token)
+        try:
+            yield
+        finally:
+            self._remove_lock(token)
+
+    def _break_stale_lock(self) -> bool:
+        """Remove the lock file if it's stale, returns True if it's gone."""
+        try:
+            token = self._read_lock_token(self.lock_path)
+            if time.time() - os.stat(self.lock_path).st_mtime < self.LOCK_STALE_AGE:
+                return False
+        except FileNotFoundError:
+            return True
+        self._remove_lock(token)
+        return True
+
+    def _remove_lock(self, token: str) -> bool:
+        """
+        Remove the lock file if it holds token, returns True if it was removed.
+
+        The lock is renamed to a unique path first, which only one process
+        can do. If it isn't the expected lock, another process locked in
+        between, and its lock is linked back unless a newer one exists.
+        """
+        moved_path = f"{self.lock_path}.{uuid.uuid4().hex}"
+        try:
+            os.rename(self.lock_path, moved_path)
+        except FileNotFoundError:
+            return False
+        try:
+            if self._read_lock_token(moved_path) == token:
+                return True
+            try:
+                os.link(moved_path, self.lock_path)
+            except FileExistsError:
+                pass
+            return False
+        finally:
+            os.remove(moved_path)
+
+    @staticmethod
+    def _read_lock_token(path: str) -> str:
+        with open(path, "r", encoding="utf-8") as lock_file:
+            return lock_file.read()
+
+    def _read(self) -> Optional[dict]:
+        """Returns the manifest data on disk, or None if it's unreadable."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as manifest_file:
+                data = json.load(manifest_file)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != self.VERSION:
+            return None
+        return data
+
+    def _get_key(self, output_path: str) -> str:
+        return os.path.relpath(output_path, self.output_dir)
+
+    @staticmethod
+    def _serialize(value: Any) -> Any:
+        if dataclasses.is_dataclass(value):
+            return dataclasses.asdict(value)
+        if isinstance(value, (list, tuple)):
+            return [BuildManifest._serialize(item) for item in value]
+        return value
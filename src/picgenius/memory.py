@@ -0,0 +1,206 @@
+"""Module for MemoryProfiler class declaration."""
+import itertools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Any, ClassVar, Optional
+
+from picgenius.tracing import Tracer
+
+
+@dataclass
+class StageMemory:
+    """Memory used by the spans of a (product, stage, detail) key."""
+
+    product: str
+    stage: str
+    detail: str
+    count: int = 0
+    peak_rss: int = 0
+    rss_growth: int = 0
+    peak_traced: Optional[int] = None
+    traced_growth: Optional[int] = None
+
+
+class MemoryProfiler(Tracer):
+    """
+    Attribute the process memory to the spans of the rendering stages.
+
+    The RSS is sampled every interval by a background thread, and when spans
+    start and end. Each span records the peak RSS seen while it was open, and
+    its growth over the RSS at its start, aggregated per product, stage and
+    template, format or file. With use_tracemalloc, the Python allocations
+    traced by tracemalloc are recorded the same way, at a large CPU cost.
+    Spans running in parallel share the process memory, so a peak is
+    attributed to every span open at that time.
+    """
+
+    DEFAULT_INTERVAL: ClassVar[float] = 0.05
+    DETAIL_ARGS: ClassVar[tuple[str, ...]] = (
+        "template",
+        "filename",
+        "size",
+        "image",
+        "design",
+    )
+
+    interval: float
+    use_tracemalloc: bool
+    stages: dict[tuple[str, str, str], StageMemory]
+
+    def __init__(
+        self, interval: float = DEFAULT_INTERVAL, use_tracemalloc: bool = False
+    ):
+        """
+        Args:
+            interval (float): Seconds between two RSS samples.
+            use_tracemalloc (bool): Also trace the Python allocations.
+        """
+        super().__init__()
+        self.interval = interval
+        self.use_tracemalloc = use_tracemalloc
+        self.stages = {}
+        self._open_spans: dict[int, list] = {}
+        self._span_ids = itertools.count()
+        self._stop_event = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._started_tracemalloc = False
+
+    @staticmethod
+    def get_rss() -> int:
+        """Returns the resident set size of the process in bytes."""
+        try:
+            with open("/proc/self/statm", "rb") as statm_file:
+                return int(statm_file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except OSError:
+            # Without procfs, fall back on the peak RSS, in KiB on Linux
+            import resource  # pylint: disable=import-outside-toplevel
+
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def open(self):
+        if self.use_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._stop_event.clear()
+        self._sampler = threading.Thread(
+            target=self._sample_loop, name="picgenius-memory", daemon=True
+        )
+        self._sampler.start()
+
+    def close(self):
+        self._stop_event.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def enter_span(self, name: str, args: dict[str, Any]) -> Any:
+        detail = next((str(args[key]) for key in self.DETAIL_ARGS if key in args), "")
+        key = (str(args.get("product", "")), name, detail)
+        rss, traced = self._measure()
+        span_id = next(self._span_ids)
+        with self._lock:
+            self._open_spans[span_id] = [key, rss, rss, traced, traced]
+        return span_id
+
+    def exit_span(self, token: Any):
+        rss, traced = self._measure()
+        with self._lock:
+            self._update_open_spans(rss, traced)
+            key, start_rss, peak_rss, start_traced, peak_traced = self._open_spans.pop(
+                token
+            )
+            stage = self.stages.get(key)
+            if stage is None:
+                stage = self.stages[key] = StageMemory(*key)
+            stage.count += 1
+            stage.peak_rss = max(stage.peak_rss, peak_rss)
+            stage.rss_growth = max(stage.rss_growth, peak_rss - start_rss)
+            if traced is not None:
+                stage.peak_traced = max(stage.peak_traced or 0, peak_traced)
+                stage.traced_growth = max(
+                    stage.traced_growth or 0, peak_traced - start_traced
+                )
+
+    def get_report(self) -> list[StageMemory]:
+        """Returns the memory of each key, the largest growths first."""
+        with self._lock:
+            stages = list(self.stages.values())
+        return sorted(
+            stages, key=lambda stage: (stage.rss_growth, stage.peak_rss), reverse=True
+        )
+
+    def format_report(self, limit: Optional[int] = 20) -> str:
+        """Returns the report as a printable table."""
+        lines = [
+            f"{'product':<20} {'stage':<34} {'detail':<24} {'count':>6} "
+            f"{'peak RSS':>10} {'growth':>10}"
+            + (f" {'traced':>10}" if self.use_tracemalloc else "")
+        ]
+        for stage in self.get_report()[:limit]:
+            line = (
+                f"{stage.product[:20]:<20} {stage.stage[:34]:<34} "
+                f"{stage.detail[-24:]:<24} {stage.count:>6} "
+                f"{self.format_megabytes(stage.peak_rss):>10} "
+                f"{self.format_megabytes(stage.rss_growth):>10}"
+            )
+            if self.use_tracemalloc:
+                line += f" {self.format_megabytes(stage.traced_growth or 0):>10}"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def save_report(self, path: str):
+        """Save the report as JSON."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {
+            "peak_rss": max(
+                (stage.peak_rss for stage in self.stages.values()), default=0
+            ),
+            "tracemalloc": self.use_tracemalloc,
+            "stages": [asdict(stage) for stage in self.get_report()],
+        }
+        with open(path, "w", encoding="utf-8") as report_file:
+            json.dump(data, report_file, indent=2)
+
+    @staticmethod
+    def format_megabytes(size: int) -> str:
+        """Returns the size in MiB."""
+        return f"{size / 1024**2:.1f} MiB"
+
+    def _measure(self) -> tuple[int, Optional[int]]:
+        traced = None
+        if self.use_tracemalloc and tracemalloc.is_tracing():
+            traced = tracemalloc.get_traced_memory()[0]
+        return (self.get_rss(), traced)
+
+    def _update_open_spans(self, rss: int, traced: Optional[int]):
+        """Raise the peaks of the open spans, lock being held."""
+        for span in self._open_spans.values():
+            span[2] = max(span[2], rss)
+            if traced is not None:
+                span[4] = max(span[4], traced)
+
+    def _sample_loop(self):
+        while not self._stop_event.wait(self.interval):
+            rss, traced = self._measure()
+            counters = {"rss": rss}
+            if traced is not None:
+                counters["traced"] = traced
+            with self._lock:
+                self._update_open_spans(rss, traced)
+                self.events.append(
+                    {
+                        "name": "memory",
+                        "ph": "C",
+                        "ts": (time.perf_counter_ns() - self._origin_ns) / 1000,
+                        "pid": os.getpid(),
+                        "args": counters,
+                    }
+                )
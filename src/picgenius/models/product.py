@@ -1,9 +1,11 @@
 """Module for Product class declaration."""
 from dataclasses import dataclass, field
+from typing import Optional
 
 from PIL import Image
 
 from picgenius import utils
+from picgenius.image_source import ImageSource
 from .product_type import ProductType
 
 
@@ -13,14 +15,16 @@ class Design:
 
     path: str
     name: str = ""
+    source: ImageSource = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         _, name = utils.extract_filename(self.path)
         self.name = name
+        self.source = ImageSource(self.path)
 
     def load_image(self) -> Image.Image:
-        """Loads the image."""
-        return Image.open(self.path)
+        """Loads the image, without keeping its file open."""
+        return self.source.load()
 
 
 @dataclass
@@ -29,6 +33,7 @@ class Product:
 
     type: ProductType
     design_path: str
+    image_paths: Optional[list[str]] = field(default=None, repr=False)
     name: str = field(init=False)
     designs: list[Design] = field(init=False)
 
@@ -36,8 +41,10 @@ class Product:
         self.design_path = self.design_path.strip("/")
         _, name = utils.extract_filename(self.design_path)
         self.name = name
+        if self.image_paths is None:
+            self.image_paths = utils.find_image_file_paths(self.design_path)
         self.designs = []
-        for design_path in utils.find_image_file_paths(self.design_path):
+        for design_path in self.image_paths:
             self.designs.append(Design(design_path))
 
         if len(self.designs) != self.type.designs_count:
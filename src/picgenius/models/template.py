@@ -16,6 +16,7 @@ from typing import Optional, ClassVar
 from PIL import Image
 
 from picgenius import utils
+from picgenius.image_source import ImageSource
 from .watermark import Watermark
 
 
@@ -71,9 +72,9 @@ class TemplateImageElement:
                 self.position[1] in self.AVAILABLE_Y_POS
             ), f"Position {self.position[1]} is not available."
 
-    def load_image(self):
-        """Return image as PIL.Image."""
-        return Image.open(self.path)
+    def load_image(self) -> Image.Image:
+        """Return image as PIL.Image, without keeping its file open."""
+        return ImageSource(self.path).load()
 
 
 @dataclass
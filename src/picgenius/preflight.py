@@ -0,0 +1,175 @@
+"""Module for Preflight class declaration."""
+import os
+from typing import Iterable, Optional
+
+from PIL import UnidentifiedImageError
+
+from picgenius import processing as im
+from picgenius.image_source import ImageSource
+from picgenius.logger import PicGeniusLogger
+from picgenius.models import ProductType, Template, Watermark
+
+
+class PreflightError(ValueError):
+    """Raised when a product type references missing or invalid assets."""
+
+    issues: list[str]
+
+    def __init__(self, issues: list[str]):
+        self.issues = issues
+        super().__init__(
+            "Preflight failed:\n" + "\n".join(f"  - {issue}" for issue in issues)
+        )
+
+
+class Preflight:
+    """
+    Check the assets of product types before any rendering.
+
+    Every referenced file must exist. Template images are probed from their
+    headers, without decoding their pixels, to check the elements positions
+    against the template bounds, and fonts are loaded once. The fonts stay in
+    the processing font cache for the render stage to reuse, and the probed
+    image sources in sources, given to TemplateRenderer.add_sources so that
+    the files aren't probed again.
+    """
+
+    sources: dict[str, ImageSource]
+    issues: list[str]
+
+    def __init__(self):
+        self.sources = {}
+        self.issues = []
+        self._fonts: set[str] = set()
+        self.logger = PicGeniusLogger()
+
+    def check(self, product_type: ProductType, name: Optional[str] = None):
+        """
+        Check the assets of the product type, and raise on any issue.
+
+        Raises:
+            PreflightError: The issues found in the product type.
+        """
+        prefix = f"{name}: " if name is not None else ""
+        issues = self.get_issues(product_type)
+        if issues:
+            raise PreflightError([prefix + issue for issue in issues])
+        self.logger.debug(
+            "%sPreflight passed: %d images, %d fonts",
+            prefix,
+            len(self.sources),
+            len(self._fonts),
+        )
+
+    def get_issues(self, product_type: ProductType) -> list[str]:
+        """Returns the issues found in the assets of the product type."""
+        self.issues = []
+        for index, template in enumerate(product_type.templates):
+            self._check_template(template, f"templates[{index}]")
+
+        for key, watermark in (product_type.watermarks or {}).items():
+            self._check_watermark(watermark, f"watermarks.{key}")
+
+        if product_type.video_settings is not None:
+            for index, watermark in enumerate(product_type.video_settings.watermarks):
+                self._check_watermark(
+                    watermark,
+                    f"video.watermarks[{index}]",
+                    product_type.video_settings.format,
+                )
+        return self.issues
+
+    def probe(self, path: str) -> ImageSource:
+        """Returns the image source of the path, its header being read once."""
+        if path in self.sources:
+            return self.sources[path]
+        source = ImageSource(path)
+        source.probe()
+        self.sources[path] = source
+        return source
+
+    def _check_template(self, template: Template, location: str):
+        template_size = template.size
+        if template.path is not None:
+            source = self._probe_file(template.path, f"{location}.template_path")
+            if source is None:
+                # Without its size, the elements bounds can't be checked
+                template_size = None
+            else:
+                template_size = source.size
+
+        if template_size is not None:
+            for index, element in enumerate(template.elements):
+                points = element.position
+                if len(points) == 2 and not isinstance(points[0], (list, tuple)):
+                    points = [points]
+                self._check_points(
+                    points, template_size, f"{location}.elements[{index}].position"
+                )
+
+        for index, image_element in enumerate(template.images):
+            image_location = f"{location}.images[{index}]"
+            self._probe_file(image_element.path, f"{image_location}.path")
+            if template_size is not None:
+                position = [
+                    value
+                    for value in image_element.position
+                    if not isinstance(value, str)
+                ]
+                if len(position) == 2:
+                    self._check_points(
+                        [position], template_size, f"{image_location}.position"
+                    )
+
+        for index, watermark in enumerate(template.watermarks):
+            self._check_watermark(
+                watermark, f"{location}.watermarks[{index}]", template_size
+            )
+
+    def _check_watermark(
+        self,
+        watermark: Watermark,
+        location: str,
+        image_size: Optional[tuple[int, int]] = None,
+    ):
+        self._load_font(watermark.font_path, f"{location}.font_path")
+        position = [value for value in watermark.position if not isinstance(value, str)]
+        if image_size is not None and len(position) == 2:
+            self._check_points([position], image_size, f"{location}.position")
+
+    def _check_points(
+        self,
+        points: Iterable[tuple[int, int]],
+        size: tuple[int, int],
+        location: str,
+    ):
+        width, height = size
+        for x_pos, y_pos in points:
+            if not (0 <= int(x_pos) <= width and 0 <= int(y_pos) <= height):
+                self.issues.append(
+                    f"{location}: ({x_pos}, {y_pos}) is outside of the "
+                    f"{width}x{height} bounds."
+                )
+
+    def _probe_file(self, path: str, location: str) -> Optional[ImageSource]:
+        if not os.path.isfile(path):
+            self.issues.append(f"{location}: {path} doesn't exist.")
+            return None
+        try:
+            return self.probe(path)
+        except (UnidentifiedImageError, OSError) as exc:
+            self.issues.append(f"{location}: {path} isn't a readable image ({exc}).")
+            return None
+
+    def _load_font(self, path: str, location: str):
+        if path in self._fonts:
+            return
+        if not os.path.isfile(path):
+            self.issues.append(f"{location}: {path} doesn't exist.")
+            return
+        try:
+            im.load_font(path, 1)
+        except OSError as exc:
+            self.issues.append(f"{location}: {path} isn't a readable font ({exc}).")
+            return
+        self._fonts.add(path)
@@ -1,15 +1,39 @@
 """Module to define image processing functions."""
+import functools
+import io
 import os
 from typing import Optional
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 
-import torch
-from RealESRGAN import RealESRGAN
+from picgenius.compositing import Compositor
+from picgenius.tracing import Tracer
+from picgenius.upscaling.settings import InferenceSettings
+from picgenius.upscaling.weights import WeightsLoader
 
 
-def upscale_image(image: Image.Image, scale: int, cpu: bool = False) -> Image.Image:
-    """Upscale the given image using ESRGAN model."""
+def get_weights_identity(scale: int) -> str:
+    """Returns a string identifying the ESRGAN weights used for the given scale."""
+    return WeightsLoader.default.get_identity(scale)
+
+
+def upscale_image(
+    image: Image.Image,
+    scale: int,
+    cpu: bool = False,
+    settings: Optional[InferenceSettings] = None,
+) -> Image.Image:
+    """
+    Upscale the given image using ESRGAN model.
+
+    The model is loaded once per process and scale. Without settings,
+    InferenceSettings.default is used. torch is imported on the first upscale.
+    """
+    # pylint: disable=import-outside-toplevel
+    import torch
+
+    from picgenius.upscaling import ParallelUpscaler, Upscaler
+
     try:
         assert scale in [2, 4, 8]
     except AssertionError as exc:
@@ -18,38 +42,40 @@ def upscale_image(image: Image.Image, scale: int, cpu: bool = False) -> Image.Im
     torch.cuda.empty_cache()
     if torch.cuda.is_available() and not cpu:
         device = torch.device("cuda")
-        batch_size = 1
     else:
         device = torch.device("cpu")
-        batch_size = 32
-    model = RealESRGAN(device, scale=scale)
-    os.makedirs("./models", exist_ok=True)
-    model.load_weights(f"./models/RealESRGAN_x{scale}.pth", download=True)
+    if settings is None:
+        settings = InferenceSettings.default
+    if device.type == "cpu" and settings.workers is not None and settings.workers > 1:
+        upscaler = ParallelUpscaler.get(scale, settings)
+    else:
+        upscaler = Upscaler.get(scale, device, settings)
 
-    upscaled_image = model.predict(image, batch_size=batch_size)
+    upscaled_image = upscaler.predict(image)
     return upscaled_image
 
 
 def resize_and_crop(image: Image.Image, size_x: int, size_y: int):
     """Resize and crop image."""
-    target_ratio = size_x / size_y
-    current_ratio = image.width / image.height
-    if current_ratio > target_ratio:
-        # Image is wider than aspect ratio, crop the sides
-        new_width = int(image.height * target_ratio)
-        left = (image.width - new_width) // 2
-        right = left + new_width
-        box = (left, 0, right, image.height)
-    else:
-        # Image is taller than aspect ratio, crop the top and bottom
-        new_height = int(image.width / target_ratio)
-        top = (image.height - new_height) // 2
-        bottom = top + new_height
-        box = (0, top, image.width, bottom)
-
-    cropped_design = image.crop(box)
-    resized_design = cropped_design.resize((size_x, size_y))
-    return resized_design
+    with Tracer.span("resize_and_crop", size=(size_x, size_y)):
+        target_ratio = size_x / size_y
+        current_ratio = image.width / image.height
+        if current_ratio > target_ratio:
+            # Image is wider than aspect ratio, crop the sides
+            new_width = int(image.height * target_ratio)
+            left = (image.width - new_width) // 2
+            right = left + new_width
+            box = (left, 0, right, image.height)
+        else:
+            # Image is taller than aspect ratio, crop the top and bottom
+            new_height = int(image.width / target_ratio)
+            top = (image.height - new_height) // 2
+            bottom = top + new_height
+            box = (0, top, image.width, bottom)
+
+        cropped_design = image.crop(box)
+        resized_design = cropped_design.resize((size_x, size_y))
+        return resized_design
 
 
 def crop_to_ratio(image: Image.Image, ratio: tuple[int, int]) -> Image.Image:
@@ -130,14 +156,50 @@ def _format_padding(
         raise ValueError("textbox_padding must be an int or tuple.")
 
 
+def get_file_version(path: str) -> tuple[int, int]:
+    """Returns the (mtime, size) of the file, which change when it's replaced."""
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def load_font_data(font_path: str) -> bytes:
+    """Returns the content of the font file, read again only when it changes."""
+    return _load_font_data(font_path, get_file_version(font_path))
+
+
+@functools.lru_cache(maxsize=32)
+def _load_font_data(font_path: str, _version: tuple[int, int]) -> bytes:
+    with open(font_path, "rb") as font_file:
+        return font_file.read()
+
+
+def load_font(font_path: str, size: int) -> ImageFont.FreeTypeFont:
+    """
+    Returns the font at the given size. Fonts aren't shared, FreeType faces
+    not being thread-safe, but their file is only read once.
+    """
+    return ImageFont.truetype(io.BytesIO(load_font_data(font_path)), size)
+
+
 def find_font_size(text: str, font_path: str, max_width):
     """Return a font object that fits in the given size."""
+    version = get_file_version(font_path)
+    font_size = _find_font_size(text, font_path, version, max_width)
+    font_data = _load_font_data(font_path, version)
+    return ImageFont.truetype(io.BytesIO(font_data), font_size)
+
+
+@functools.lru_cache(maxsize=1024)
+def _find_font_size(
+    text: str, font_path: str, version: tuple[int, int], max_width
+) -> int:
+    font_data = _load_font_data(font_path, version)
     font_size = 1
-    font = ImageFont.truetype(font_path, font_size)
+    font = ImageFont.truetype(io.BytesIO(font_data), font_size)
     while font.getlength(text) < max_width:
         font_size += 1
-        font = ImageFont.truetype(font_path, font_size)
-    return font
+        font = ImageFont.truetype(io.BytesIO(font_data), font_size)
+    return font_size
 
 
 def get_text_size(font: ImageFont.FreeTypeFont, text: str) -> tuple[int, int]:
@@ -263,18 +325,7 @@ def apply_transparent_overlay(
     Returns:
         Image.Image: The image with the transparent overlay applied.
     """
-
-    # Create a new image with the same size as the target image and the specified overlay color
-    overlay = Image.new("RGBA", image.size, overlay_color)
-
-    # If the input image is not in RGBA mode, convert it
-    if image.mode != "RGBA":
-        image = image.convert("RGBA")
-
-    # Paste the overlay onto the target image using the alpha channel of the overlay as a mask
-    image_with_overlay = Image.alpha_composite(image, overlay)
-
-    return image_with_overlay
+    return Compositor.composite(image, overlay=overlay_color)
 
 
 def zoom(
@@ -0,0 +1,115 @@
+"""Module for ProductProfiler class declaration."""
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+from contextlib import contextmanager
+from typing import ClassVar, Iterable, Iterator, Optional
+
+from picgenius.logger import PicGeniusLogger
+
+
+class ProductProfiler:
+    """
+    Profile the generation of products with cProfile, one .prof file per product.
+
+    The threads started while a product is profiled, such as the workers of
+    the formats and templates thread pools, are profiled too and merged into
+    the product profile. Before Python 3.12, cProfile only profiles the thread
+    which enabled it, so each new thread enables its own profiler from a
+    threading profile hook. Since Python 3.12, cProfile profiles every thread.
+    Products must be profiled one at a time, for the threads to be attributed
+    to the right product.
+    """
+
+    DEFAULT_TOP: ClassVar[int] = 20
+    SORT_KEY: ClassVar[str] = "tottime"
+    PROFILES_EVERY_THREAD: ClassVar[bool] = sys.version_info >= (3, 12)
+
+    output_dir: str
+    product_names: Optional[set[str]]
+    top: int
+
+    def __init__(
+        self,
+        output_dir: str,
+        product_names: Optional[Iterable[str]] = None,
+        top: int = DEFAULT_TOP,
+    ):
+        """
+        Args:
+            output_dir (str): Directory of the .prof files.
+            product_names (Iterable[str]): Only profile these products,
+                all of them if None.
+            top (int): Number of functions of the logged summary.
+        """
+        self.output_dir = output_dir
+        self.product_names = None if product_names is None else set(product_names)
+        self.top = top
+        self.logger = PicGeniusLogger()
+        self._lock = threading.Lock()
+
+    def selects(self, product_name: str) -> bool:
+        """Returns True if the product is profiled."""
+        return self.product_names is None or product_name in self.product_names
+
+    def get_path(self, product_name: str) -> str:
+        """Returns the path of the product profile."""
+        return os.path.join(self.output_dir, f"{product_name}.prof")
+
+    @contextmanager
+    def profile(self, product_name: str) -> Iterator[None]:
+        """Profile the context, then save and log the profile of the product."""
+        profiles = [cProfile.Profile()]
+
+        def start_thread_profile(*_):
+            # Called on the first event of a new thread, replaced by its profiler
+            thread_profile = cProfile.Profile()
+            with self._lock:
+                profiles.append(thread_profile)
+            thread_profile.enable()
+
+        if not self.PROFILES_EVERY_THREAD:
+            threading.setprofile(start_thread_profile)
+        profiles[0].enable()
+        try:
+            yield
+        finally:
+            profiles[0].disable()
+            threading.setprofile(None)
+            stats = self.merge(profiles)
+            self.save(stats, product_name)
+
+    @staticmethod
+    def merge(profiles: list[cProfile.Profile]) -> pstats.Stats:
+        """Returns the stats of the profiles merged, skipping the empty ones."""
+        stats = pstats.Stats()
+        for profile in profiles:
+            profile.create_stats()
+            if profile.stats:
+                stats.add(profile)
+        return stats
+
+    def save(self, stats: pstats.Stats, product_name: str):
+        """Save the stats to the product .prof file, and log their summary."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = self.get_path(product_name)
+        stats.dump_stats(path)
+        self.logger.info("(%s) Profile saved to %s", product_name, path)
+        self.logger.info(
+            "(%s) Top %d functions by %s:\n%s",
+            product_name,
+            self.top,
+            self.SORT_KEY,
+            self.format_summary(stats, self.top),
+        )
+
+    @staticmethod
+    def format_summary(stats: pstats.Stats, top: int = DEFAULT_TOP) -> str:
+        """Returns the top functions of the stats, as printed by pstats."""
+        stream = io.StringIO()
+        stats.stream = stream
+        stats.sort_stats(ProductProfiler.SORT_KEY).print_stats(top)
+        return stream.getvalue().strip("\n")
@@ -0,0 +1,235 @@
+"""Module for ProgressReporter class declaration."""
+import json
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, ClassVar, Optional, TextIO
+
+
+@dataclass
+class ProgressSnapshot:
+    """Progress of a run at a point in time."""
+
+    elapsed: float
+    products_done: int
+    products_total: int
+    discovery_done: bool
+    outputs: int
+    megapixels: float
+    outputs_per_second: float
+    megapixels_per_second: float
+    queued: dict[str, int] = field(default_factory=dict)
+    running: dict[str, int] = field(default_factory=dict)
+    eta: Optional[float] = None
+
+    def format_bar(self, width: int = 24) -> str:
+        """Returns the snapshot as a single line progress bar."""
+        filled = 0
+        if self.products_total:
+            filled = width * self.products_done // self.products_total
+        total = f"{self.products_total}{'' if self.discovery_done else '+'}"
+        queued = " ".join(f"{stage}:{count}" for stage, count in self.queued.items())
+        eta = "--:--:--" if self.eta is None else self.format_duration(self.eta)
+        return (
+            f"[{'#' * filled}{'-' * (width - filled)}] "
+            f"{self.products_done}/{total} products | "
+            f"{self.outputs_per_second:.1f} out/s | "
+            f"{self.megapixels_per_second:.1f} MP/s | "
+            f"queued {queued or '-'} | ETA {eta}"
+        )
+
+    def to_json(self) -> str:
+        """Returns the snapshot as a JSON line."""
+        return json.dumps({"time": round(time.time(), 3), **asdict(self)})
+
+    @staticmethod
+    def format_duration(seconds: float) -> str:
+        """Returns the duration as H:MM:SS."""
+        minutes, seconds = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+class ProgressReporter:
+    """
+    Report the progress of a run, as a TTY progress bar or as JSON lines.
+
+    The scheduler and renderers record events with ProgressReporter.record,
+    which appends to a deque without taking any lock, or does nothing when
+    no reporter is started. A background thread drains the events every
+    interval, and renders the products done, the outputs and megapixels per
+    second over the last RATE_WINDOW seconds, the depth of each stage queue
+    and the ETA. Events are:
+        - PRODUCT_FOUND: a product was submitted.
+        - DISCOVERY_DONE: every product was submitted, the total is known.
+        - QUEUED, STARTED, DONE: a stage (the value) of a product was queued,
+            started or done.
+        - PRODUCT_DONE: every stage of a product is done.
+        - OUTPUT: an output was written, the value being its pixels count.
+    """
+
+    PRODUCT_FOUND: ClassVar[str] = "product_found"
+    DISCOVERY_DONE: ClassVar[str] = "discovery_done"
+    QUEUED: ClassVar[str] = "queued"
+    STARTED: ClassVar[str] = "started"
+    DONE: ClassVar[str] = "done"
+    PRODUCT_DONE: ClassVar[str] = "product_done"
+    OUTPUT: ClassVar[str] = "output"
+
+    MODES: ClassVar[tuple[str, ...]] = ("bar", "json")
+    DEFAULT_INTERVALS: ClassVar[dict[str, float]] = {"bar": 0.5, "json": 10.0}
+    RATE_WINDOW: ClassVar[float] = 10.0
+
+    active: ClassVar[Optional["ProgressReporter"]] = None
+
+    mode: str
+    interval: float
+    stream: TextIO
+
+    def __init__(
+        self,
+        mode: str = "bar",
+        interval: Optional[float] = None,
+        stream: Optional[TextIO] = None,
+    ):
+        """
+        Args:
+            mode (str): "bar" to render a progress bar, "json" for JSON lines.
+            interval (float): Seconds between two renders, depends on mode if None.
+            stream (TextIO): Stream to render to, stderr if None.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f'Unknown progress mode "{mode}": {self.MODES}')
+        self.mode = mode
+        self.interval = self.DEFAULT_INTERVALS[mode] if interval is None else interval
+        self.stream = sys.stderr if stream is None else stream
+        self._events: deque[tuple[str, Any]] = deque()
+        self._start = time.monotonic()
+        self._products_done = 0
+        self._products_total = 0
+        self._discovery_done = False
+        self._outputs = 0
+        self._pixels = 0
+        self._queued: dict[str, int] = {}
+        self._running: dict[str, int] = {}
+        # (time, outputs, pixels), the first one being the rate baseline
+        self._samples: deque[tuple[float, int, int]] = deque([(self._start, 0, 0)])
+        self._stop_event = threading.Event()
+        self._renderer: Optional[threading.Thread] = None
+
+    @staticmethod
+    def get_mode(mode: str, stream: Optional[TextIO] = None) -> str:
+        """Returns the mode, "auto" being a bar on a TTY and JSON lines otherwise."""
+        if mode != "auto":
+            return mode
+        stream = sys.stderr if stream is None else stream
+        return "bar" if stream.isatty() else "json"
+
+    @staticmethod
+    def start(reporter: "ProgressReporter") -> "ProgressReporter":
+        """Start rendering the progress, returns the active reporter."""
+        reporter.open()
+        ProgressReporter.active = reporter
+        return reporter
+
+    @staticmethod
+    def stop() -> Optional["ProgressReporter"]:
+        """Stop rendering the progress, returns the stopped reporter."""
+        reporter, ProgressReporter.active = ProgressReporter.active, None
+        if reporter is not None:
+            reporter.close()
+        return reporter
+
+    @staticmethod
+    def record(event: str, value: Any = None):
+        """Record an event, if a reporter is started."""
+        reporter = ProgressReporter.active
+        if reporter is not None:
+            # deque.append is atomic, the hot path never waits on a lock
+            reporter._events.append((event, value))
+
+    def open(self):
+        """Start the background renderer."""
+        self._stop_event.clear()
+        self._renderer = threading.Thread(
+            target=self._render_loop, name="picgenius-progress", daemon=True
+        )
+        self._renderer.start()
+
+    def close(self):
+        """Stop the background renderer, and render the final progress."""
+        self._stop_event.set()
+        if self._renderer is not None:
+            self._renderer.join()
+        self.render(final=True)
+
+    def snapshot(self) -> ProgressSnapshot:
+        """Returns the progress, after applying the recorded events."""
+        self._drain()
+        now = time.monotonic()
+        elapsed = now - self._start
+        self._samples.append((now, self._outputs, self._pixels))
+        # Keep the newest sample at least RATE_WINDOW old as the baseline
+        while len(self._samples) > 2 and now - self._samples[1][0] >= self.RATE_WINDOW:
+            self._samples.popleft()
+
+        since, outputs, pixels = self._samples[0]
+        duration = max(now - since, 1e-9)
+
+        eta = None
+        if self._products_done:
+            remaining = self._products_total - self._products_done
+            eta = remaining * elapsed / self._products_done
+
+        return ProgressSnapshot(
+            elapsed=elapsed,
+            products_done=self._products_done,
+            products_total=self._products_total,
+            discovery_done=self._discovery_done,
+            outputs=self._outputs,
+            megapixels=self._pixels / 1e6,
+            outputs_per_second=(self._outputs - outputs) / duration,
+            megapixels_per_second=(self._pixels - pixels) / 1e6 / duration,
+            queued=dict(self._queued),
+            running=dict(self._running),
+            eta=eta,
+        )
+
+    def render(self, final: bool = False):
+        """Render the progress to the stream."""
+        snapshot = self.snapshot()
+        if self.mode == "bar":
+            self.stream.write(f"\r{snapshot.format_bar()}" + ("\n" if final else ""))
+        else:
+            self.stream.write(snapshot.to_json() + "\n")
+        self.stream.flush()
+
+    def _drain(self):
+        """Apply the recorded events, from the renderer thread only."""
+        while True:
+            try:
+                event, value = self._events.popleft()
+            except IndexError:
+                return
+            if event == self.OUTPUT:
+                self._outputs += 1
+                self._pixels += value
+            elif event == self.QUEUED:
+                self._queued[value] = self._queued.get(value, 0) + 1
+            elif event == self.STARTED:
+                self._queued[value] = self._queued.get(value, 0) - 1
+                self._running[value] = self._running.get(value, 0) + 1
+            elif event == self.DONE:
+                self._running[value] = self._running.get(value, 0) - 1
+            elif event == self.PRODUCT_FOUND:
+                self._products_total += 1
+            elif event == self.PRODUCT_DONE:
+                self._products_done += 1
+            elif event == self.DISCOVERY_DONE:
+                self._discovery_done = True
+
+    def _render_loop(self):
+        while not self._stop_event.wait(self.interval):
+            self.render()
@@ -1,57 +1,164 @@
 """Module for DesignRenderer class declaration."""
-from typing import Generator
+from typing import Generator, Iterable, Optional
 from PIL import Image
 
 
 from picgenius import processing as im
 from picgenius.models import Format, Design
+from picgenius.tracing import Tracer
+from picgenius.upscaling import UpscaleCache, UpscalePlan
+from picgenius.upscaling.plan import UpscaleChain
 
 
 class DesignRenderer:
     """A class that provides methods to render images based on designs."""
 
+    upscale_cache: Optional[UpscaleCache] = UpscaleCache()
+
     @staticmethod
     def generate_design_formats(
-        design: Design, design_formats: list[Format]
+        design: Design,
+        design_formats: list[Format],
+        auto_upscale: bool = False,
+        cpu: bool = False,
     ) -> Generator:
-        """Generate formatted design."""
-        image = Image.open(design.path)
+        """
+        Generate formatted design.
+
+        With auto_upscale, the design is first upscaled in memory at the minimum
+        scale needed by the largest format, instead of being simply resized.
+        """
+        scale = None
+        if auto_upscale:
+            scale = DesignRenderer.get_minimum_upscale(
+                design.source.size, design_formats
+            )
+        if scale is not None:
+            image = DesignRenderer.upscale_design(design, scale, cpu=cpu)
+        else:
+            image = design.load_image()
+
         for design_format in design_formats:
-            ppi = design_format.ppi
-            inches_x, inches_y = design_format.inches
-            size_in_pixels = (inches_x * ppi, inches_y * ppi)
+            size_in_pixels = DesignRenderer.get_format_size(design_format)
 
             formatted_image = im.resize_and_crop(image, *size_in_pixels)
-            filename = f"{design.name}-{inches_x}-{inches_y}.{design_format.extension}"
+            filename = DesignRenderer.get_format_filename(design, design_format)
             yield (formatted_image, filename)
 
     @staticmethod
-    def upscale_design(design: Design, scale: int, cpu: bool = False) -> Image.Image:
-        """Generate upscaled design."""
-        assert scale in [2, 4, 8, 10, 12, 16]
+    def get_format_filename(design: Design, design_format: Format) -> str:
+        """Returns the filename of the formatted design."""
+        inches_x, inches_y = design_format.inches
+        return f"{design.name}-{inches_x}-{inches_y}.{design_format.extension}"
+
+    @staticmethod
+    def get_format_size(design_format: Format) -> tuple[int, int]:
+        """Returns the size in pixels of the format."""
+        ppi = design_format.ppi
+        inches_x, inches_y = design_format.inches
+        return (inches_x * ppi, inches_y * ppi)
+
+    @staticmethod
+    def get_minimum_upscale(
+        image_size: tuple[int, int], design_formats: list[Format]
+    ) -> Optional[int]:
+        """
+        Returns the minimum available upscale needed for the image to fill every
+        format without being upsampled, or None if the image is large enough.
+        The largest available scale is returned if none is enough.
+        """
+        width, height = image_size
+        needed_scale = max(
+            (
+                max(format_width / width, format_height / height)
+                for format_width, format_height in map(
+                    DesignRenderer.get_format_size, design_formats
+                )
+            ),
+            default=1.0,
+        )
+        if needed_scale <= 1.0:
+            return None
+
+        for scale in UpscalePlan.AVAILABLE_SCALES:
+            if scale >= needed_scale:
+                return scale
+        return UpscalePlan.AVAILABLE_SCALES[-1]
+
+    @staticmethod
+    def upscale_design(
+        design: Design,
+        scale: int,
+        cpu: bool = False,
+        use_cache: bool = True,
+    ) -> Image.Image:
+        """Generate upscaled design, or load it from the upscale cache."""
+        assert scale in UpscalePlan.AVAILABLE_SCALES
 
-        image = Image.open(design.path)
-        if scale == 16:
-            upscaled_image = im.upscale_image(image, 2, cpu=cpu)
-            upscaled_image = im.upscale_image(upscaled_image, 8, cpu=cpu)
-        elif scale == 12:
-            upscaled_image = im.upscale_image(image, 4, cpu=cpu)
-            width, height = upscaled_image.size
-            upscaled_image = upscaled_image.resize(
-                (width * 3 // 4, height * 3 // 4), Image.LANCZOS
+        with Tracer.span("upscale", design=design.name, scale=scale):
+            upscaled_images = dict(
+                DesignRenderer.upscale_design_scales(
+                    design, [scale], cpu=cpu, use_cache=use_cache
+                )
             )
-            upscaled_image = im.upscale_image(upscaled_image, 4, cpu=cpu)
-        elif scale == 10:
-            upscaled_image = im.upscale_image(image, 4, cpu=cpu)
-            width, height = upscaled_image.size
-            upscaled_image = upscaled_image.resize(
-                (width * 5 // 8, height * 5 // 8), Image.LANCZOS
+        return upscaled_images[scale]
+
+    @staticmethod
+    def upscale_design_scales(
+        design: Design,
+        scales: Iterable[int],
+        cpu: bool = False,
+        use_cache: bool = True,
+    ) -> Generator[tuple[int, Image.Image], None, None]:
+        """
+        Generate the design upscaled at each of the given scales.
+
+        Intermediate upscales shared by several scales are run only once,
+        and are loaded from the upscale cache when possible.
+        """
+        plan = UpscalePlan(scales)
+        cache = DesignRenderer.upscale_cache if use_cache else None
+
+        if cache is None:
+            yield from plan.execute(design.load_image, cpu=cpu)
+            return
+
+        content_hash = UpscaleCache.hash_file(design.path)
+
+        def lookup(chain: UpscaleChain) -> Optional[Image.Image]:
+            cache_key = DesignRenderer._get_chain_cache_key(content_hash, chain)
+            return cache.load_image(cache_key)
+
+        for scale, upscaled_image in plan.execute(
+            design.load_image, cpu=cpu, lookup=lookup
+        ):
+            cache_key = DesignRenderer._get_chain_cache_key(
+                content_hash, plan.get_chain(scale)
             )
-            upscaled_image = im.upscale_image(upscaled_image, 4, cpu=cpu)
-        else:
-            upscaled_image = im.upscale_image(image, scale, cpu=cpu)
+            if cache.lookup(cache_key, UpscaleCache.IMAGE_EXTENSION) is None:
+                cache.store_image(cache_key, upscaled_image)
+            yield (scale, upscaled_image)
 
-        return upscaled_image
+    @staticmethod
+    def get_upscale_cache_key(
+        design: Design, scale: int, content_hash: Optional[str] = None
+    ) -> str:
+        """Returns the upscale cache key of the design at the given scale."""
+        if content_hash is None:
+            content_hash = UpscaleCache.hash_file(design.path)
+        return DesignRenderer._get_chain_cache_key(
+            content_hash, UpscalePlan.CHAINS[scale]
+        )
+
+    @staticmethod
+    def _get_chain_cache_key(content_hash: str, chain: UpscaleChain) -> str:
+        weights_identity = ",".join(
+            im.get_weights_identity(model_scale)
+            for model_scale in UpscalePlan.get_model_scales(chain)
+        )
+        return UpscaleCache.build_key(
+            content_hash, UpscalePlan.get_chain_label(chain), weights_identity
+        )
 
     @staticmethod
     def _try_upscale_image(image: Image.Image, scale: int):
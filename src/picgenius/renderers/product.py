@@ -2,10 +2,14 @@
 import random
 import os
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional
 
 from PIL import Image
 
-from picgenius.models import Product
+from picgenius.manifest import BuildManifest
+from picgenius.models import Design, Product, Template
+from picgenius.progress import ProgressReporter
+from picgenius.tracing import Tracer
 from .template import TemplateRenderer
 from .video import VideoRenderer
 from .design import DesignRenderer
@@ -18,27 +22,63 @@ class ProductRenderer:
     VISUALS_FOLDER = "visuals"
 
     @staticmethod
-    def generate_templates(product: Product, output_dir: str, max_threads: int = 10):
-        """Generate product templates."""
+    def generate_templates(
+        product: Product,
+        output_dir: str,
+        max_threads: int = 10,
+        manifest: Optional[BuildManifest] = None,
+    ):
+        """
+        Generate product templates.
+
+        With a manifest, the templates whose inputs didn't change are skipped.
+        """
 
         output_dir = ProductRenderer.prepare_visuals_output_dir(output_dir, product)
 
         with ThreadPoolExecutor(max_workers=max_threads) as executor:
-            futures = []
-            for generated_visual, template in TemplateRenderer.generate_templates(
+            futures_to_outputs = {}
+            for template, designs in TemplateRenderer.iter_template_designs(
                 product.type.templates, product.designs
             ):
+                output_path = os.path.join(output_dir, template.filename)
+                fingerprint = None
+                if manifest is not None:
+                    fingerprint = ProductRenderer.get_template_fingerprint(
+                        manifest, template, designs
+                    )
+                    if manifest.is_up_to_date(output_path, fingerprint):
+                        continue
+
                 future = executor.submit(
-                    ProductRenderer.save_image,
-                    generated_visual,
+                    Tracer.bind(ProductRenderer.save_image),
+                    TemplateRenderer.generate_template(template, designs),
                     output_dir,
                     template.filename,
                 )
-                futures.append(future)
+                futures_to_outputs[future] = (output_path, fingerprint)
 
             # Wait for all threads to complete
-            for future in as_completed(futures):
+            for future in as_completed(futures_to_outputs):
                 future.result()
+                output_path, fingerprint = futures_to_outputs[future]
+                if manifest is not None:
+                    manifest.record(output_path, fingerprint)
+
+    @staticmethod
+    def get_template_fingerprint(
+        manifest: BuildManifest, template: Template, designs: list[Design]
+    ) -> str:
+        """Returns the fingerprint of the template generated with the designs."""
+        return manifest.fingerprint(
+            template,
+            files=[
+                template.path,
+                *(image_element.path for image_element in template.images),
+                *(watermark.font_path for watermark in template.watermarks),
+                *(design.path for design in designs),
+            ],
+        )
 
     @staticmethod
     def generate_video(
@@ -46,8 +86,13 @@ class ProductRenderer:
         output_dir: str,
         design_index: int = 0,
         random_design: bool = False,
+        manifest: Optional[BuildManifest] = None,
     ):
-        """Generate product video."""
+        """
+        Generate product video.
+
+        With a manifest, the video is skipped if its inputs didn't change.
+        """
         if product.type.video_settings is None:
             return
 
@@ -60,15 +105,44 @@ class ProductRenderer:
         output_dir = ProductRenderer.prepare_visuals_output_dir(output_dir, product)
         output_path = os.path.join(output_dir, video_settings.filename)
 
-        image = Image.open(design.path)
+        fingerprint = None
+        if manifest is not None:
+            fingerprint = manifest.fingerprint(
+                video_settings,
+                files=[
+                    design.path,
+                    *(watermark.font_path for watermark in video_settings.watermarks),
+                ],
+            )
+            if manifest.is_up_to_date(output_path, fingerprint):
+                return
+
+        image = design.load_image()
         video = VideoRenderer.generate_video(image, video_settings)
-        video.write_videofile(output_path, verbose=False, logger=None)
+        with Tracer.span("ffmpeg", filename=video_settings.filename):
+            video.write_videofile(output_path, verbose=False, logger=None)
+        width, height = video_settings.format
+        frames_count = len(range(0, video_settings.frames, video_settings.step))
+        ProgressReporter.record(ProgressReporter.OUTPUT, width * height * frames_count)
+        if manifest is not None:
+            manifest.record(output_path, fingerprint)
 
     @staticmethod
     def generate_formatted_designs(
-        product: Product, output_dir: str, max_threads: int = 10
+        product: Product,
+        output_dir: str,
+        max_threads: int = 10,
+        auto_upscale: bool = False,
+        cpu: bool = False,
+        manifest: Optional[BuildManifest] = None,
     ):
-        """Generate formatted designs."""
+        """
+        Generate formatted designs.
+
+        With auto_upscale, designs too small for the formats are upscaled
+        in memory at the minimum needed scale before being formatted.
+        With a manifest, the designs whose formats are all up to date are skipped.
+        """
 
         for design in product.designs:
             formats = product.type.formats
@@ -78,34 +152,61 @@ class ProductRenderer:
                 output_dir, product, design_name
             )
 
+            fingerprint = None
+            if manifest is not None:
+                fingerprint = manifest.fingerprint(
+                    formats, auto_upscale, files=[design.path]
+                )
+                output_paths = [
+                    os.path.join(
+                        formatted_dir,
+                        DesignRenderer.get_format_filename(design, design_format),
+                    )
+                    for design_format in formats
+                ]
+                if all(
+                    manifest.is_up_to_date(output_path, fingerprint)
+                    for output_path in output_paths
+                ):
+                    continue
+
             design_formats = DesignRenderer.generate_design_formats(
                 design,
                 formats,
+                auto_upscale=auto_upscale,
+                cpu=cpu,
             )
 
             with ThreadPoolExecutor(max_workers=max_threads) as executor:
-                futures = []
+                futures_to_filenames = {}
                 for formatted_image, filename in design_formats:
                     future = executor.submit(
-                        ProductRenderer.save_image,
+                        Tracer.bind(ProductRenderer.save_image),
                         formatted_image,
                         formatted_dir,
                         filename,
                     )
-                    futures.append(future)
+                    futures_to_filenames[future] = filename
 
                 # Wait for all threads to complete
-                for future in as_completed(futures):
+                for future in as_completed(futures_to_filenames):
                     future.result()
+                    if manifest is not None:
+                        output_path = os.path.join(
+                            formatted_dir, futures_to_filenames[future]
+                        )
+                        manifest.record(output_path, fingerprint)
 
     @staticmethod
     def save_image(image: Image.Image, output_dir: str, filename: str):
         """Save image to output_dir."""
-        output_path = os.path.join(output_dir, filename)
-        if filename.endswith(".jpg"):
-            image = image.convert("RGB")
-        image.save(output_path)
-        image.close()
+        with Tracer.span("encode", filename=filename):
+            output_path = os.path.join(output_dir, filename)
+            if filename.endswith(".jpg"):
+                image = image.convert("RGB")
+            image.save(output_path)
+            ProgressReporter.record(ProgressReporter.OUTPUT, image.width * image.height)
+            image.close()
 
     @staticmethod
     def prepare_formatted_output_dir(base_dir: str, product: Product, design_name: str):
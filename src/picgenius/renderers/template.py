@@ -1,11 +1,14 @@
 """Module for TemplateRenderer class declaration."""
-from typing import Generator, Optional
+from typing import Generator, Iterable, Optional
 from PIL import Image
 
 
 from picgenius import processing as im
+from picgenius.compositing import Compositor
+from picgenius.image_source import ImageCache, ImageSource
 from picgenius.models import Template, TemplateElement, Design, TemplateImageElement
 from picgenius.renderers import WatermarkRenderer
+from picgenius.tracing import Tracer
 
 
 class TemplateRenderer:
@@ -14,17 +17,32 @@ class TemplateRenderer:
     and apply watermarks.
     """
 
+    # Keeps the template images decoded between renders, set by long-running processes
+    image_cache: Optional[ImageCache] = None
+    # Sources of the template and image element files, already probed by the preflight
+    sources: dict[str, ImageSource] = {}
+
     @staticmethod
     def generate_templates(
         templates: list[Template], designs: list[Design]
     ) -> Generator:
         """Generate all templates for the given list of designs."""
+        for template, next_designs in TemplateRenderer.iter_template_designs(
+            templates, designs
+        ):
+            yield (TemplateRenderer.generate_template(template, next_designs), template)
+
+    @staticmethod
+    def iter_template_designs(
+        templates: list[Template], designs: list[Design]
+    ) -> Generator[tuple[Template, list[Design]], None, None]:
+        """Yield each template with the designs to fit in it, without rendering."""
         design_index = 0
         for template in templates:
             design_index, next_designs = TemplateRenderer._get_next_designs(
                 template, designs, design_index
             )
-            yield (TemplateRenderer.generate_template(template, next_designs), template)
+            yield (template, next_designs)
 
     @staticmethod
     def _get_next_designs(
@@ -57,46 +75,69 @@ class TemplateRenderer:
         Returns:
             Image.Image: The generated image with designs fitted into the template.
         """
+        with Tracer.span("template", template=template.name):
+            template_image = TemplateRenderer._create_template_image(template)
 
-        template_image = TemplateRenderer._create_template_image(template)
+            for design, element in zip(designs, template.elements):
+                design_image = design.load_image()
+                design_image = TemplateRenderer._design_pre_treatment(
+                    design_image, element
+                )
 
-        for design, element in zip(designs, template.elements):
-            design_image = design.load_image()
-            design_image = TemplateRenderer._design_pre_treatment(design_image, element)
+                template_image = TemplateRenderer._template_element_integration(
+                    template_image,
+                    design_image,
+                    element,
+                )
 
-            template_image = TemplateRenderer._template_element_integration(
-                template_image,
-                design_image,
-                element,
-            )
+            for image_element in template.images:
+                TemplateRenderer.paste_image_on_template_image(
+                    template_image, image_element
+                )
 
-        for image_element in template.images:
-            TemplateRenderer.paste_image_on_template_image(
-                template_image, image_element
-            )
+            for watermark in template.watermarks:
+                template_image = WatermarkRenderer.apply_watermarking(
+                    template_image, watermark
+                )
 
-        for watermark in template.watermarks:
-            template_image = WatermarkRenderer.apply_watermarking(
-                template_image, watermark
-            )
-
-        return template_image
+            return template_image
 
     @staticmethod
     def _create_template_image(template: Template) -> Image.Image:
         if template.path is not None:
-            return Image.open(template.path)
+            return TemplateRenderer.load_image(template.path)
         else:
             return Image.new("RGBA", template.size, template.background_color)
 
+    @staticmethod
+    def add_sources(sources: Iterable[ImageSource]):
+        """Reuse the image sources, such as the ones probed by the preflight."""
+        for source in sources:
+            TemplateRenderer.sources[source.path] = source
+
+    @staticmethod
+    def get_source(path: str) -> ImageSource:
+        """Returns the image source of a template or image element file."""
+        source = TemplateRenderer.sources.get(path)
+        if source is None:
+            source = TemplateRenderer.sources[path] = ImageSource(path)
+        return source
+
+    @staticmethod
+    def load_image(path: str) -> Image.Image:
+        """Load a template image, through the image cache if any."""
+        source = TemplateRenderer.get_source(path)
+        if TemplateRenderer.image_cache is not None:
+            return TemplateRenderer.image_cache.load(path, source)
+        return source.load()
+
     @staticmethod
     def _design_pre_treatment(
         image: Image.Image, element: TemplateElement
     ) -> Image.Image:
         image = TemplateRenderer._apply_ratio(image, element)
         image = TemplateRenderer._apply_zoom(image, element)
-        image = TemplateRenderer._apply_overlay(image, element)
-        image = TemplateRenderer._apply_transparency(image, element)
+        image = TemplateRenderer._apply_overlay_and_transparency(image, element)
         return image
 
     @staticmethod
@@ -112,18 +153,11 @@ class TemplateRenderer:
         return image
 
     @staticmethod
-    def _apply_overlay(image: Image.Image, element: TemplateElement) -> Image.Image:
-        if element.overlay is not None:
-            return im.apply_transparent_overlay(image, element.overlay)
-        return image
-
-    @staticmethod
-    def _apply_transparency(image: Image.Image, element: TemplateElement):
-        if element.transparency is not None and element.transparency < 1.0:
-            image = image.convert("RGBA")
-            image.putalpha(int(element.transparency * 255))
-            image.paste(image, (0, 0), image)
-        return image
+    def _apply_overlay_and_transparency(
+        image: Image.Image, element: TemplateElement
+    ) -> Image.Image:
+        # A single pass over the pixels for both
+        return Compositor.composite(image, element.overlay, element.transparency)
 
     @staticmethod
     def _template_element_integration(
@@ -179,12 +213,13 @@ class TemplateRenderer:
         Returns:
             Image.Image: The template image with the design pasted.
         """
-        resized_design = im.resize_and_crop(design, *size)
-        if resized_design.mode == "RGBA":
-            template.paste(resized_design, position[:], resized_design)
-        else:
-            template.paste(resized_design, position[:])
-        return template
+        with Tracer.span("fit_design"):
+            resized_design = im.resize_and_crop(design, *size)
+            if resized_design.mode == "RGBA":
+                template.paste(resized_design, position[:], resized_design)
+            else:
+                template.paste(resized_design, position[:])
+            return template
 
     @staticmethod
     def _fit_design_in_transformed_template(
@@ -207,49 +242,48 @@ class TemplateRenderer:
         Returns:
             Image.Image: The template image with the design pasted.
         """
-        working_design = design.copy()
-        working_design = im.proportional_overlap_resize(working_design, template)
-
-        tl, tr, bl, br = position
-        width, height = working_design.size
-        input_points = [(0, 0), (width, 0), (0, height), (width, height)]
-        output_points = [tl, tr, bl, br]
-        coeffs = im.find_coeffs(input_points, output_points)
-
-        transformed_design = im.perspective_transform(
-            working_design.convert("RGBA"), coeffs
-        )
+        with Tracer.span("fit_design_in_transformed_template"):
+            working_design = design.copy()
+            working_design = im.proportional_overlap_resize(working_design, template)
+
+            tl, tr, bl, br = position
+            width, height = working_design.size
+            input_points = [(0, 0), (width, 0), (0, height), (width, height)]
+            output_points = [tl, tr, bl, br]
+            coeffs = im.find_coeffs(input_points, output_points)
+
+            transformed_design = im.perspective_transform(
+                working_design.convert("RGBA"), coeffs
+            )
 
-        transformed_design = im.smooth_integration(
-            transformed_design, output_points, smooth_power=2
-        )
+            transformed_design = im.smooth_integration(
+                transformed_design, output_points, smooth_power=2
+            )
 
-        template.paste(transformed_design, (0, 0), transformed_design)
-        return template
+            template.paste(transformed_design, (0, 0), transformed_design)
+            return template
 
     @staticmethod
     def paste_image_on_template_image(
         template_image: Image.Image, image_element: TemplateImageElement
     ):
         """Paste the image element on the specified template image."""
-        image = image_element.load_image()
-        image_size = TemplateRenderer._calculate_image_element_size(
-            image_element, image.size, template_image.size
-        )
-        image = image.resize(image_size, Image.LANCZOS)
-
-        if image_element.transparency < 1.0:
-            tmp_image = image.copy()
-            tmp_image.putalpha(int(image_element.transparency * 255))
-            image.paste(tmp_image, (0, 0), image)
-
-        image_position = TemplateRenderer._calculate_image_element_position(
-            image_element, image.size, template_image.size
-        )
-
-        if image.mode != "RGBA":
-            image = image.convert("RGBA")
-        return template_image.paste(image, image_position[:], image)
+        with Tracer.span("paste_image", image=image_element.path):
+            image = TemplateRenderer.load_image(image_element.path)
+            image_size = TemplateRenderer._calculate_image_element_size(
+                image_element, image.size, template_image.size
+            )
+            image = image.resize(image_size, Image.LANCZOS)
+
+            image = Compositor.composite(image, transparency=image_element.transparency)
+
+            image_position = TemplateRenderer._calculate_image_element_position(
+                image_element, image.size, template_image.size
+            )
+
+            if image.mode != "RGBA":
+                image = image.convert("RGBA")
+            return template_image.paste(image, image_position[:], image)
 
     @staticmethod
     def _calculate_image_element_size(
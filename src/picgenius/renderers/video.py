@@ -1,13 +1,18 @@
 """Module for VideoRenderer class declaration."""
 
 import random
+from typing import TYPE_CHECKING
+
 import numpy as np
-from moviepy.editor import ImageSequenceClip
 from PIL import Image
 
 from picgenius import processing as im
 from picgenius.models import VideoSettings, Watermark
 from picgenius.renderers import WatermarkRenderer
+from picgenius.tracing import Tracer
+
+if TYPE_CHECKING:
+    from moviepy.editor import ImageSequenceClip
 
 
 class VideoRenderer:
@@ -16,22 +21,28 @@ class VideoRenderer:
     @staticmethod
     def generate_video(
         image: Image.Image, video_settings: VideoSettings
-    ) -> ImageSequenceClip:
+    ) -> "ImageSequenceClip":
         """Generate a video according to the given video settings."""
-        base_image = im.resize_and_crop(image, *video_settings.format)
+        # moviepy is slow to import, only the video generation needs it
+        from moviepy.editor import (  # pylint: disable=import-outside-toplevel
+            ImageSequenceClip,
+        )
 
-        for watermark in video_settings.watermarks:
-            base_image = VideoRenderer._apply_watermark(
-                base_image.convert("RGBA"), watermark
-            )
+        with Tracer.span("video_frames"):
+            base_image = im.resize_and_crop(image, *video_settings.format)
 
-        frames = VideoRenderer.generate_video_frames(
-            base_image, video_settings.frames, video_settings.step
-        )
-        # TODO: frames = VideoRenderer._generate_movement_frames(base_image, video_settings)
-        np_frames = [np.array(img) for img in frames]
-        video = ImageSequenceClip(np_frames, fps=20)
-        return video
+            for watermark in video_settings.watermarks:
+                base_image = VideoRenderer._apply_watermark(
+                    base_image.convert("RGBA"), watermark
+                )
+
+            frames = VideoRenderer.generate_video_frames(
+                base_image, video_settings.frames, video_settings.step
+            )
+            # TODO: frames = VideoRenderer._generate_movement_frames(base_image, video_settings)
+            np_frames = [np.array(img) for img in frames]
+            video = ImageSequenceClip(np_frames, fps=20)
+            return video
 
     @staticmethod
     def generate_video_frames(image: Image.Image, frames: int = 100, step=1):
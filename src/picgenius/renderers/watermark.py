@@ -3,6 +3,7 @@ from PIL import Image
 
 from picgenius.models import Watermark, Textbox
 from picgenius import processing as im
+from picgenius.tracing import Tracer
 
 
 class WatermarkRenderer:
@@ -11,25 +12,25 @@ class WatermarkRenderer:
     @staticmethod
     def apply_watermarking(image: Image.Image, watermark: Watermark) -> Image.Image:
         """Read and applies the watermarking on the image."""
+        with Tracer.span("watermark", text=watermark.text):
+            width = WatermarkRenderer._calculate_width(image.width, watermark)
+            font = im.find_font_size(watermark.text, watermark.font_path, width)
 
-        width = WatermarkRenderer._calculate_width(image.width, watermark)
-        font = im.find_font_size(watermark.text, watermark.font_path, width)
+            textbox_kwargs = WatermarkRenderer._get_text_box_kwargs(watermark.textbox)
 
-        textbox_kwargs = WatermarkRenderer._get_text_box_kwargs(watermark.textbox)
+            text_position = WatermarkRenderer._get_text_position(
+                image.size, im.get_text_size(font, watermark.text), watermark
+            )
 
-        text_position = WatermarkRenderer._get_text_position(
-            image.size, im.get_text_size(font, watermark.text), watermark
-        )
-
-        watermarked = im.paste_text_on_image(
-            image,
-            watermark.text,
-            font,
-            text_position,
-            color=watermark.color,
-            **textbox_kwargs,
-        )
-        return watermarked
+            watermarked = im.paste_text_on_image(
+                image,
+                watermark.text,
+                font,
+                text_position,
+                color=watermark.color,
+                **textbox_kwargs,
+            )
+            return watermarked
 
     @staticmethod
     def _calculate_width(image_width: int, watermark: Watermark) -> int:
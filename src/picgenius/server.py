@@ -0,0 +1,277 @@
+"""Module for RenderServer class declaration."""
+import hmac
+import json
+import os
+import secrets
+import socketserver
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import ClassVar, Optional
+
+from picgenius.config import ConfigLoader
+from picgenius.controller import Controller
+from picgenius.discovery import DirectoryIndex
+from picgenius.image_source import ImageCache
+from picgenius.logger import PicGeniusLogger
+from picgenius.models import ProductType
+from picgenius.preflight import Preflight
+from picgenius.renderers import TemplateRenderer
+
+
+@dataclass
+class RenderJob:
+    """Generation of the assets of the products of a design path."""
+
+    product_type: str
+    design_path: str
+    output_dir: str = "./products"
+    assets: str = "all"
+    force: bool = False
+    auto_upscale: bool = False
+    cpu: bool = False
+    id: str = field(init=False, default_factory=lambda: uuid.uuid4().hex)
+    status: str = field(init=False, default="queued")
+    error: Optional[str] = field(init=False, default=None)
+    created_at: float = field(init=False, default_factory=time.time)
+    started_at: Optional[float] = field(init=False, default=None)
+    finished_at: Optional[float] = field(init=False, default=None)
+
+    AVAILABLE_ASSETS: ClassVar[list[str]] = ["all", "templates", "video", "formats"]
+
+    def __post_init__(self):
+        if self.assets not in self.AVAILABLE_ASSETS:
+            raise ValueError(
+                f"Assets {self.assets} aren't available: {self.AVAILABLE_ASSETS}"
+            )
+
+
+class RenderServer:
+    """
+    Long-running process rendering the jobs submitted to its local API.
+
+    The product types, the design directories index, the decoded template
+    images and the upscale models are kept warm between jobs, so that a job
+    only pays for its own rendering. The config is loaded again when its
+    file changes.
+
+    Every request must carry the server token as an "Authorization: Bearer"
+    header, and jobs must be submitted as application/json, so that a web page
+    can't submit jobs with a simple cross-origin request.
+
+    API:
+        POST /jobs: Submit a RenderJob, given as a JSON object.
+        GET /jobs: List the jobs.
+        GET /jobs/<id>: Returns the job, with its status.
+    """
+
+    DEFAULT_SOCKET_PATH: ClassVar[str] = os.path.join(
+        os.environ.get("XDG_RUNTIME_DIR", tempfile.gettempdir()), "picgenius.sock"
+    )
+
+    config: ConfigLoader
+    index: DirectoryIndex
+    jobs: dict[str, RenderJob]
+    token: str
+
+    def __init__(
+        self,
+        config: ConfigLoader,
+        index: DirectoryIndex,
+        workers: int = 1,
+        token: Optional[str] = None,
+    ):
+        """
+        Args:
+            config (ConfigLoader): Loader of the product types.
+            index (DirectoryIndex): Index shared by the jobs.
+            workers (int): Number of jobs rendered at once.
+            token (str): Bearer token of the API, generated if None.
+        """
+        self.config = config
+        self.index = index
+        self.jobs = {}
+        self.token = token if token else secrets.token_urlsafe(32)
+        self.logger = PicGeniusLogger()
+        self._product_types: dict[str, ProductType] = {}
+        self._config_mtime_ns: Optional[int] = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(workers)
+
+        if TemplateRenderer.image_cache is None:
+            TemplateRenderer.image_cache = ImageCache()
+
+    def get_product_types(self) -> dict[str, ProductType]:
+        """Returns the product types, loading the config again if it changed."""
+        mtime_ns = os.stat(self.config.file_path).st_mtime_ns
+        with self._lock:
+            if mtime_ns != self._config_mtime_ns:
+                self.config = ConfigLoader(self.config.file_path, self.config.cache_dir)
+                self._product_types = self.config.load()
+                self._config_mtime_ns = mtime_ns
+                self.logger.info("Config loaded from %s", self.config.file_path)
+            return self._product_types
+
+    def submit(self, payload: dict) -> RenderJob:
+        """Queue a job from its JSON payload."""
+        try:
+            job = RenderJob(**payload)
+        except TypeError as exc:
+            raise ValueError(f"Invalid job: {exc}") from exc
+        product_type = self.get_product_types().get(job.product_type)
+        if product_type is None:
+            raise ValueError(f'Product type "{job.product_type}" doesn\'t exist.')
+        preflight = Preflight()
+        preflight.check(product_type, job.product_type)
+        TemplateRenderer.add_sources(preflight.sources.values())
+
+        with self._lock:
+            self.jobs[job.id] = job
+        self._executor.submit(self.run_job, job)
+        return job
+
+    def is_authorized(self, authorization: Optional[str]) -> bool:
+        """Returns True if the Authorization header carries the server token."""
+        if authorization is None:
+            return False
+        scheme, _, token = authorization.partition(" ")
+        return scheme.lower() == "bearer" and hmac.compare_digest(
+            token.strip().encode("utf-8"), self.token.encode("utf-8")
+        )
+
+    def run_job(self, job: RenderJob):
+        """Render the job, recording its status."""
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            product_type = self.get_product_types()[job.product_type]
+            controller = Controller(job.design_path, product_type, self.index)
+            if job.assets == "all":
+                controller.generate_products_all_assets(
+                    job.output_dir,
+                    auto_upscale=job.auto_upscale,
+                    cpu=job.cpu,
+                    force=job.force,
+                )
+            elif job.assets == "templates":
+                controller.generate_products_templates(job.output_dir, force=job.force)
+            elif job.assets == "video":
+                controller.generate_products_video(job.output_dir, force=job.force)
+            else:
+                controller.generate_products_formatted_designs(
+                    job.output_dir,
+                    auto_upscale=job.auto_upscale,
+                    cpu=job.cpu,
+                    force=job.force,
+                )
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            job.status = "failed"
+            job.error = "".join(traceback.format_exception_only(exc)).strip()
+            self.logger.error("Job %s failed: %s", job.id, job.error)
+        else:
+            job.status = "done"
+        finally:
+            job.finished_at = time.time()
+
+    def create_http_server(self, host: str, port: int) -> socketserver.BaseServer:
+        """Returns the HTTP server of the API, listening on host:port."""
+        return ThreadingHTTPServer((host, port), self._create_handler())
+
+    def create_unix_server(self, socket_path: str) -> socketserver.BaseServer:
+        """Returns the HTTP server of the API, listening on a Unix socket."""
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        # Only the user running the server can connect
+        previous_umask = os.umask(0o177)
+        try:
+            return _ThreadingUnixHTTPServer(socket_path, self._create_handler())
+        finally:
+            os.umask(previous_umask)
+
+    def close(self):
+        """Wait for the queued jobs."""
+        self._executor.shutdown()
+
+    def _create_handler(self) -> type[BaseHTTPRequestHandler]:
+        return type("Handler", (_JobRequestHandler,), {"render_server": self})
+
+
+class _ThreadingUnixHTTPServer(
+    socketserver.ThreadingMixIn, socketserver.UnixStreamServer
+):
+    """HTTP server listening on a Unix socket."""
+
+    daemon_threads = True
+
+
+class _JobRequestHandler(BaseHTTPRequestHandler):
+    """Handle the requests of the jobs API."""
+
+    render_server: ClassVar[RenderServer]
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """List the jobs, or return one job."""
+        if not self._check_authorization():
+            return
+        path = self.path.rstrip("/")
+        if path == "/jobs":
+            jobs = list(self.render_server.jobs.values())
+            self._send_json(200, [asdict(job) for job in jobs])
+            return
+
+        job_id = path.removeprefix("/jobs/")
+        job = self.render_server.jobs.get(job_id)
+        if not path.startswith("/jobs/") or job is None:
+            self._send_json(404, {"error": "Not found"})
+            return
+        self._send_json(200, asdict(job))
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Submit a job."""
+        if not self._check_authorization():
+            return
+        if self.path.rstrip("/") != "/jobs":
+            self._send_json(404, {"error": "Not found"})
+            return
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.split(";")[0].strip().lower() != "application/json":
+            self._send_json(415, {"error": "Content-Type must be application/json"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("Job must be a JSON object.")
+            job = self.render_server.submit(payload)
+        except ValueError as exc:
+            self._send_json(400, {"error": str(exc)})
+            return
+        self._send_json(202, asdict(job))
+
+    def address_string(self) -> str:
+        # Unix sockets clients have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        self.render_server.logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _check_authorization(self) -> bool:
+        """Send a 401 response unless the request carries the server token."""
+        if self.render_server.is_authorized(self.headers.get("Authorization")):
+            return True
+        self._send_json(401, {"error": "Unauthorized"})
+        return False
+
+    def _send_json(self, status: int, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
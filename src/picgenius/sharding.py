@@ -0,0 +1,129 @@
+"""Module for Sharding class declaration."""
+import hashlib
+import os
+import socket
+from dataclasses import dataclass
+from typing import Callable, ClassVar, Generator, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class Shard:
+    """The index-th of count shards, index starting at 1."""
+
+    index: int
+    count: int
+
+    def __post_init__(self):
+        if not 1 <= self.index <= self.count:
+            raise ValueError(f"Invalid shard {self.label}, expected 1 <= i <= N.")
+
+    @property
+    def label(self) -> str:
+        """Returns the shard as i/N."""
+        return f"{self.index}/{self.count}"
+
+    @staticmethod
+    def parse(value: str) -> "Shard":
+        """Returns the shard of an i/N string."""
+        try:
+            index, count = (int(part) for part in value.split("/"))
+        except ValueError as exc:
+            raise ValueError(f"Invalid shard {value}, expected i/N.") from exc
+        return Shard(index, count)
+
+    @staticmethod
+    def get_bucket(key: str, count: int) -> int:
+        """Returns the bucket of the key, stable across processes and machines."""
+        digest = hashlib.sha1(key.encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") % count
+
+    def owns(self, key: str) -> bool:
+        """Returns True if the key is assigned to this shard."""
+        return self.get_bucket(key, self.count) == self.index - 1
+
+
+class WorkClaims:
+    """
+    Claims of work items through lock files.
+
+    A claim is a file created with O_CREAT | O_EXCL, which is atomic even on
+    shared filesystems, so each item is claimed by a single node. Claims are
+    kept after the run: a new run must use a new claims directory.
+    """
+
+    directory: str
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get_claim_path(self, key: str) -> str:
+        """Returns the lock file path of the key."""
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.lock")
+
+    def claim(self, key: str) -> bool:
+        """Claim the key, returns False if it was already claimed."""
+        try:
+            fd = os.open(
+                self.get_claim_path(key), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644
+            )
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w", encoding="utf-8") as claim_file:
+            claim_file.write(f"{socket.gethostname()}:{os.getpid()} {key}\n")
+        return True
+
+
+class Sharding:
+    """
+    Split work items across nodes sharing a filesystem, with no coordinator.
+
+    Items are assigned to shards by a stable hash of their key. With claims,
+    each node first claims and processes the items of its shard, then claims
+    the leftovers of the other shards, so that fast nodes steal the work of
+    the stragglers.
+    """
+
+    CLAIMS_FOLDER: ClassVar[str] = ".picgenius-claims"
+
+    shard: Shard
+    claims: Optional[WorkClaims]
+
+    def __init__(self, shard: Shard, claims: Optional[WorkClaims] = None):
+        self.shard = shard
+        self.claims = claims
+
+    @staticmethod
+    def get_claims_dir(output_dir: str, run_name: str) -> str:
+        """Returns the claims directory of a run in the output directory."""
+        return os.path.join(output_dir, Sharding.CLAIMS_FOLDER, run_name)
+
+    def select(
+        self, iter_items: Callable[[], Iterable[T]], get_key: Callable[[T], str]
+    ) -> Generator[T, None, None]:
+        """
+        Yield the items to process on this node, claiming them lazily.
+
+        Args:
+            iter_items (Callable): Returns the items, called a second time
+                to steal the items of the other shards.
+            get_key (Callable): Returns the stable key of an item.
+        """
+        for item in iter_items():
+            key = get_key(item)
+            if self.shard.owns(key) and self._claim(key):
+                yield item
+
+        if self.claims is None:
+            return
+
+        for item in iter_items():
+            key = get_key(item)
+            if not self.shard.owns(key) and self._claim(key):
+                yield item
+
+    def _claim(self, key: str) -> bool:
+        return self.claims is None or self.claims.claim(key)
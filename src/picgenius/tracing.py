@@ -0,0 +1,173 @@
+"""Module for Tracer class declaration."""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, ClassVar, ContextManager, Iterator, Optional
+
+
+class Tracer:
+    """
+    Record the spans of the rendering stages, exportable as a Chrome trace.
+
+    A span records its thread, process, duration and arguments such as the
+    product and template names, which are inherited by the spans nested in it
+    on the same thread. Spans are only recorded while a tracer is started:
+    otherwise Tracer.span returns a shared no-op context manager, so that the
+    instrumented code pays a single attribute lookup.
+    """
+
+    active: ClassVar[Optional["Tracer"]] = None
+
+    _NULL_SPAN: ClassVar[ContextManager] = nullcontext()
+
+    events: list[dict]
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._thread_names: dict[int, str] = {}
+        self._origin_ns = time.perf_counter_ns()
+
+    @staticmethod
+    def start(tracer: Optional["Tracer"] = None) -> "Tracer":
+        """Start recording spans, returns the active tracer."""
+        if tracer is None:
+            tracer = Tracer()
+        tracer.open()
+        Tracer.active = tracer
+        return tracer
+
+    @staticmethod
+    def stop() -> Optional["Tracer"]:
+        """Stop recording spans, returns the stopped tracer."""
+        tracer, Tracer.active = Tracer.active, None
+        if tracer is not None:
+            tracer.close()
+        return tracer
+
+    @staticmethod
+    def span(name: str, **args: Any) -> ContextManager:
+        """
+        Returns a context manager recording a span, if a tracer is started.
+
+        Args:
+            name (str): Name of the stage.
+            args: Arguments of the span, such as product or template.
+        """
+        tracer = Tracer.active
+        if tracer is None:
+            return Tracer._NULL_SPAN
+        return tracer.record(name, args)
+
+    @staticmethod
+    def bind(function: Callable) -> Callable:
+        """
+        Returns the function running with the spans arguments of the caller,
+        for the spans of functions submitted to other threads.
+        """
+        tracer = Tracer.active
+        if tracer is None:
+            return function
+
+        args = tracer.get_context()
+
+        @functools.wraps(function)
+        def bound_function(*fargs, **fkwargs):
+            with tracer.inherit(args):
+                return function(*fargs, **fkwargs)
+
+        return bound_function
+
+    @contextmanager
+    def record(self, name: str, args: dict[str, Any]) -> Iterator[None]:
+        """Record a span around the context."""
+        args = {**self.get_context(), **args}
+        token = self.enter_span(name, args)
+        start_ns = time.perf_counter_ns()
+        with self.inherit(args):
+            try:
+                yield
+            finally:
+                end_ns = time.perf_counter_ns()
+                self.exit_span(token)
+                thread = threading.current_thread()
+                event = {
+                    "name": name,
+                    "cat": "picgenius",
+                    "ph": "X",
+                    "ts": (start_ns - self._origin_ns) / 1000,
+                    "dur": (end_ns - start_ns) / 1000,
+                    "pid": os.getpid(),
+                    "tid": thread.ident,
+                    "args": {key: str(value) for key, value in args.items()},
+                }
+                with self._lock:
+                    self.events.append(event)
+                    self._thread_names[thread.ident] = thread.name
+
+    def open(self):
+        """Called when the tracer is started, for subclasses to extend."""
+
+    def close(self):
+        """Called when the tracer is stopped, for subclasses to extend."""
+
+    def enter_span(self, name: str, args: dict[str, Any]) -> Any:
+        """Called when a span starts, returns a token given to exit_span."""
+
+    def exit_span(self, token: Any):
+        """Called when a span ends."""
+
+    def get_context(self) -> dict[str, Any]:
+        """Returns the arguments inherited by the spans of the current thread."""
+        return getattr(self._local, "args", {})
+
+    @contextmanager
+    def inherit(self, args: dict[str, Any]) -> Iterator[None]:
+        """Make the spans of the current thread inherit args in the context."""
+        previous_args = self.get_context()
+        self._local.args = args
+        try:
+            yield
+        finally:
+            self._local.args = previous_args
+
+    def get_stage_durations(self) -> dict[str, float]:
+        """Returns the total duration in seconds of each stage."""
+        durations: dict[str, float] = {}
+        with self._lock:
+            for event in self.events:
+                if event["ph"] != "X":
+                    continue
+                durations[event["name"]] = (
+                    durations.get(event["name"], 0.0) + event["dur"] / 1e6
+                )
+        return durations
+
+    def to_chrome_trace(self) -> dict:
+        """Returns the spans in the Chrome trace event format."""
+        with self._lock:
+            events = list(self.events)
+            thread_names = dict(self._thread_names)
+        metadata = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": os.getpid(),
+                "tid": tid,
+                "args": {"name": thread_name},
+            }
+            for tid, thread_name in thread_names.items()
+        ]
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def save(self, path: str):
+        """Save the Chrome trace, to be opened in chrome://tracing or Perfetto."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as trace_file:
+            json.dump(self.to_chrome_trace(), trace_file)
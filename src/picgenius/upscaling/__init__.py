@@ -0,0 +1,24 @@
+"""
+Package for Picgenius upscaling.
+Upscaling has the concern to run, cache and optimize the ESRGAN upscales of designs.
+Upscaler and ParallelUpscaler import torch, they are only imported when accessed.
+"""
+from .cache import UpscaleCache
+from .plan import UpscalePlan, UpscaleStep
+from .settings import InferenceSettings
+from .tiling import TiledUpscaler, TilingStats
+from .weights import WeightsLoader
+
+
+def __getattr__(name: str):
+    if name == "Upscaler":
+        from .runtime import Upscaler  # pylint: disable=import-outside-toplevel
+
+        return Upscaler
+    if name == "ParallelUpscaler":
+        from .parallel import (  # pylint: disable=import-outside-toplevel
+            ParallelUpscaler,
+        )
+
+        return ParallelUpscaler
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,174 @@
+"""Module for UpscaleCache class declaration."""
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+from typing import Optional
+
+from PIL import Image
+
+
+class UpscaleCache:
+    """
+    On-disk cache of upscaled designs.
+
+    Entries are addressed by a key derived from the content of the source image,
+    the requested scale and the identity of the model weights, so a design that
+    hasn't changed is never upscaled twice. The cache size is capped and the least
+    recently used entries are evicted first. Files are always copied in and out
+    of the cache, never linked, so that outputs and entries don't share inodes:
+    editing an output can't corrupt its entry, touching an entry doesn't touch
+    the output, and evicting an entry frees its disk space.
+    """
+
+    DEFAULT_DIRECTORY = "./.picgenius-cache/upscaled"
+    DEFAULT_MAX_SIZE = 2 * 1024**3
+    IMAGE_EXTENSION = "png"
+
+    _HASH_CHUNK_SIZE = 1024 * 1024
+
+    directory: str
+    max_size: int
+
+    def __init__(
+        self, directory: str = DEFAULT_DIRECTORY, max_size: int = DEFAULT_MAX_SIZE
+    ):
+        self.directory = directory
+        self.max_size = max_size
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def hash_file(path: str) -> str:
+        """Returns the sha256 hex digest of the given file content."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(UpscaleCache._HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def build_key(content_hash: str, scale_label: str, weights_identity: str) -> str:
+        """Build the cache key of an upscale from its inputs identities."""
+        key_data = "|".join((content_hash, scale_label, weights_identity))
+        return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+    def get_entry_path(self, key: str, extension: str) -> str:
+        """Returns the path of the entry, whether it exists or not."""
+        return os.path.join(self.directory, key[:2], f"{key}.{extension}")
+
+    def lookup(self, key: str, extension: str) -> Optional[str]:
+        """Returns the path of the entry if it exists, and mark it as recently used."""
+        entry_path = self.get_entry_path(key, extension)
+        try:
+            os.utime(entry_path)
+        except FileNotFoundError:
+            return None
+        return entry_path
+
+    def fetch(self, key: str, extension: str, destination: str) -> bool:
+        """
+        Copy the entry to destination.
+
+        Returns:
+            bool: False if the entry isn't cached.
+        """
+        entry_path = self.lookup(key, extension)
+        if entry_path is None:
+            return False
+
+        try:
+            self._copy(entry_path, destination)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def store(self, key: str, extension: str, source: str) -> str:
+        """Copy the source file to the cache, then evict the oldest entries."""
+        entry_path = self.get_entry_path(key, extension)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        self._copy(source, entry_path)
+
+        self.evict()
+        return entry_path
+
+    def load_image(self, key: str) -> Optional[Image.Image]:
+        """Returns the cached image of the key, or None."""
+        entry_path = self.lookup(key, self.IMAGE_EXTENSION)
+        if entry_path is None:
+            return None
+        try:
+            with Image.open(entry_path) as image:
+                image.load()
+        except FileNotFoundError:
+            return None
+        return image
+
+    def store_image(self, key: str, image: Image.Image) -> str:
+        """Encode the image in the cache, then evict the oldest entries."""
+        entry_path = self.get_entry_path(key, self.IMAGE_EXTENSION)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+        tmp_path = f"{entry_path}.{uuid.uuid4().hex}.tmp"
+        image.save(tmp_path, format=self.IMAGE_EXTENSION)
+        os.replace(tmp_path, entry_path)
+
+        self.evict()
+        return entry_path
+
+    @staticmethod
+    def _copy(source: str, destination: str):
+        """Copy source to a temporary file, then replace destination atomically."""
+        tmp_path = f"{destination}.{uuid.uuid4().hex}.tmp"
+        try:
+            # copyfile uses copy_file_range or sendfile when the OS supports it
+            shutil.copyfile(source, tmp_path)
+            os.replace(tmp_path, destination)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits max_size."""
+        with self._lock:
+            entries = self._list_entries()
+            total_size = sum(size for _, _, size in entries)
+            for path, _, size in sorted(entries, key=lambda entry: entry[1]):
+                if total_size <= self.max_size:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total_size -= size
+
+    def clear(self):
+        """Remove every entry of the cache."""
+        with self._lock:
+            for path, _, _ in self._list_entries():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _list_entries(self) -> list[tuple[str, int, int]]:
+        """Returns (path, mtime, size) of every entry."""
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+
+        with os.scandir(self.directory) as buckets:
+            for bucket in buckets:
+                if not bucket.is_dir():
+                    continue
+                with os.scandir(bucket.path) as files:
+                    for file in files:
+                        if not file.is_file() or file.name.endswith(".tmp"):
+                            continue
+                        try:
+                            stat = file.stat()
+                        except FileNotFoundError:
+                            continue
+                        entries.append((file.path, stat.st_mtime_ns, stat.st_size))
+        return entries
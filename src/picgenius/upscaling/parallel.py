@@ -0,0 +1,184 @@
+"""Module for ParallelUpscaler class declaration."""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from typing import ClassVar, Iterator, Optional
+
+import numpy as np
+from PIL import Image
+
+import torch
+
+from .runtime import InferenceSettings, Upscaler
+from .weights import WeightsLoader
+
+
+_worker_upscaler: Optional[Upscaler] = None
+
+
+def _init_worker(
+    scale: int, settings: InferenceSettings, weights_dir: str, download: bool
+):
+    """Load the model once in the worker process."""
+    global _worker_upscaler  # pylint: disable=global-statement
+    WeightsLoader.default = WeightsLoader(weights_dir, download=download)
+    _worker_upscaler = Upscaler.get(scale, torch.device("cpu"), settings)
+
+
+def _upscale_tile(tile: np.ndarray) -> np.ndarray:
+    """Upscale one tile in the worker process."""
+    return np.asarray(_worker_upscaler.predict(Image.fromarray(tile)))
+
+
+class ParallelUpscaler:
+    """
+    Upscale images on CPU across a pool of worker processes.
+
+    The image is split into overlapping tiles distributed to the workers, each
+    holding its own model and a fixed number of torch threads, so that every
+    core is busy even for a single large image. Tiles are stitched back by
+    blending their overlaps linearly.
+    """
+
+    DEFAULT_TILE_SIZE: ClassVar[int] = InferenceSettings.DEFAULT_TILE_SIZE
+    DEFAULT_OVERLAP: ClassVar[int] = 16
+
+    _instances: ClassVar[dict[tuple, "ParallelUpscaler"]] = {}
+    _instances_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    scale: int
+    workers: int
+    settings: InferenceSettings
+    tile_size: int
+    overlap: int
+
+    def __init__(
+        self,
+        scale: int,
+        workers: int,
+        settings: Optional[InferenceSettings] = None,
+        tile_size: int = DEFAULT_TILE_SIZE,
+        overlap: int = DEFAULT_OVERLAP,
+    ):
+        if settings is None:
+            settings = InferenceSettings.default
+
+        threads = settings.intra_op_threads
+        if threads is None:
+            threads = max(1, (os.cpu_count() or 1) // workers)
+
+        self.scale = scale
+        self.workers = workers
+        self.settings = replace(
+            settings, workers=None, intra_op_threads=threads, inter_op_threads=1
+        )
+        self.tile_size = tile_size
+        self.overlap = overlap
+
+        weights_loader = WeightsLoader.default
+        # Convert the weights once, before the workers map them
+        weights_loader.prepare(scale)
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                scale,
+                self.settings,
+                weights_loader.directory,
+                weights_loader.download,
+            ),
+        )
+
+    @classmethod
+    def get(
+        cls, scale: int, settings: Optional[InferenceSettings] = None
+    ) -> "ParallelUpscaler":
+        """Returns a parallel upscaler, starting its workers only once per process."""
+        if settings is None:
+            settings = InferenceSettings.default
+
+        key = (scale, WeightsLoader.default.directory, settings)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(
+                    scale,
+                    settings.workers,
+                    settings,
+                    tile_size=settings.tile_size or cls.DEFAULT_TILE_SIZE,
+                )
+            return cls._instances[key]
+
+    @classmethod
+    def clear(cls):
+        """Stop the workers of every parallel upscaler."""
+        with cls._instances_lock:
+            for parallel_upscaler in cls._instances.values():
+                parallel_upscaler.close()
+            cls._instances.clear()
+
+    def close(self):
+        """Stop the workers."""
+        self._executor.shutdown()
+
+    def predict(self, image: Image.Image) -> Image.Image:
+        """Upscale the image, its tiles being upscaled in parallel."""
+        pixels = np.asarray(image.convert("RGB"))
+        height, width, _ = pixels.shape
+        output = np.empty((height * self.scale, width * self.scale, 3), np.uint8)
+
+        boxes = list(self.iter_tile_boxes(height, width))
+        tiles = (pixels[top:bottom, left:right] for left, top, right, bottom in boxes)
+        # map keeps the tiles order, which the blending relies on
+        for box, upscaled_tile in zip(boxes, self._executor.map(_upscale_tile, tiles)):
+            self._blend(output, box, upscaled_tile)
+
+        return Image.fromarray(output)
+
+    def iter_tile_boxes(
+        self, height: int, width: int
+    ) -> Iterator[tuple[int, int, int, int]]:
+        """Yield the boxes of the overlapping tiles, in rows order."""
+        for top in range(0, height, self.tile_size):
+            for left in range(0, width, self.tile_size):
+                yield (
+                    max(0, left - self.overlap),
+                    max(0, top - self.overlap),
+                    min(width, left + self.tile_size + self.overlap),
+                    min(height, top + self.tile_size + self.overlap),
+                )
+
+    def _blend(
+        self,
+        output: np.ndarray,
+        box: tuple[int, int, int, int],
+        upscaled_tile: np.ndarray,
+    ):
+        """
+        Paste the upscaled tile in the output, blending it with the tiles
+        above and on its left over their shared overlap.
+        """
+        left, top, right, bottom = (value * self.scale for value in box)
+        blend_size = 2 * self.overlap * self.scale
+
+        weights_x = self._get_ramp(right - left, blend_size if left > 0 else 0)
+        weights_y = self._get_ramp(bottom - top, blend_size if top > 0 else 0)
+        weights = (weights_y[:, None] * weights_x[None, :])[..., None]
+
+        region = output[top:bottom, left:right]
+        if left == 0 and top == 0:
+            region[:] = upscaled_tile
+            return
+        blended = region * (1 - weights) + upscaled_tile * weights
+        region[:] = np.rint(blended).astype(np.uint8)
+
+    @staticmethod
+    def _get_ramp(length: int, blend_size: int) -> np.ndarray:
+        """Returns weights rising from 0 to 1 over blend_size, then staying at 1."""
+        ramp = np.ones(length, dtype=np.float32)
+        blend_size = min(blend_size, length)
+        if blend_size > 0:
+            ramp[:blend_size] = (np.arange(blend_size) + 0.5) / blend_size
+        return ramp
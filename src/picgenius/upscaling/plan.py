@@ -0,0 +1,154 @@
+"""Module for UpscalePlan class declaration."""
+from dataclasses import dataclass
+from typing import Callable, ClassVar, Generator, Iterable, Optional
+
+from PIL import Image
+
+from picgenius import processing as im
+
+
+@dataclass(frozen=True)
+class UpscaleStep:
+    """Upscale step data: either an ESRGAN inference or a LANCZOS downscale."""
+
+    model_scale: Optional[int] = None
+    resize_ratio: Optional[tuple[int, int]] = None
+
+    def __post_init__(self):
+        if (self.model_scale is None) == (self.resize_ratio is None):
+            raise ValueError("Either model_scale or resize_ratio must be defined.")
+
+    @property
+    def label(self) -> str:
+        """Returns a short string identifying the step."""
+        if self.model_scale is not None:
+            return f"x{self.model_scale}"
+        numerator, denominator = self.resize_ratio
+        return f"r{numerator}:{denominator}"
+
+    def apply(self, image: Image.Image, cpu: bool = False) -> Image.Image:
+        """Run the step on the given image."""
+        if self.model_scale is not None:
+            return im.upscale_image(image, self.model_scale, cpu=cpu)
+
+        numerator, denominator = self.resize_ratio
+        width, height = image.size
+        return image.resize(
+            (width * numerator // denominator, height * numerator // denominator),
+            Image.LANCZOS,
+        )
+
+
+UpscaleChain = tuple[UpscaleStep, ...]
+
+
+class UpscalePlan:
+    """
+    Plan the upscales of one image at several scales.
+
+    Each scale is a chain of steps, e.g. x10 is x4, then a 5/8 LANCZOS
+    downscale, then x4. Chains sharing a prefix form a tree: every unique
+    intermediate is computed once and serves all the requested scales below it.
+    """
+
+    CHAINS: ClassVar[dict[int, UpscaleChain]] = {
+        2: (UpscaleStep(model_scale=2),),
+        4: (UpscaleStep(model_scale=4),),
+        8: (UpscaleStep(model_scale=8),),
+        10: (
+            UpscaleStep(model_scale=4),
+            UpscaleStep(resize_ratio=(5, 8)),
+            UpscaleStep(model_scale=4),
+        ),
+        12: (
+            UpscaleStep(model_scale=4),
+            UpscaleStep(resize_ratio=(3, 4)),
+            UpscaleStep(model_scale=4),
+        ),
+        16: (UpscaleStep(model_scale=2), UpscaleStep(model_scale=8)),
+    }
+    AVAILABLE_SCALES: ClassVar[list[int]] = sorted(CHAINS)
+
+    scales: list[int]
+
+    def __init__(self, scales: Iterable[int]):
+        self.scales = sorted(set(scales))
+        if not self.scales:
+            raise ValueError("At least one scale must be given.")
+        for scale in self.scales:
+            if scale not in self.CHAINS:
+                raise ValueError(
+                    f"Scale {scale} isn't available: {self.AVAILABLE_SCALES}"
+                )
+
+    @staticmethod
+    def get_chain_label(chain: UpscaleChain) -> str:
+        """Returns a string identifying the chain, e.g. x4-r5:8-x4."""
+        return "-".join(step.label for step in chain)
+
+    @staticmethod
+    def get_model_scales(chain: UpscaleChain) -> list[int]:
+        """Returns the ESRGAN models scales used by the chain."""
+        return [step.model_scale for step in chain if step.model_scale is not None]
+
+    def get_chain(self, scale: int) -> UpscaleChain:
+        """Returns the chain of steps of the given scale."""
+        return self.CHAINS[scale]
+
+    def get_nodes(self) -> list[UpscaleChain]:
+        """Returns every unique intermediate and output of the plan."""
+        nodes = []
+        for scale in self.scales:
+            chain = self.get_chain(scale)
+            for depth in range(1, len(chain) + 1):
+                if chain[:depth] not in nodes:
+                    nodes.append(chain[:depth])
+        return nodes
+
+    def execute(
+        self,
+        load_image: Callable[[], Image.Image],
+        cpu: bool = False,
+        lookup: Optional[Callable[[UpscaleChain], Optional[Image.Image]]] = None,
+    ) -> Generator[tuple[int, Image.Image], None, None]:
+        """
+        Run the plan and yield (scale, upscaled image) as soon as each is ready.
+
+        Args:
+            load_image (Callable): Returns the image to upscale, called only if needed.
+            cpu (bool): Force usage of CPU.
+            lookup (Callable): Optional function returning an already computed
+                image of a chain (e.g. from a cache), or None.
+        """
+        # Visiting chains in order keeps shared prefixes next to each other
+        remaining = sorted(
+            self.scales, key=lambda scale: [s.label for s in self.get_chain(scale)]
+        )
+        computed: dict[UpscaleChain, Image.Image] = {}
+
+        def resolve(chain: UpscaleChain) -> Image.Image:
+            if chain in computed:
+                return computed[chain]
+
+            image = lookup(chain) if lookup is not None and chain else None
+            if image is None:
+                if not chain:
+                    image = load_image()
+                else:
+                    image = chain[-1].apply(resolve(chain[:-1]), cpu=cpu)
+            computed[chain] = image
+            return image
+
+        while remaining:
+            scale = remaining.pop(0)
+            yield (scale, resolve(self.get_chain(scale)))
+
+            # Release intermediates that no remaining scale needs
+            needed = {
+                self.get_chain(next_scale)[:depth]
+                for next_scale in remaining
+                for depth in range(len(self.get_chain(next_scale)) + 1)
+            }
+            for chain in list(computed):
+                if chain not in needed:
+                    del computed[chain]
@@ -0,0 +1,199 @@
+"""Module for Upscaler class declaration."""
+import threading
+import time
+from typing import ClassVar, Optional
+
+import numpy as np
+from PIL import Image
+
+import torch
+from RealESRGAN import RealESRGAN
+from RealESRGAN.utils import (
+    pad_reflect,
+    split_image_into_overlapping_patches,
+    stich_together,
+    unpad_image,
+)
+
+from picgenius.logger import PicGeniusLogger
+from .settings import InferenceSettings
+from .tiling import TiledUpscaler, TilingStats
+from .weights import WeightsLoader
+
+
+class Upscaler:
+    """Run ESRGAN inferences on a loaded model, with the given settings."""
+
+    PATCH_SIZE: ClassVar[int] = 192
+    PATCH_PADDING: ClassVar[int] = 24
+    IMAGE_PADDING: ClassVar[int] = 15
+
+    _instances: ClassVar[dict[tuple, "Upscaler"]] = {}
+    _instances_lock: ClassVar[threading.Lock] = threading.Lock()
+    _inter_op_threads_set: ClassVar[bool] = False
+
+    scale: int
+    device: torch.device
+    settings: InferenceSettings
+    load_seconds: float
+    inference_seconds: float
+    tiling_stats: TilingStats
+
+    def __init__(
+        self,
+        scale: int,
+        device: torch.device,
+        settings: Optional[InferenceSettings] = None,
+        weights_loader: Optional[WeightsLoader] = None,
+    ):
+        self.scale = scale
+        self.device = device
+        self.settings = settings if settings is not None else InferenceSettings.default
+        self.inference_seconds = 0.0
+        self.tiling_stats = TilingStats()
+        self.logger = PicGeniusLogger()
+        self._lock = threading.Lock()
+
+        if weights_loader is None:
+            weights_loader = WeightsLoader.default
+
+        start = time.perf_counter()
+        self.network = RealESRGAN(device, scale=scale).model
+        # Assigning keeps the memory-mapped tensors instead of copying them
+        self.network.load_state_dict(
+            weights_loader.load_state_dict(scale), strict=True, assign=True
+        )
+        self.network.eval()
+        self.network.to(device)
+        if self.settings.channels_last:
+            self.network = self.network.to(memory_format=torch.channels_last)
+        self.load_seconds = time.perf_counter() - start
+        self.logger.info("x%d weights loaded in %.3fs", scale, self.load_seconds)
+
+    @classmethod
+    def get(
+        cls,
+        scale: int,
+        device: torch.device,
+        settings: Optional[InferenceSettings] = None,
+    ) -> "Upscaler":
+        """Returns an upscaler, loading its model only once per process."""
+        if settings is None:
+            settings = InferenceSettings.default
+
+        key = (scale, device.type, WeightsLoader.default.directory, settings)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(scale, device, settings)
+            return cls._instances[key]
+
+    @classmethod
+    def clear(cls):
+        """Release the loaded models."""
+        with cls._instances_lock:
+            cls._instances.clear()
+
+    @property
+    def batch_size(self) -> int:
+        """Returns the number of patches inferred at once."""
+        if self.settings.batch_size is not None:
+            return self.settings.batch_size
+        return 1 if self.device.type == "cuda" else 32
+
+    def predict(self, image: Image.Image) -> Image.Image:
+        """Upscale the whole image, patch by patch."""
+        if self.settings.flat_tile_tolerance is not None:
+            return self.predict_tiled(image)
+
+        start = time.perf_counter()
+        scale = self.scale
+        lr_image = pad_reflect(np.array(image.convert("RGB")), self.IMAGE_PADDING)
+
+        patches, padded_shape = split_image_into_overlapping_patches(
+            lr_image, patch_size=self.PATCH_SIZE, padding_size=self.PATCH_PADDING
+        )
+        sr_patches = self.infer_patches(patches)
+
+        padded_size_scaled = tuple(np.multiply(padded_shape[0:2], scale)) + (3,)
+        scaled_image_shape = tuple(np.multiply(lr_image.shape[0:2], scale)) + (3,)
+        sr_image = stich_together(
+            sr_patches,
+            padded_image_shape=padded_size_scaled,
+            target_shape=scaled_image_shape,
+            padding_size=self.PATCH_PADDING * scale,
+        )
+        sr_image = (sr_image * 255).astype(np.uint8)
+        sr_image = unpad_image(sr_image, self.IMAGE_PADDING * scale)
+
+        duration = time.perf_counter() - start
+        self.inference_seconds += duration
+        self.logger.info("x%d inference done in %.3fs", scale, duration)
+        return Image.fromarray(sr_image)
+
+    def predict_tiled(self, image: Image.Image) -> Image.Image:
+        """Upscale the image tile by tile, interpolating the near-uniform tiles."""
+        start = time.perf_counter()
+        tiled_upscaler = TiledUpscaler(
+            self.infer_patches,
+            self.scale,
+            tile_size=self.PATCH_SIZE,
+            padding=self.PATCH_PADDING,
+            tolerance=self.settings.flat_tile_tolerance,
+            resample=self.settings.flat_tile_resample,
+            batch_size=self.batch_size,
+        )
+        upscaled_image, stats = tiled_upscaler.upscale(image)
+        self.tiling_stats.add(stats)
+
+        duration = time.perf_counter() - start
+        self.inference_seconds += duration
+        self.logger.info(
+            "x%d inference done in %.3fs, %d/%d flat tiles interpolated (%.0f%%)",
+            self.scale,
+            duration,
+            stats.skipped,
+            stats.tiles,
+            stats.skipped_fraction * 100,
+        )
+        return upscaled_image
+
+    def infer_patches(self, patches: np.ndarray) -> np.ndarray:
+        """
+        Run the model on (N, H, W, 3) uint8 patches.
+
+        Returns:
+            np.ndarray: (N, H * scale, W * scale, 3) float32 patches in [0, 1].
+        """
+        with self._lock:
+            self._apply_threads_settings()
+            with torch.inference_mode(), self._autocast():
+                inputs = torch.from_numpy(np.ascontiguousarray(patches))
+                inputs = inputs.permute((0, 3, 1, 2)).to(self.device)
+                results = []
+                for start in range(0, inputs.shape[0], self.batch_size):
+                    batch = inputs[start : start + self.batch_size].float() / 255
+                    if self.settings.channels_last:
+                        batch = batch.contiguous(memory_format=torch.channels_last)
+                    results.append(self.network(batch).float().clamp_(0, 1).cpu())
+
+        return torch.cat(results, 0).permute((0, 2, 3, 1)).numpy()
+
+    def _autocast(self):
+        if self.settings.precision == "bf16":
+            return torch.autocast(device_type=self.device.type, dtype=torch.bfloat16)
+        return torch.autocast(device_type=self.device.type, enabled=False)
+
+    def _apply_threads_settings(self):
+        if self.settings.intra_op_threads is not None:
+            torch.set_num_threads(self.settings.intra_op_threads)
+
+        if (
+            self.settings.inter_op_threads is not None
+            and not Upscaler._inter_op_threads_set
+        ):
+            try:
+                torch.set_num_interop_threads(self.settings.inter_op_threads)
+            except RuntimeError:
+                # It can only be set once, before any inter-op parallel work
+                pass
+            Upscaler._inter_op_threads_set = True
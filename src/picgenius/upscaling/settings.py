@@ -0,0 +1,56 @@
+"""Module for InferenceSettings class declaration."""
+from dataclasses import dataclass
+from typing import ClassVar, Optional
+
+
+@dataclass(frozen=True)
+class InferenceSettings:
+    """
+    ESRGAN inference settings.
+
+    The defaults match the plain fp32 eager inference. On CPU, channels_last and
+    bf16 usually speed up the convolutions, bf16 at a small cost in accuracy.
+    With a flat_tile_tolerance, near-uniform tiles are interpolated with
+    flat_tile_resample instead of being inferred. With several workers, CPU
+    upscales are split into tiles of tile_size upscaled by worker processes.
+    The settings of the process are InferenceSettings.default.
+    """
+
+    precision: str = "fp32"
+    channels_last: bool = False
+    intra_op_threads: Optional[int] = None
+    inter_op_threads: Optional[int] = None
+    batch_size: Optional[int] = None
+    flat_tile_tolerance: Optional[float] = None
+    flat_tile_resample: str = "bicubic"
+    workers: Optional[int] = None
+    tile_size: Optional[int] = None
+
+    AVAILABLE_PRECISIONS: ClassVar[list[str]] = ["fp32", "bf16"]
+    DEFAULT_TILE_SIZE: ClassVar[int] = 512
+
+    default: ClassVar["InferenceSettings"]
+
+    def __post_init__(self):
+        if self.precision not in self.AVAILABLE_PRECISIONS:
+            raise ValueError(
+                f"Precision {self.precision} isn't available: "
+                f"{self.AVAILABLE_PRECISIONS}"
+            )
+
+    @property
+    def label(self) -> str:
+        """Returns a short string describing the settings."""
+        label = self.precision
+        if self.channels_last:
+            label += "+channels_last"
+        if self.intra_op_threads is not None:
+            label += f"+{self.intra_op_threads}t"
+        if self.flat_tile_tolerance is not None:
+            label += f"+flat<={self.flat_tile_tolerance:g}"
+        if self.workers is not None:
+            label += f"+{self.workers}w"
+        return label
+
+
+InferenceSettings.default = InferenceSettings()
@@ -0,0 +1,190 @@
+"""Module for TiledUpscaler class declaration."""
+from dataclasses import dataclass
+from typing import Callable, ClassVar, Iterator
+
+import numpy as np
+from PIL import Image
+
+
+@dataclass
+class TilingStats:
+    """Count of tiles inferred and interpolated by a tiled upscale."""
+
+    tiles: int = 0
+    skipped: int = 0
+
+    @property
+    def skipped_fraction(self) -> float:
+        """Returns the fraction of tiles interpolated instead of inferred."""
+        return self.skipped / self.tiles if self.tiles else 0.0
+
+    def add(self, other: "TilingStats"):
+        """Accumulate the counts of other stats."""
+        self.tiles += other.tiles
+        self.skipped += other.skipped
+
+
+@dataclass(frozen=True)
+class Tile:
+    """Tile position, in tiles, and box in the padded image, in pixels."""
+
+    row: int
+    column: int
+    box: tuple[int, int, int, int]
+
+
+class TiledUpscaler:
+    """
+    Upscale an image tile by tile.
+
+    Tiles are padded with their neighbouring pixels so that they join without
+    seams. Near-uniform tiles, whose pixels standard deviation is below the
+    tolerance, are interpolated instead of going through the model.
+    """
+
+    RESAMPLE_FILTERS: ClassVar[dict[str, int]] = {
+        "bicubic": Image.BICUBIC,
+        "lanczos": Image.LANCZOS,
+    }
+
+    infer_tiles: Callable[[np.ndarray], np.ndarray]
+    scale: int
+    tile_size: int
+    padding: int
+    tolerance: float
+    resample: str
+    batch_size: int
+
+    def __init__(
+        self,
+        infer_tiles: Callable[[np.ndarray], np.ndarray],
+        scale: int,
+        tile_size: int = 192,
+        padding: int = 24,
+        tolerance: float = 0.0,
+        resample: str = "bicubic",
+        batch_size: int = 32,
+    ):
+        """
+        Args:
+            infer_tiles (Callable): Upscale (N, H, W, 3) uint8 tiles to
+                (N, H * scale, W * scale, 3) floats in [0, 1].
+            scale (int): The upscale factor of infer_tiles.
+            tile_size (int): Size of the tiles, without their padding.
+            padding (int): Pixels shared with each neighbouring tile.
+            tolerance (float): Maximum standard deviation, in 0-255 levels,
+                of a tile to be interpolated. Negative disables interpolation.
+            resample (str): Interpolation filter, bicubic or lanczos.
+            batch_size (int): Number of tiles given at once to infer_tiles.
+        """
+        if resample not in self.RESAMPLE_FILTERS:
+            raise ValueError(
+                f"Resample {resample} isn't available: {list(self.RESAMPLE_FILTERS)}"
+            )
+        self.infer_tiles = infer_tiles
+        self.scale = scale
+        self.tile_size = tile_size
+        self.padding = padding
+        self.tolerance = tolerance
+        self.resample = resample
+        self.batch_size = batch_size
+
+    def upscale(self, image: Image.Image) -> tuple[Image.Image, TilingStats]:
+        """Upscale the image, and returns it with the tiling stats."""
+        pixels = np.asarray(image.convert("RGB"))
+        height, width, _ = pixels.shape
+        padded = self.pad(pixels)
+
+        output = np.empty(
+            (self._extend(height) * self.scale, self._extend(width) * self.scale, 3),
+            dtype=np.uint8,
+        )
+        stats = TilingStats()
+        detailed_tiles = []
+        for tile in self.iter_tiles(height, width):
+            stats.tiles += 1
+            tile_pixels = self.crop(padded, tile)
+            if self.is_flat(tile_pixels):
+                stats.skipped += 1
+                self._place(output, tile, self._interpolate(tile_pixels))
+                continue
+
+            detailed_tiles.append((tile, tile_pixels))
+            if len(detailed_tiles) == self.batch_size:
+                self._infer_and_place(output, detailed_tiles)
+                detailed_tiles = []
+
+        if detailed_tiles:
+            self._infer_and_place(output, detailed_tiles)
+
+        upscaled = output[: height * self.scale, : width * self.scale]
+        return (Image.fromarray(upscaled), stats)
+
+    def pad(self, pixels: np.ndarray) -> np.ndarray:
+        """Pad the pixels by the tiles padding, and up to a whole number of tiles."""
+        height, width, _ = pixels.shape
+        padding = self.padding
+        extended = np.pad(
+            pixels,
+            (
+                (0, self._extend(height) - height),
+                (0, self._extend(width) - width),
+                (0, 0),
+            ),
+            mode="edge",
+        )
+        mode = "reflect" if min(extended.shape[:2]) > padding else "edge"
+        return np.pad(extended, ((padding, padding), (padding, padding), (0, 0)), mode)
+
+    def iter_tiles(self, height: int, width: int) -> Iterator[Tile]:
+        """Yield the tiles covering an image of the given size."""
+        padded_size = self.tile_size + 2 * self.padding
+        for row in range(self._extend(height) // self.tile_size):
+            for column in range(self._extend(width) // self.tile_size):
+                top = row * self.tile_size
+                left = column * self.tile_size
+                yield Tile(
+                    row, column, (left, top, left + padded_size, top + padded_size)
+                )
+
+    @staticmethod
+    def crop(padded: np.ndarray, tile: Tile) -> np.ndarray:
+        """Returns the padded pixels of the tile."""
+        left, top, right, bottom = tile.box
+        return padded[top:bottom, left:right]
+
+    def is_flat(self, tile_pixels: np.ndarray) -> bool:
+        """Returns True if the tile pixels are uniform enough to be interpolated."""
+        if self.tolerance < 0:
+            return False
+        return float(tile_pixels.std(axis=(0, 1)).max()) <= self.tolerance
+
+    def _extend(self, length: int) -> int:
+        """Returns the length rounded up to a whole number of tiles."""
+        return -(-length // self.tile_size) * self.tile_size
+
+    def _interpolate(self, tile_pixels: np.ndarray) -> np.ndarray:
+        height, width, _ = tile_pixels.shape
+        interpolated = Image.fromarray(tile_pixels).resize(
+            (width * self.scale, height * self.scale),
+            self.RESAMPLE_FILTERS[self.resample],
+        )
+        return np.asarray(interpolated)
+
+    def _infer_and_place(
+        self, output: np.ndarray, detailed_tiles: list[tuple[Tile, np.ndarray]]
+    ):
+        batch = np.stack([tile_pixels for _, tile_pixels in detailed_tiles])
+        upscaled_tiles = self.infer_tiles(batch)
+        for (tile, _), upscaled_tile in zip(detailed_tiles, upscaled_tiles):
+            self._place(output, tile, (upscaled_tile * 255).astype(np.uint8))
+
+    def _place(self, output: np.ndarray, tile: Tile, upscaled_tile: np.ndarray):
+        """Copy the upscaled tile, without its padding, in the output."""
+        size = self.tile_size * self.scale
+        padding = self.padding * self.scale
+        top = tile.row * size
+        left = tile.column * size
+        output[top : top + size, left : left + size] = upscaled_tile[
+            padding : padding + size, padding : padding + size
+        ]
@@ -0,0 +1,122 @@
+"""Module for WeightsLoader class declaration."""
+import os
+import threading
+import uuid
+from typing import TYPE_CHECKING, ClassVar
+
+if TYPE_CHECKING:
+    import torch
+
+
+class WeightsLoader:
+    """
+    Offline-first loader of the ESRGAN weights.
+
+    Weights are only read from a local directory. Each checkpoint is converted
+    once to a plain state dict, which is then memory-mapped: processes loading
+    the same weights share the same page-cache pages instead of each holding
+    a deserialized copy. The loader of the process is WeightsLoader.default,
+    which doesn't import torch to identify the weights.
+    """
+
+    DEFAULT_DIRECTORY = "./models"
+    CHECKPOINT_FILENAME = "RealESRGAN_x{scale}.pth"
+    MMAP_FILENAME = "RealESRGAN_x{scale}.mmap.pt"
+
+    default: ClassVar["WeightsLoader"]
+
+    directory: str
+    download: bool
+
+    def __init__(self, directory: str = DEFAULT_DIRECTORY, download: bool = False):
+        self.directory = directory
+        self.download = download
+        self._lock = threading.Lock()
+
+    def get_checkpoint_path(self, scale: int) -> str:
+        """Returns the path of the original checkpoint of the given scale."""
+        return os.path.join(
+            self.directory, self.CHECKPOINT_FILENAME.format(scale=scale)
+        )
+
+    def get_mmap_path(self, scale: int) -> str:
+        """Returns the path of the memory-mappable weights of the given scale."""
+        return os.path.join(self.directory, self.MMAP_FILENAME.format(scale=scale))
+
+    def get_identity(self, scale: int) -> str:
+        """Returns a string identifying the checkpoint of the given scale."""
+        for path in (self.get_checkpoint_path(scale), self.get_mmap_path(scale)):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            return f"x{scale}:{stat.st_size}:{stat.st_mtime_ns}"
+        return f"x{scale}:missing"
+
+    def load_state_dict(self, scale: int) -> dict[str, "torch.Tensor"]:
+        """Returns the memory-mapped state dict of the given scale."""
+        import torch  # pylint: disable=import-outside-toplevel
+
+        self.prepare(scale)
+        return torch.load(
+            self.get_mmap_path(scale), map_location="cpu", mmap=True, weights_only=True
+        )
+
+    def prepare(self, scale: int):
+        """Convert the checkpoint of the given scale, unless already done."""
+        with self._lock:
+            if not self._is_converted(scale):
+                self.convert(scale)
+
+    def convert(self, scale: int):
+        """Convert the checkpoint of the given scale to a memory-mappable file."""
+        import torch  # pylint: disable=import-outside-toplevel
+
+        checkpoint_path = self.get_checkpoint_path(scale)
+        if not os.path.exists(checkpoint_path):
+            self._download(scale)
+
+        checkpoint = torch.load(checkpoint_path, map_location="cpu", weights_only=True)
+        if "params" in checkpoint:
+            state_dict = checkpoint["params"]
+        elif "params_ema" in checkpoint:
+            state_dict = checkpoint["params_ema"]
+        else:
+            state_dict = checkpoint
+        state_dict = {key: value.contiguous() for key, value in state_dict.items()}
+
+        mmap_path = self.get_mmap_path(scale)
+        tmp_path = f"{mmap_path}.{uuid.uuid4().hex}.tmp"
+        torch.save(state_dict, tmp_path)
+        os.replace(tmp_path, mmap_path)
+
+    def _is_converted(self, scale: int) -> bool:
+        """Returns True if the memory-mappable file is newer than its checkpoint."""
+        try:
+            mmap_mtime = os.stat(self.get_mmap_path(scale)).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        try:
+            checkpoint_mtime = os.stat(self.get_checkpoint_path(scale)).st_mtime_ns
+        except FileNotFoundError:
+            return True
+        return mmap_mtime >= checkpoint_mtime
+
+    def _download(self, scale: int):
+        checkpoint_path = self.get_checkpoint_path(scale)
+        if not self.download:
+            raise FileNotFoundError(
+                f"ESRGAN weights not found: {checkpoint_path}. "
+                "Copy them to the models directory, or allow their download."
+            )
+        # pylint: disable=import-outside-toplevel
+        import torch
+        from RealESRGAN import RealESRGAN
+
+        os.makedirs(self.directory, exist_ok=True)
+        RealESRGAN(torch.device("cpu"), scale=scale).load_weights(
+            checkpoint_path, download=True
+        )
+
+
+WeightsLoader.default = WeightsLoader()
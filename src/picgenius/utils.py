@@ -1,6 +1,7 @@
 """Module to define utils."""
 import os
-from PIL import Image
+
+from picgenius.image_source import ImageSource
 
 
 # os and file related functions
@@ -11,24 +12,24 @@ def has_image_extension(path: str) -> bool:
     return path.endswith((".png", ".jpg", ".jpeg"))
 
 
-def load_images(path: str) -> list[tuple[Image.Image, str]]:
-    """Load all images in a folder or return single image"""
-    images = []
+def load_images(path: str) -> list[tuple[ImageSource, str]]:
+    """
+    Returns the lazy images of a folder, or the single image of path.
+
+    No file is opened until an image is loaded, see ImageSource.
+    """
     if os.path.isfile(path) and has_image_extension(path):
-        _, design_name = extract_filename(path)
-        images.append(
-            (Image.open(path), design_name),
-        )
+        file_paths = [path]
     elif os.path.isdir(path):
-        for file_name in os.listdir(path):
-            if has_image_extension(file_name):
-                file_path = os.path.join(path, file_name)
-                _, design_name = extract_filename(file_path)
-                images.append(
-                    (Image.open(file_path), design_name),
-                )
+        image_entries, _ = scan_directory(path)
+        file_paths = [entry.path for entry in image_entries]
     else:
         raise ValueError("Invalid path specified")
+
+    images = []
+    for file_path in file_paths:
+        image_source = ImageSource(file_path)
+        images.append((image_source, image_source.name))
     return images
 
 
@@ -50,6 +51,19 @@ def find_product_paths(designs_count: int, design_path: str) -> list[str]:
         return find_directories_with_n_image_files(design_path, designs_count)
 
 
+def scan_directory(path: str) -> tuple[list[os.DirEntry], list[os.DirEntry]]:
+    """Returns the image files and the subdirectories entries of path, in a single pass."""
+    image_entries = []
+    directory_entries = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                directory_entries.append(entry)
+            elif has_image_extension(entry.name):
+                image_entries.append(entry)
+    return (image_entries, directory_entries)
+
+
 def find_image_file_paths(design_path: str) -> list[str]:
     """Returns a list of paths to image files."""
 
@@ -57,11 +71,8 @@ def find_image_file_paths(design_path: str) -> list[str]:
     if is_image_file:
         return [design_path]
 
-    return [
-        os.path.join(design_path, filename)
-        for filename in os.listdir(design_path)
-        if has_image_extension(filename)
-    ]
+    image_entries, _ = scan_directory(design_path)
+    return [entry.path for entry in image_entries]
 
 
 def find_directories_with_n_image_files(design_path: str, image_count: int):
@@ -69,24 +80,20 @@ def find_directories_with_n_image_files(design_path: str, image_count: int):
     if not os.path.isdir(design_path):
         return []
 
-    if is_directory_with_n_image_files(design_path, image_count):
+    image_entries, directory_entries = scan_directory(design_path)
+    if len(image_entries) == image_count:
         return [design_path]
 
-    directories = [
-        os.path.join(design_path, dir)
-        for dir in os.listdir(design_path)
-        if os.path.isdir(os.path.join(design_path, dir))
-    ]
     return [
-        directory
-        for directory in directories
-        if is_directory_with_n_image_files(directory, image_count)
+        entry.path
+        for entry in directory_entries
+        if is_directory_with_n_image_files(entry.path, image_count)
     ]
 
 
 def is_directory_with_n_image_files(path: str, count: int) -> bool:
     """Returns if the given directory has x image files."""
-    return (
-        os.path.isdir(path)
-        and len([f for f in os.listdir(path) if has_image_extension(f)]) == count
-    )
+    if not os.path.isdir(path):
+        return False
+    image_entries, _ = scan_directory(path)
+    return len(image_entries) == count
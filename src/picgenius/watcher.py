@@ -0,0 +1,159 @@
+"""Module for DesignWatcher class declaration."""
+import os
+import time
+from typing import ClassVar, Optional
+
+from picgenius.controller import Controller
+from picgenius.logger import PicGeniusLogger
+from picgenius.manifest import BuildManifest
+from picgenius.models import Product
+
+Signature = tuple[tuple[str, int, int], ...]
+
+
+class DesignWatcher:
+    """
+    Watch a design path, and render its products as soon as they land.
+
+    The design path is polled through the discovery index, which only lists
+    again the directories that changed, so that new products are found without
+    listing every directory. The designs of every product are stated on each
+    poll, as designs overwritten in place don't change their directory mtime,
+    and compared to their (path, size, mtime) when last rendered. A new or
+    changed product is rendered once none of its designs was modified for
+    settle seconds, so that files still being copied aren't rendered half
+    written. Renders happen in this process, whose models and caches stay warm.
+    """
+
+    DEFAULT_INTERVAL: ClassVar[float] = 2.0
+    DEFAULT_SETTLE: ClassVar[float] = 5.0
+
+    controller: Controller
+    output_dir: str
+    interval: float
+    settle: float
+    rendered: dict[str, Signature]
+
+    def __init__(
+        self,
+        controller: Controller,
+        output_dir: str,
+        interval: float = DEFAULT_INTERVAL,
+        settle: float = DEFAULT_SETTLE,
+        auto_upscale: bool = False,
+        cpu: bool = False,
+    ):
+        """
+        Args:
+            controller (Controller): Controller of the product type and design
+                path to watch.
+            output_dir (str): Output directory of the products.
+            interval (float): Seconds between two polls.
+            settle (float): Seconds without modification for a product
+                to be rendered.
+        """
+        if controller.product_type is None:
+            raise ValueError("A product type is required to watch a design path.")
+        self.controller = controller
+        self.output_dir = output_dir
+        self.interval = interval
+        self.settle = settle
+        self.auto_upscale = auto_upscale
+        self.cpu = cpu
+        self.rendered = {}
+        self.logger = PicGeniusLogger()
+
+    def run(self, initial: bool = False, iterations: Optional[int] = None):
+        """
+        Poll the design path and render the ready products, until interrupted.
+
+        Args:
+            initial (bool): Also render the products found at start.
+            iterations (int): Stop after this number of polls.
+        """
+        if not initial:
+            self.set_baseline()
+
+        self.logger.info("Watching %s", self.controller.design_path)
+        iteration = 0
+        while iterations is None or iteration < iterations:
+            ready = self.poll()
+            for product_path, signature in ready:
+                self.render(product_path, signature)
+            if ready:
+                self.controller.index.save(root=self.controller.design_path)
+            iteration += 1
+            time.sleep(self.interval)
+
+    def set_baseline(self):
+        """Consider the products currently found as already rendered."""
+        for product_path in self._iter_product_paths():
+            signature = self.get_signature(product_path)
+            if signature is not None:
+                self.rendered[product_path] = signature
+
+    def poll(self) -> list[tuple[str, Signature]]:
+        """Returns the new or changed products, whose designs are settled."""
+        ready = []
+        now_ns = time.time_ns()
+        for product_path in self._iter_product_paths():
+            signature = self.get_signature(product_path)
+            if signature is None or self.rendered.get(product_path) == signature:
+                continue
+
+            last_modified_ns = max(mtime_ns for _, _, mtime_ns in signature)
+            if now_ns - last_modified_ns >= self.settle * 10**9:
+                ready.append((product_path, signature))
+        return ready
+
+    def get_signature(self, product_path: str) -> Optional[Signature]:
+        """
+        Returns the (path, size, mtime) of the product designs, stated directly
+        as files being written don't change their directory mtime.
+        """
+        signature = []
+        for image_path in self.controller.index.get_image_paths(product_path):
+            try:
+                stat = os.stat(image_path)
+            except FileNotFoundError:
+                return None
+            signature.append((image_path, stat.st_size, stat.st_mtime_ns))
+        return tuple(sorted(signature))
+
+    def render(self, product_path: str, signature: Signature):
+        """Render all the assets of the product, which isn't retried until it changes."""
+        self.rendered[product_path] = signature
+        image_paths = [image_path for image_path, _, _ in signature]
+        try:
+            product = Product(self.controller.product_type, product_path, image_paths)
+        except AttributeError as exc:
+            self.logger.warning("(%s) Skipped: %s", product_path, exc)
+            return
+
+        manifest = BuildManifest(self.output_dir)
+        try:
+            self.controller.process_product_generation(
+                product,
+                self.output_dir,
+                auto_upscale=self.auto_upscale,
+                cpu=self.cpu,
+                manifest=manifest,
+            )
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self.logger.error("(%s) Generation failed: %r", product.name, exc)
+            return
+        finally:
+            manifest.save()
+
+        last_modified_ns = max(mtime_ns for _, _, mtime_ns in signature)
+        self.logger.info(
+            "(%s) Rendered %.1fs after its last design change",
+            product.name,
+            (time.time_ns() - last_modified_ns) / 10**9,
+        )
+
+    def _iter_product_paths(self):
+        designs_count = self.controller.product_type.designs_count
+        yield from self.controller.index.iter_product_paths(
+            designs_count, self.controller.design_path
+        )
@@ -0,0 +1,81 @@
+"""Module for TestStageBenchmark class declaration."""
+import numpy as np
+import pytest
+from PIL import Image
+
+from picgenius.benchmark import StageBenchmark, SyntheticAssets
+
+
+class TestStageBenchmark:
+    """Test StageBenchmark"""
+
+    def setup_method(self):
+        """Set up the stage names of the benchmark."""
+        self.stage_names = [
+            "resize_and_crop",
+            "crop_to_ratio",
+            "zoom",
+            "find_font_size",
+            "paste_text_on_image",
+            "perspective",
+            "generate_template",
+            "formats",
+            "video_frames",
+            "controller",
+        ]
+
+    def test_run_all_stages(self, tmp_path):
+        """Test that every stage is timed, saved and loaded back."""
+        stage_benchmark = StageBenchmark(str(tmp_path), size=64, repeat=1)
+        results = stage_benchmark.run()
+        assert [result.name for result in results] == self.stage_names
+        assert all(result.best_seconds > 0 for result in results)
+        assert not (tmp_path / "products").exists()
+
+        stage_benchmark.save(results, str(tmp_path / "results.json"))
+        loaded = StageBenchmark.load(str(tmp_path / "results.json"))
+        assert list(loaded) == self.stage_names
+        assert "controller" in StageBenchmark.format_results(results)
+
+    def test_run_unknown_stage(self, tmp_path):
+        """Test that an unknown stage name is rejected."""
+        stage_benchmark = StageBenchmark(str(tmp_path), size=64, repeat=1)
+        with pytest.raises(ValueError, match="upscale"):
+            stage_benchmark.run(["zoom", "upscale"])
+
+    def test_compare(self):
+        """Test that a stage slower than the threshold is a regression."""
+        comparisons = StageBenchmark.compare(
+            {"zoom": 1.0, "formats": 1.0, "video_frames": 1.0},
+            {"zoom": 1.05, "formats": 1.5, "controller": 2.0},
+            threshold=0.1,
+        )
+        assert [comparison.name for comparison in comparisons] == ["zoom", "formats"]
+        assert [comparison.is_regression for comparison in comparisons] == [
+            False,
+            True,
+        ]
+        assert "REGRESSION" in StageBenchmark.format_comparisons(comparisons)
+
+    def test_synthetic_assets_are_deterministic(self, tmp_path):
+        """Test that the same seed writes the same designs."""
+        first = SyntheticAssets(str(tmp_path / "first"), size=64, seed=3)
+        second = SyntheticAssets(str(tmp_path / "second"), size=64, seed=3)
+        first_root = first.create_designs_tree(products_count=1)
+        second_root = second.create_designs_tree(products_count=1)
+        with Image.open(f"{first_root}/product-0/design-0.png") as design_0:
+            with Image.open(f"{first_root}/product-0/design-1.png") as design_1:
+                assert not np.array_equal(np.asarray(design_0), np.asarray(design_1))
+
+        larger = SyntheticAssets(str(tmp_path / "first"), size=128, seed=3)
+        larger_root = larger.create_designs_tree(products_count=1)
+        with Image.open(f"{larger_root}/product-0/design-0.png") as larger_image:
+            assert larger_image.size == (128, 160)
+
+        for design in ("design-0.png", "design-1.png"):
+            with Image.open(f"{first_root}/product-0/{design}") as first_image:
+                with Image.open(f"{second_root}/product-0/{design}") as second_image:
+                    assert first_image.size == (64, 80)
+                    assert np.array_equal(
+                        np.asarray(first_image), np.asarray(second_image)
+                    )
@@ -0,0 +1,60 @@
+"""Module for TestCompositor class declaration."""
+import numpy as np
+from PIL import Image
+
+from picgenius.compositing import Compositor
+
+
+class TestCompositor:
+    """Test Compositor"""
+
+    def setup_method(self):
+        """Set up an opaque image and an image with random alpha."""
+        rng = np.random.default_rng(0)
+        self.opaque_image = Image.fromarray(
+            rng.integers(0, 256, (60, 80, 3), dtype=np.uint8)
+        )
+        self.alpha_image = Image.fromarray(
+            rng.integers(0, 256, (60, 80, 4), dtype=np.uint8)
+        )
+        self.colors = [(10, 20, 30, 100), (255, 0, 0, 1), (0, 0, 0, 255), (1, 2, 3, 0)]
+
+    def test_overlay_matches_alpha_composite(self):
+        """Test that the tint is the Pillow alpha_composite of the color."""
+        for image in (self.opaque_image, self.alpha_image):
+            for color in self.colors:
+                expected = Image.alpha_composite(
+                    image.convert("RGBA"), Image.new("RGBA", image.size, color)
+                )
+                composited = Compositor.composite(image, overlay=color)
+                assert composited.mode == "RGBA"
+                assert np.array_equal(np.asarray(composited), np.asarray(expected))
+
+    def test_transparency_scales_alpha(self):
+        """Test that the transparency scales the alpha, keeping the colors."""
+        composited = Compositor.composite(self.opaque_image, transparency=0.5)
+        pixels = np.asarray(composited)
+        assert (pixels[..., 3] == 127).all()
+        assert np.array_equal(pixels[..., :3], np.asarray(self.opaque_image))
+
+        composited = Compositor.composite(self.alpha_image, transparency=0.5)
+        alpha = np.asarray(self.alpha_image)[..., 3].astype(np.uint32)
+        assert np.array_equal(np.asarray(composited)[..., 3], alpha * 127 // 255)
+
+    def test_overlay_and_transparency(self):
+        """Test the tint then the transparency in a single composite."""
+        color = self.colors[0]
+        for image in (self.opaque_image, self.alpha_image):
+            expected = np.array(
+                Image.alpha_composite(
+                    image.convert("RGBA"), Image.new("RGBA", image.size, color)
+                )
+            )
+            expected[..., 3] = expected[..., 3].astype(np.uint32) * 204 // 255
+            composited = Compositor.composite(image, color, 0.8)
+            assert np.array_equal(np.asarray(composited), expected)
+
+    def test_nothing_to_composite(self):
+        """Test that the image is returned as is without overlay nor transparency."""
+        assert Compositor.composite(self.opaque_image) is self.opaque_image
+        assert Compositor.composite(self.opaque_image, None, 1.0) is self.opaque_image
@@ -1,4 +1,8 @@
 """Module for TestConfigLoader class declaration."""
+import os
+
+import yaml
+
 from picgenius.models import ProductType
 from picgenius.config import ConfigLoader
 
@@ -12,13 +16,40 @@ class TestConfigLoader:
         """Setup test data."""
         self.config_path = "./tests/picgenius.yml"
 
-    def test_load_config(self):
+    def test_load_config(self, tmp_path):
         """Test generate_video"""
 
-        config_loader = ConfigLoader(self.config_path)
+        config_loader = ConfigLoader(self.config_path, str(tmp_path / "cache"))
         product_types = config_loader.load()
 
         assert "formats" in config_loader.global_config
         assert "watermarks" in config_loader.global_config
         assert len(config_loader.product_types.items()) == 2
         assert isinstance(product_types["1-design"], ProductType)
+
+    def test_load_compiled_config(self, tmp_path, monkeypatch):
+        """Test that the compiled config is loaded without parsing the YAML."""
+        cache_dir = str(tmp_path / "cache")
+        product_types = ConfigLoader(self.config_path, cache_dir).load()
+        assert len(os.listdir(cache_dir)) == 1
+
+        def fail_yaml_load(*args, **kwargs):
+            raise AssertionError("The YAML config shouldn't be parsed.")
+
+        monkeypatch.setattr(yaml, "load", fail_yaml_load)
+        config_loader = ConfigLoader(self.config_path, cache_dir)
+        cached_product_types = config_loader.load()
+
+        assert "watermarks" in config_loader.global_config
+        assert list(cached_product_types) == list(product_types)
+        assert cached_product_types["1-design"] == product_types["1-design"]
+
+    def test_product_types_are_lazy(self, tmp_path):
+        """Test that product types are only instanciated when requested."""
+        cache_dir = str(tmp_path / "cache")
+        ConfigLoader(self.config_path, cache_dir).load()
+
+        product_types = ConfigLoader(self.config_path, cache_dir).load()
+        assert not product_types._product_types
+        assert isinstance(product_types.get("1-design"), ProductType)
+        assert list(product_types._product_types) == ["1-design"]
@@ -0,0 +1,66 @@
+"""Module for TestController class declaration."""
+import os
+
+from picgenius.controller import Controller
+from picgenius.discovery import DirectoryIndex
+from picgenius.models import ProductType
+
+
+class TestController:
+    """Test Controller"""
+
+    product_type: ProductType
+
+    def setup_method(self):
+        """Setup test data."""
+        self.product_type = ProductType(designs_count=2, templates=[], formats=[])
+
+    def _create_tree(self, root):
+        for product in ("product-1", "product-2", "product-3"):
+            os.makedirs(root / product)
+            for index in range(2):
+                (root / product / f"design-{index}.png").write_bytes(b"png")
+
+    def test_products_are_discovered_lazily(self, tmp_path):
+        """Test that no directory is scanned before the products are iterated."""
+        self._create_tree(tmp_path)
+        index = DirectoryIndex()
+        controller = Controller(str(tmp_path), self.product_type, index)
+        assert not index.records
+
+        products = controller.iter_products()
+        first_product = next(products)
+        assert len(first_product.designs) == 2
+        assert len(index.records) < 4
+        assert len(list(products)) == 2
+
+    def test_mismatched_product_is_skipped(self, tmp_path, monkeypatch):
+        """Test that a folder whose designs count changed is skipped."""
+        self._create_tree(tmp_path)
+        index = DirectoryIndex()
+        get_image_paths = index.get_image_paths
+
+        def get_changed_image_paths(path):
+            image_paths = get_image_paths(path)
+            if path.endswith("product-2"):
+                return image_paths[:1]
+            return image_paths
+
+        monkeypatch.setattr(index, "get_image_paths", get_changed_image_paths)
+        controller = Controller(str(tmp_path), self.product_type, index)
+
+        product_names = sorted(product.name for product in controller.iter_products())
+        assert product_names == ["product-1", "product-3"]
+
+    def test_products_are_listed(self, tmp_path):
+        """Test that products are all discovered at once."""
+        self._create_tree(tmp_path)
+        controller = Controller(str(tmp_path), self.product_type, DirectoryIndex())
+
+        products = controller.products
+        assert isinstance(products, list)
+        assert sorted(product.name for product in products) == [
+            "product-1",
+            "product-2",
+            "product-3",
+        ]
@@ -0,0 +1,106 @@
+"""Module for TestDirectoryIndex class declaration."""
+import os
+
+from picgenius import utils
+from picgenius.discovery import DirectoryIndex
+
+
+class TestDirectoryIndex:
+    """Test DirectoryIndex"""
+
+    scans: list[str]
+
+    def setup_method(self):
+        """Setup test data."""
+        self.scans = []
+
+    def _create_tree(self, root):
+        for product, count in (("product-1", 2), ("product-2", 2), ("product-3", 1)):
+            os.makedirs(root / product)
+            for index in range(count):
+                (root / product / f"design-{index}.png").write_bytes(b"png")
+            (root / product / "notes.txt").write_text("not a design")
+
+    def _count_scans(self, monkeypatch):
+        scan_directory = utils.scan_directory
+
+        def counting_scan_directory(path):
+            self.scans.append(path)
+            return scan_directory(path)
+
+        monkeypatch.setattr(utils, "scan_directory", counting_scan_directory)
+
+    def test_find_product_paths(self, tmp_path):
+        """Test that only directories with the designs count are found."""
+        self._create_tree(tmp_path)
+        index = DirectoryIndex()
+
+        product_paths = index.find_product_paths(2, str(tmp_path))
+        assert sorted(product_paths) == [
+            str(tmp_path / "product-1"),
+            str(tmp_path / "product-2"),
+        ]
+        assert index.find_product_paths(1, str(tmp_path / "product-3")) == [
+            str(tmp_path / "product-3" / "design-0.png")
+        ]
+        assert sorted(index.get_image_paths(str(tmp_path / "product-1"))) == [
+            str(tmp_path / "product-1" / "design-0.png"),
+            str(tmp_path / "product-1" / "design-1.png"),
+        ]
+
+    def test_mismatched_directories_are_logged(self, tmp_path, capsys):
+        """Test that directories with another designs count are logged once."""
+        self._create_tree(tmp_path)
+        os.makedirs(tmp_path / "outputs")
+        index = DirectoryIndex()
+
+        assert len(index.find_product_paths(2, str(tmp_path))) == 2
+        output = capsys.readouterr().out
+        assert "product-3) Skipped: 1 designs found, 2 expected" in output
+        assert "outputs" not in output
+
+        assert len(index.find_product_paths(2, str(tmp_path))) == 2
+        assert "Skipped" not in capsys.readouterr().out
+
+    def test_incremental_update(self, tmp_path, monkeypatch):
+        """Test that a saved index only lists again the modified directories."""
+        self._create_tree(tmp_path / "designs")
+        index_path = str(tmp_path / "index.json")
+        design_path = str(tmp_path / "designs")
+
+        index = DirectoryIndex(index_path)
+        index.find_product_paths(2, design_path)
+        index.save(root=design_path)
+
+        # Make every record old enough to be trusted
+        for path in index.records:
+            os.utime(path, ns=(10**9, 10**9))
+        index = DirectoryIndex(index_path)
+        index.find_product_paths(2, design_path)
+        index.save(root=design_path)
+
+        self._count_scans(monkeypatch)
+        index = DirectoryIndex(index_path)
+        index.RACY_DELAY_NS = 0
+        (tmp_path / "designs" / "product-3" / "design-1.png").write_bytes(b"png")
+
+        product_paths = index.find_product_paths(2, design_path)
+        assert self.scans == [os.path.join(design_path, "product-3")]
+        assert len(product_paths) == 3
+
+    def test_prune_removed_directories(self, tmp_path):
+        """Test that directories removed from the tree are forgotten on save."""
+        self._create_tree(tmp_path / "designs")
+        design_path = str(tmp_path / "designs")
+        index = DirectoryIndex(str(tmp_path / "index.json"))
+        index.find_product_paths(2, design_path)
+        index.save(root=design_path)
+
+        for filename in os.listdir(tmp_path / "designs" / "product-3"):
+            os.remove(tmp_path / "designs" / "product-3" / filename)
+        os.rmdir(tmp_path / "designs" / "product-3")
+
+        index = DirectoryIndex(str(tmp_path / "index.json"))
+        index.find_product_paths(2, design_path)
+        index.save(root=design_path)
+        assert os.path.join(design_path, "product-3") not in index.records
@@ -0,0 +1,90 @@
+"""Module for TestCostEstimator class declaration."""
+import os
+
+import pytest
+from PIL import Image
+
+from picgenius.controller import Controller
+from picgenius.estimator import CostEstimator
+from picgenius.ledger import JobLedger
+from picgenius.models import (
+    Format,
+    ProductType,
+    Template,
+    TemplateElement,
+    VideoSettings,
+)
+
+
+class TestCostEstimator:
+    """Test CostEstimator"""
+
+    product_type: ProductType
+
+    def setup_method(self):
+        """Setup test data."""
+        template = Template(
+            elements=[
+                TemplateElement(position=(0, 0), size=(50, 50)),
+                TemplateElement(position=(100, 0), size=(50, 50)),
+            ],
+            size=(200, 200),
+            filename="template.png",
+        )
+        self.product_type = ProductType(
+            designs_count=2,
+            templates=[template],
+            formats=[Format(ppi=10, inches=(8, 10))],
+            video_settings=VideoSettings(
+                movement="zoom_in", frames=10, step=2, format=(100, 100)
+            ),
+        )
+
+    def _create_tree(self, root):
+        for product in ("product-1", "product-2"):
+            os.makedirs(root / product)
+            for index in range(2):
+                Image.new("RGB", (100, 50)).save(root / product / f"{index}.png")
+
+    def test_execution_plan(self, tmp_path):
+        """Test the outputs, megapixels and memory estimated from the headers."""
+        self._create_tree(tmp_path / "designs")
+        controller = Controller(str(tmp_path / "designs"), self.product_type)
+
+        plan = controller.estimate_plan(str(tmp_path / "products"), max_threads=4)
+
+        assert plan.products == 2
+        formats = plan.stages["formats"]
+        assert formats.outputs == 4
+        assert formats.megapixels == pytest.approx(0.032)
+        assert formats.peak_memory == 100 * 50 * 3 + 80 * 100 * 3
+        templates = plan.stages["templates"]
+        assert templates.outputs == 2
+        assert templates.megapixels == pytest.approx(0.25)
+        assert templates.peak_memory == 200 * 200 * 4 + 2 * (100 * 50 * 3 + 50 * 50 * 4)
+        video = plan.stages["video"]
+        assert video.outputs == 2
+        assert video.peak_memory == 100 * 50 * 3 + 5 * 100 * 100 * 4 * 2
+        assert plan.peak_memory == video.peak_memory * 2
+        assert templates.seconds == pytest.approx(0.25 / 25.0)
+        assert "default throughput" in plan.format()
+
+    def test_historical_durations(self, tmp_path):
+        """Test that the durations recorded by the ledgers are preferred."""
+        self._create_tree(tmp_path / "designs")
+        with JobLedger(str(tmp_path / "products"), name="1/2") as ledger:
+            ledger.mark_done("designs/product-1", "formats", 2.0)
+        with JobLedger(str(tmp_path / "products"), name="2/2") as ledger:
+            ledger.mark_done("designs/product-2", "formats", 4.0)
+            ledger.mark_failed("designs/product-2", "video", 1.0, "error")
+
+        controller = Controller(str(tmp_path / "designs"), self.product_type)
+        plan = controller.estimate_plan(
+            str(tmp_path / "products"), assets=("formats", "video"), max_threads=2
+        )
+
+        assert plan.stages["formats"].timed_tasks == 2
+        assert plan.stages["formats"].seconds == pytest.approx(6.0)
+        assert plan.stages["video"].timed_tasks == 0
+        assert plan.wall_time == pytest.approx((6.0 + plan.stages["video"].seconds) / 2)
+        assert "templates" not in plan.stages
@@ -0,0 +1,72 @@
+"""Module for TestImageSource class declaration."""
+import os
+import threading
+
+from PIL import Image
+
+from picgenius import utils
+from picgenius.image_source import HandlePool, ImageSource
+
+
+class TestImageSource:
+    """Test ImageSource"""
+
+    def _create_images(self, directory, count: int):
+        for index in range(count):
+            Image.new("RGB", (16, 8), (index, 0, 0)).save(directory / f"{index}.png")
+
+    @staticmethod
+    def _count_open_files(directory) -> int:
+        count = 0
+        for fd_name in os.listdir("/proc/self/fd"):
+            try:
+                target = os.readlink(os.path.join("/proc/self/fd", fd_name))
+            except OSError:
+                continue
+            count += target.startswith(str(directory))
+        return count
+
+    def test_metadata_without_decoding(self, tmp_path):
+        """Test that the metadata are read from the header."""
+        self._create_images(tmp_path, 1)
+        image_source = ImageSource(str(tmp_path / "0.png"))
+
+        assert image_source.name == "0"
+        assert image_source.size == (16, 8)
+        assert image_source.mode == "RGB"
+        assert image_source.format == "PNG"
+
+    def test_load_closes_file(self, tmp_path):
+        """Test that loaded images don't keep their file open."""
+        self._create_images(tmp_path, 50)
+
+        images = [
+            image_source.load() for image_source, _ in utils.load_images(str(tmp_path))
+        ]
+        assert len(images) == 50
+        assert self._count_open_files(tmp_path) == 0
+        assert sorted(image.getpixel((0, 0))[0] for image in images) == list(range(50))
+
+    def test_handle_pool_is_bounded(self, tmp_path, monkeypatch):
+        """Test that no more files than the pool size are open at once."""
+        self._create_images(tmp_path, 20)
+        monkeypatch.setattr(ImageSource, "handle_pool", HandlePool(2))
+        open_image = Image.open
+        max_open_files = []
+
+        def counting_open(*args, **kwargs):
+            max_open_files.append(self._count_open_files(tmp_path))
+            return open_image(*args, **kwargs)
+
+        monkeypatch.setattr(Image, "open", counting_open)
+        threads = [
+            threading.Thread(target=image_source.load)
+            for image_source, _ in utils.load_images(str(tmp_path))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(max_open_files) == 20
+        assert max(max_open_files) < 2
@@ -0,0 +1,58 @@
+"""Module for TestImportTime class declaration."""
+import os
+import subprocess
+import sys
+import time
+
+
+class TestImportTime:
+    """Test that lightweight commands don't import the heavy dependencies."""
+
+    HEAVY_MODULES = ["torch", "moviepy", "RealESRGAN"]
+    VERSION_BUDGET = 1.5
+
+    env: dict[str, str]
+
+    def setup_method(self):
+        """Setup test data."""
+        self.env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+
+    def _get_heavy_modules(self, code: str) -> str:
+        code += (
+            "; import sys; "
+            f"print(','.join(m for m in {self.HEAVY_MODULES!r} if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            env=self.env,
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        return result.stdout.strip()
+
+    def test_cli_import_is_light(self):
+        """Test that importing the CLI doesn't import torch, RealESRGAN or moviepy."""
+        assert self._get_heavy_modules("import picgenius.cli") == ""
+
+    def test_upscale_cache_key_is_light(self):
+        """Test that identifying the upscale weights doesn't import torch."""
+        code = "from picgenius import processing; " "processing.get_weights_identity(4)"
+        assert self._get_heavy_modules(code) == ""
+
+    def test_version_budget(self):
+        """Test that the version command starts within its budget."""
+        durations = []
+        for _ in range(3):
+            start = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, "-m", "picgenius", "version"],
+                env=self.env,
+                capture_output=True,
+                check=True,
+                text=True,
+            )
+            durations.append(time.perf_counter() - start)
+
+        assert "Picgenius version" in result.stdout
+        assert min(durations) < self.VERSION_BUDGET
@@ -0,0 +1,62 @@
+"""Module for TestJobLedger class declaration."""
+import sqlite3
+
+from picgenius.ledger import JobLedger
+
+
+class TestJobLedger:
+    """Test JobLedger"""
+
+    @staticmethod
+    def _read_tasks(ledger: JobLedger) -> dict[tuple[str, str], str]:
+        with sqlite3.connect(ledger.path) as connection:
+            rows = connection.execute("SELECT product, asset, status FROM tasks")
+            return {(product, asset): status for product, asset, status in rows}
+
+    def test_resume_skips_done_tasks(self, tmp_path):
+        """Test that only unfinished or failed tasks are queued again on resume."""
+        with JobLedger(str(tmp_path)) as ledger:
+            ledger.mark_pending("p1", "formats")
+            ledger.mark_pending("p1", "video")
+            ledger.mark_pending("p2", "formats")
+            ledger.mark_done("p1", "formats", 1.0)
+            ledger.mark_failed("p1", "video", 0.5, "OSError()")
+            ledger.mark_running("p2", "formats")
+
+        with JobLedger(str(tmp_path), resume=True) as ledger:
+            assert ledger.is_done("p1", "formats")
+            assert not ledger.is_done("p1", "video")
+            assert not ledger.is_done("p2", "formats")
+            assert ledger.count_by_status() == {"done": 1, "failed": 1, "running": 1}
+
+        with JobLedger(str(tmp_path)) as ledger:
+            assert not ledger.is_done("p1", "formats")
+            assert not ledger.count_by_status()
+
+    def test_writes_are_batched(self, tmp_path, monkeypatch):
+        """Test that records are written once the batch is full."""
+        monkeypatch.setattr(JobLedger, "BATCH_SIZE", 3)
+        monkeypatch.setattr(JobLedger, "FLUSH_INTERVAL", 3600.0)
+        ledger = JobLedger(str(tmp_path))
+
+        ledger.mark_pending("p1", "formats")
+        ledger.mark_running("p1", "formats")
+        assert not self._read_tasks(ledger)
+
+        ledger.mark_done("p1", "formats", 1.0)
+        assert self._read_tasks(ledger) == {("p1", "formats"): "done"}
+
+        ledger.mark_pending("p2", "formats")
+        ledger.close()
+        assert self._read_tasks(ledger)[("p2", "formats")] == "pending"
+
+    def test_durations_with_special_characters(self, tmp_path):
+        """Test that the ledgers of a directory named like a URI or glob are read."""
+        output_dir = str(tmp_path / "out [1] ?#%20")
+        with JobLedger(output_dir) as ledger:
+            ledger.mark_done("p1", "formats", 1.0)
+        with JobLedger(output_dir, name="2/2") as ledger:
+            ledger.mark_done("p2", "formats", 3.0)
+
+        durations = JobLedger.get_durations(output_dir)
+        assert sorted(durations["formats"]) == [1.0, 3.0]
@@ -0,0 +1,137 @@
+"""Module for TestBuildManifest class declaration."""
+import os
+import threading
+
+import pytest
+
+from picgenius.manifest import BuildManifest
+from picgenius.models import Format
+
+
+class TestBuildManifest:
+    """Test BuildManifest"""
+
+    design_format: Format
+
+    def setup_method(self):
+        """Setup test data."""
+        self.design_format = Format(ppi=300, inches=(8, 10))
+
+    def _build(self, manifest: BuildManifest, design_path: str, output_path: str):
+        fingerprint = manifest.fingerprint(self.design_format, files=[design_path])
+        if manifest.is_up_to_date(output_path, fingerprint):
+            return False
+        with open(output_path, "w", encoding="utf-8") as output_file:
+            output_file.write("output")
+        manifest.record(output_path, fingerprint)
+        return True
+
+    def test_unchanged_inputs_are_skipped(self, tmp_path):
+        """Test that an output is rebuilt only when its inputs change."""
+        design_path = tmp_path / "design.png"
+        design_path.write_bytes(b"design")
+        output_dir = tmp_path / "output"
+        output_path = str(output_dir / "design-8-10.jpg")
+        os.makedirs(output_dir)
+
+        manifest = BuildManifest(str(output_dir))
+        assert self._build(manifest, str(design_path), output_path)
+        manifest.save()
+
+        manifest = BuildManifest(str(output_dir))
+        assert not self._build(manifest, str(design_path), output_path)
+
+        os.utime(design_path, ns=(10**9, 10**9))
+        assert not self._build(manifest, str(design_path), output_path)
+
+        design_path.write_bytes(b"new design")
+        assert self._build(manifest, str(design_path), output_path)
+
+        self.design_format.ppi = 150
+        assert self._build(manifest, str(design_path), output_path)
+
+    def test_force_and_missing_outputs(self, tmp_path):
+        """Test that forced or deleted outputs are rebuilt."""
+        design_path = tmp_path / "design.png"
+        design_path.write_bytes(b"design")
+        output_path = str(tmp_path / "design-8-10.jpg")
+
+        manifest = BuildManifest(str(tmp_path))
+        assert self._build(manifest, str(design_path), output_path)
+        assert not self._build(manifest, str(design_path), output_path)
+
+        os.remove(output_path)
+        assert self._build(manifest, str(design_path), output_path)
+
+        manifest.force = True
+        assert self._build(manifest, str(design_path), output_path)
+
+    def test_concurrent_saves_are_merged(self, tmp_path):
+        """Test that manifests saved concurrently keep each other's outputs."""
+        manifests = [BuildManifest(str(tmp_path)) for _ in range(8)]
+
+        def save(index: int, manifest: BuildManifest):
+            for output in range(10):
+                manifest.record(str(tmp_path / f"{index}-{output}.jpg"), "fingerprint")
+                manifest.save()
+
+        threads = [
+            threading.Thread(target=save, args=(index, manifest))
+            for index, manifest in enumerate(manifests)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(BuildManifest(str(tmp_path)).outputs) == 80
+        assert not os.path.exists(manifests[0].lock_path)
+
+    def test_locked_manifest_waits(self, tmp_path, monkeypatch):
+        """Test that saving waits for a held lock, and breaks a stale one."""
+        monkeypatch.setattr(BuildManifest, "LOCK_TIMEOUT", 0.2)
+        manifest = BuildManifest(str(tmp_path))
+        manifest.record(str(tmp_path / "design-8-10.jpg"), "fingerprint")
+        with open(manifest.lock_path, "w", encoding="utf-8") as lock_file:
+            lock_file.write("other:1\n")
+
+        with pytest.raises(TimeoutError):
+            manifest.save()
+        assert not BuildManifest(str(tmp_path)).outputs
+
+        os.utime(manifest.lock_path, (10**9, 10**9))
+        manifest.save()
+        assert BuildManifest(str(tmp_path)).outputs == {
+            "design-8-10.jpg": "fingerprint"
+        }
+        assert not os.path.exists(manifest.lock_path)
+
+    def test_racing_stale_lock_breakers(self, tmp_path):
+        """Test that breaking a stale lock never removes a newer lock."""
+        # pylint: disable=protected-access
+        manifest_b = BuildManifest(str(tmp_path))
+        manifest_c = BuildManifest(str(tmp_path))
+        with open(manifest_b.lock_path, "w", encoding="utf-8") as lock_file:
+            lock_file.write("crashed:1")
+        os.utime(manifest_b.lock_path, (10**9, 10**9))
+
+        # C read the stale lock, then B broke it and locked first
+        stale_token = BuildManifest._read_lock_token(manifest_c.lock_path)
+        lock_b = manifest_b._acquire_file_lock()
+        lock_b.__enter__()
+        token_b = BuildManifest._read_lock_token(manifest_b.lock_path)
+        assert token_b != stale_token
+
+        assert not manifest_c._remove_lock(stale_token)
+        assert BuildManifest._read_lock_token(manifest_b.lock_path) == token_b
+
+        # B held its lock until stale, C broke it and locked
+        os.utime(manifest_b.lock_path, (10**9, 10**9))
+        lock_c = manifest_c._acquire_file_lock()
+        lock_c.__enter__()
+        token_c = BuildManifest._read_lock_token(manifest_c.lock_path)
+
+        lock_b.__exit__(None, None, None)
+        assert BuildManifest._read_lock_token(manifest_c.lock_path) == token_c
+        lock_c.__exit__(None, None, None)
+        assert os.listdir(tmp_path) == []
@@ -0,0 +1,56 @@
+"""Module for TestMemoryProfiler class declaration."""
+import json
+
+from picgenius.memory import MemoryProfiler
+from picgenius.tracing import Tracer
+
+
+class TestMemoryProfiler:
+    """Test MemoryProfiler"""
+
+    SIZE = 64 * 1024**2
+
+    def teardown_method(self):
+        """Stop the profiler started by a test."""
+        Tracer.stop()
+
+    def test_growth_is_attributed_to_stage(self):
+        """Test that the memory allocated in a span is attributed to its key."""
+        profiler = Tracer.start(MemoryProfiler(interval=0.01))
+        with Tracer.span("templates", product="product-1"):
+            with Tracer.span("template", template="bedroom"):
+                data = b"x" * self.SIZE
+            with Tracer.span("template", template="desktop"):
+                pass
+        del data
+        Tracer.stop()
+
+        report = profiler.get_report()
+        assert (report[0].product, report[0].stage, report[0].detail) in [
+            ("product-1", "template", "bedroom"),
+            ("product-1", "templates", ""),
+        ]
+        bedroom = profiler.stages[("product-1", "template", "bedroom")]
+        desktop = profiler.stages[("product-1", "template", "desktop")]
+        assert bedroom.count == 1
+        assert bedroom.rss_growth >= self.SIZE * 0.9
+        assert desktop.rss_growth < self.SIZE / 2
+        assert bedroom.peak_traced is None
+        assert any(event["ph"] == "C" for event in profiler.events)
+
+    def test_tracemalloc_report(self, tmp_path):
+        """Test the Python allocations traced with tracemalloc, saved as JSON."""
+        profiler = Tracer.start(MemoryProfiler(use_tracemalloc=True))
+        with Tracer.span("encode", product="product-1", filename="design-8-10.jpg"):
+            data = bytearray(self.SIZE // 4)
+        del data
+        Tracer.stop()
+        profiler.save_report(str(tmp_path / "memory.json"))
+
+        with open(tmp_path / "memory.json", encoding="utf-8") as report_file:
+            report = json.load(report_file)
+        assert report["tracemalloc"] is True
+        stage = report["stages"][0]
+        assert stage["detail"] == "design-8-10.jpg"
+        assert stage["traced_growth"] >= self.SIZE // 4
+        assert "design-8-10.jpg" in profiler.format_report()
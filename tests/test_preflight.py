@@ -0,0 +1,103 @@
+"""Module for TestPreflight class declaration."""
+import pytest
+from PIL import Image
+
+from picgenius.models import (
+    Format,
+    ProductType,
+    Template,
+    TemplateElement,
+    TemplateImageElement,
+    Watermark,
+)
+from picgenius.preflight import Preflight, PreflightError
+from picgenius.renderers import TemplateRenderer
+
+
+class TestPreflight:
+    """Test Preflight"""
+
+    def _create_product_type(self, tmp_path, **template_kwargs) -> ProductType:
+        template_path = tmp_path / "template.png"
+        Image.new("RGB", (100, 50)).save(template_path)
+        template_kwargs.setdefault(
+            "elements", [TemplateElement(position=(10, 10), size=(20, 20))]
+        )
+        template = Template(path=str(template_path), **template_kwargs)
+        return ProductType(1, [template], [Format(300, (8, 10))])
+
+    def test_valid_product_type(self, tmp_path):
+        """Test that a product type with valid assets passes."""
+        preflight = Preflight()
+        preflight.check(self._create_product_type(tmp_path))
+
+        source = preflight.sources[str(tmp_path / "template.png")]
+        assert source.size == (100, 50)
+        assert source.mode == "RGB"
+
+    def test_sources_are_reused_by_renderer(self, tmp_path, monkeypatch):
+        """Test that the render stage reuses the sources probed by the preflight."""
+        monkeypatch.setattr(TemplateRenderer, "sources", {})
+        preflight = Preflight()
+        preflight.check(self._create_product_type(tmp_path))
+        TemplateRenderer.add_sources(preflight.sources.values())
+
+        template_path = str(tmp_path / "template.png")
+        source = TemplateRenderer.get_source(template_path)
+        assert source is preflight.sources[template_path]
+        assert TemplateRenderer.load_image(template_path).size == (100, 50)
+
+    def test_missing_files(self, tmp_path):
+        """Test that every missing file is reported at once."""
+        product_type = self._create_product_type(
+            tmp_path,
+            images=[TemplateImageElement(path=str(tmp_path / "logo.png"))],
+            watermarks=[Watermark(font_path=str(tmp_path / "font.otf"), text="x")],
+        )
+        product_type.templates.append(
+            Template(elements=[], path=str(tmp_path / "missing.png"))
+        )
+
+        with pytest.raises(PreflightError) as exc_info:
+            Preflight().check(product_type, "1-design")
+
+        issues = exc_info.value.issues
+        assert len(issues) == 3
+        assert issues[0].startswith("1-design: templates[0].images[0].path")
+        assert "font.otf doesn't exist" in issues[1]
+        assert "missing.png doesn't exist" in issues[2]
+
+    def test_unreadable_assets(self, tmp_path):
+        """Test that files which aren't images or fonts are reported."""
+        (tmp_path / "font.otf").write_text("not a font")
+        product_type = self._create_product_type(
+            tmp_path,
+            watermarks=[Watermark(font_path=str(tmp_path / "font.otf"), text="x")],
+        )
+        (tmp_path / "template.png").write_text("not an image")
+
+        issues = Preflight().get_issues(product_type)
+
+        assert len(issues) == 2
+        assert "isn't a readable image" in issues[0]
+        assert "isn't a readable font" in issues[1]
+
+    def test_elements_outside_template(self, tmp_path):
+        """Test that the elements positions are checked against the template size."""
+        product_type = self._create_product_type(
+            tmp_path,
+            elements=[
+                TemplateElement(position=(150, 10)),
+                TemplateElement(position=((0, 0), (100, 0), (0, 60), (100, 50))),
+            ],
+            images=[TemplateImageElement(path=str(tmp_path / "template.png"))],
+        )
+
+        issues = Preflight().get_issues(product_type)
+
+        assert issues == [
+            "templates[0].elements[0].position: (150, 10) is outside of the "
+            "100x50 bounds.",
+            "templates[0].elements[1].position: (0, 60) is outside of the "
+            "100x50 bounds.",
+        ]
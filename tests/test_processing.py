@@ -3,6 +3,7 @@ import os
 from PIL import Image
 
 from picgenius import processing as im
+from picgenius.benchmark import SyntheticAssets
 
 
 class TestProcessing:
@@ -22,3 +23,17 @@ class TestProcessing:
         assert isinstance(cropped_image, Image.Image)
         cropped_image.save(self.output_path)
         os.path.exists(self.output_path)
+
+    def test_font_cache_is_invalidated(self, tmp_path):
+        """Test that a replaced font file is read and measured again."""
+        # pylint: disable=protected-access
+        font_path = SyntheticAssets(str(tmp_path)).create_font()
+        font_size = im.find_font_size("Picgenius", font_path, 100).size
+        assert im.find_font_size("Picgenius", font_path, 100).size == font_size
+        misses = im._find_font_size.cache_info().misses
+
+        with open(font_path, "ab") as font_file:
+            font_file.write(b"\0")
+        assert im.load_font_data(font_path).endswith(b"\0")
+        assert im.find_font_size("Picgenius", font_path, 100).size == font_size
+        assert im._find_font_size.cache_info().misses == misses + 1
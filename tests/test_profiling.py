@@ -0,0 +1,34 @@
+"""Module for TestProductProfiler class declaration."""
+import pstats
+from concurrent.futures import ThreadPoolExecutor
+
+from picgenius.profiling import ProductProfiler
+
+
+def render_in_thread():
+    """Function profiled in a worker thread."""
+    return sum(range(1000))
+
+
+class TestProductProfiler:
+    """Test ProductProfiler"""
+
+    def test_profile_merges_threads(self, tmp_path):
+        """Test that the functions run by worker threads are in the product profile."""
+        profiler = ProductProfiler(str(tmp_path), top=5)
+        with profiler.profile("product-1"):
+            with ThreadPoolExecutor(2) as executor:
+                for future in [executor.submit(render_in_thread) for _ in range(4)]:
+                    future.result()
+
+        stats = pstats.Stats(profiler.get_path("product-1"))
+        functions = {function for _, _, function in stats.stats}
+        assert "render_in_thread" in functions
+        assert "render_in_thread" in ProductProfiler.format_summary(stats, 50)
+
+    def test_selects(self, tmp_path):
+        """Test that only the named products are selected."""
+        assert ProductProfiler(str(tmp_path)).selects("product-1")
+        profiler = ProductProfiler(str(tmp_path), ["product-2"])
+        assert not profiler.selects("product-1")
+        assert profiler.selects("product-2")
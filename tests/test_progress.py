@@ -0,0 +1,91 @@
+"""Module for TestProgressReporter class declaration."""
+import io
+import json
+import time
+
+from picgenius.progress import ProgressReporter
+
+
+class TestProgressReporter:
+    """Test ProgressReporter"""
+
+    def teardown_method(self):
+        """Stop the reporter started by a test."""
+        ProgressReporter.stop()
+
+    def record_products(self):
+        """Record two products found, the first being done."""
+        for _ in range(2):
+            ProgressReporter.record(ProgressReporter.PRODUCT_FOUND)
+            for asset in ("formats", "templates"):
+                ProgressReporter.record(ProgressReporter.QUEUED, asset)
+        ProgressReporter.record(ProgressReporter.DISCOVERY_DONE)
+        for asset in ("formats", "templates"):
+            ProgressReporter.record(ProgressReporter.STARTED, asset)
+            ProgressReporter.record(ProgressReporter.OUTPUT, 2_000_000)
+            ProgressReporter.record(ProgressReporter.DONE, asset)
+        ProgressReporter.record(ProgressReporter.PRODUCT_DONE)
+        ProgressReporter.record(ProgressReporter.STARTED, "formats")
+
+    def test_snapshot(self):
+        """Test the progress of the recorded events."""
+        reporter = ProgressReporter.start(
+            ProgressReporter("json", interval=60, stream=io.StringIO())
+        )
+        self.record_products()
+        snapshot = reporter.snapshot()
+        assert snapshot.products_done == 1
+        assert snapshot.products_total == 2
+        assert snapshot.discovery_done
+        assert snapshot.outputs == 2
+        assert snapshot.megapixels == 4.0
+        assert snapshot.outputs_per_second > 0
+        assert snapshot.queued == {"formats": 0, "templates": 1}
+        assert snapshot.running == {"formats": 1, "templates": 0}
+        assert snapshot.eta is not None
+
+    def test_json_lines(self):
+        """Test that the final progress is rendered as a JSON line on stop."""
+        stream = io.StringIO()
+        ProgressReporter.start(ProgressReporter("json", interval=60, stream=stream))
+        self.record_products()
+        ProgressReporter.stop()
+        line = json.loads(stream.getvalue().splitlines()[-1])
+        assert line["products_done"] == 1
+        assert line["queued"]["templates"] == 1
+
+    def test_bar(self):
+        """Test the progress bar, the total being unknown during discovery."""
+        stream = io.StringIO()
+        reporter = ProgressReporter("bar", interval=60, stream=stream)
+        ProgressReporter.start(reporter)
+        ProgressReporter.record(ProgressReporter.PRODUCT_FOUND)
+        bar = reporter.snapshot().format_bar(width=10)
+        assert bar.startswith("[----------] 0/1+ products")
+        assert bar.endswith("ETA --:--:--")
+
+    def test_record_without_reporter(self):
+        """Test that recording without a started reporter does nothing."""
+        ProgressReporter.record(ProgressReporter.OUTPUT, 100)
+        assert ProgressReporter.active is None
+
+    def test_rates_over_last_window(self, monkeypatch):
+        """Test that the rates only count the outputs of the last RATE_WINDOW."""
+        clock = [1000.0]
+        monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+        reporter = ProgressReporter("json", interval=10, stream=io.StringIO())
+        ProgressReporter.active = reporter
+        for _ in range(50):
+            ProgressReporter.record(ProgressReporter.OUTPUT, 1_000_000)
+
+        clock[0] += 10
+        snapshot = reporter.snapshot()
+        assert snapshot.outputs_per_second == 5.0
+        assert snapshot.megapixels_per_second == 5.0
+
+        for _ in range(2):
+            clock[0] += 10
+            snapshot = reporter.snapshot()
+            assert snapshot.outputs == 50
+            assert snapshot.outputs_per_second == 0.0
+            assert snapshot.megapixels_per_second == 0.0
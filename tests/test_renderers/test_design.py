@@ -0,0 +1,33 @@
+"""Module for TestDesignRenderer class declaration."""
+from picgenius.models import Format
+from picgenius.renderers import DesignRenderer
+
+
+class TestDesignRenderer:
+    """Test DesignRenderer"""
+
+    formats: list[Format]
+
+    def setup_method(self):
+        """Setup test data."""
+        self.formats = [
+            Format(ppi=300, inches=(8, 10)),
+            Format(ppi=300, inches=(16, 20)),
+        ]
+
+    def test_get_minimum_upscale(self):
+        """Test the minimum scale needed by the largest format."""
+        # 16x20 inches at 300 ppi needs 4800x6000 pixels
+        assert DesignRenderer.get_minimum_upscale((1600, 2000), self.formats) == 4
+        assert DesignRenderer.get_minimum_upscale((2400, 2000), self.formats) == 4
+        assert DesignRenderer.get_minimum_upscale((2400, 3000), self.formats) == 2
+        assert DesignRenderer.get_minimum_upscale((500, 600), self.formats) == 10
+
+    def test_get_minimum_upscale_large_enough(self):
+        """Test that large enough designs aren't upscaled."""
+        assert DesignRenderer.get_minimum_upscale((4800, 6000), self.formats) is None
+        assert DesignRenderer.get_minimum_upscale((100, 100), []) is None
+
+    def test_get_minimum_upscale_too_small(self):
+        """Test that the largest scale is used when none is enough."""
+        assert DesignRenderer.get_minimum_upscale((100, 100), self.formats) == 16
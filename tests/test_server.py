@@ -0,0 +1,109 @@
+"""Module for TestRenderServer class declaration."""
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+from PIL import Image
+
+from picgenius.config import ConfigLoader
+from picgenius.discovery import DirectoryIndex
+from picgenius.server import RenderServer
+
+CONFIG = """
+product_types:
+  1-design:
+    designs-count: 1
+    formats:
+      - ppi: 10
+        inches: [2, 3]
+"""
+
+
+class TestRenderServer:
+    """Test RenderServer"""
+
+    def _create_server(self, tmp_path) -> RenderServer:
+        (tmp_path / "picgenius.yml").write_text(CONFIG)
+        os.makedirs(tmp_path / "designs")
+        Image.new("RGB", (40, 60), (255, 0, 0)).save(tmp_path / "designs" / "a.png")
+        config = ConfigLoader(str(tmp_path / "picgenius.yml"), str(tmp_path / "cache"))
+        return RenderServer(config, DirectoryIndex(), token="secret")
+
+    def _post(self, url: str, body: bytes, headers: dict) -> int:
+        request = urllib.request.Request(url, body, headers, method="POST")
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status
+        except urllib.error.HTTPError as exc:
+            return exc.code
+
+    def test_job_is_rendered(self, tmp_path):
+        """Test that a submitted job renders the product assets."""
+        render_server = self._create_server(tmp_path)
+        job = render_server.submit(
+            {
+                "product_type": "1-design",
+                "design_path": str(tmp_path / "designs"),
+                "output_dir": str(tmp_path / "products"),
+                "assets": "formats",
+            }
+        )
+        render_server.close()
+
+        assert render_server.jobs[job.id].status == "done", job.error
+        assert os.path.exists(tmp_path / "products" / "a" / "formatted" / "a-2-3.jpg")
+
+    def test_invalid_jobs_are_rejected(self, tmp_path):
+        """Test that invalid jobs aren't queued."""
+        render_server = self._create_server(tmp_path)
+
+        with pytest.raises(ValueError):
+            render_server.submit({"product_type": "2-design", "design_path": "."})
+        with pytest.raises(ValueError):
+            render_server.submit(
+                {"product_type": "1-design", "design_path": ".", "assets": "gif"}
+            )
+        with pytest.raises(ValueError):
+            render_server.submit(
+                {"product_type": "1-design", "design_path": ".", "status": "done"}
+            )
+        render_server.close()
+        assert not render_server.jobs
+
+    def test_api_requires_token_and_json(self, tmp_path):
+        """Test that the API rejects requests without token or JSON content type."""
+        render_server = self._create_server(tmp_path)
+        http_server = render_server.create_http_server("127.0.0.1", 0)
+        threading.Thread(target=http_server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{http_server.server_address[1]}/jobs"
+        body = json.dumps(
+            {
+                "product_type": "1-design",
+                "design_path": str(tmp_path / "designs"),
+                "output_dir": str(tmp_path / "products"),
+                "assets": "formats",
+            }
+        ).encode("utf-8")
+
+        try:
+            json_headers = {"Content-Type": "application/json"}
+            assert self._post(url, body, json_headers) == 401
+            wrong_token = {**json_headers, "Authorization": "Bearer wrong"}
+            assert self._post(url, body, wrong_token) == 401
+            text_headers = {
+                "Content-Type": "text/plain",
+                "Authorization": "Bearer secret",
+            }
+            assert self._post(url, body, text_headers) == 415
+            assert not render_server.jobs
+
+            headers = {**json_headers, "Authorization": "Bearer secret"}
+            assert self._post(url, body, headers) == 202
+        finally:
+            http_server.shutdown()
+            http_server.server_close()
+            render_server.close()
+        assert len(render_server.jobs) == 1
@@ -0,0 +1,48 @@
+"""Module for TestSharding class declaration."""
+import pytest
+
+from picgenius.sharding import Shard, Sharding, WorkClaims
+
+
+class TestSharding:
+    """Test Sharding"""
+
+    keys: list[str]
+
+    def setup_method(self):
+        """Setup test data."""
+        self.keys = [f"designs/product-{index}" for index in range(50)]
+
+    def test_shards_partition_keys(self):
+        """Test that every key is assigned to exactly one shard."""
+        selected = []
+        for index in range(1, 4):
+            sharding = Sharding(Shard(index, 3))
+            selected.extend(sharding.select(lambda: self.keys, lambda key: key))
+
+        assert sorted(selected) == sorted(self.keys)
+        assert Shard.get_bucket("designs/product-1", 3) == Shard.get_bucket(
+            "designs/product-1", 3
+        )
+
+    def test_parse(self):
+        """Test the parsing of i/N shards."""
+        assert Shard.parse("2/5") == Shard(2, 5)
+        with pytest.raises(ValueError):
+            Shard.parse("0/5")
+        with pytest.raises(ValueError):
+            Shard.parse("two")
+
+    def test_work_stealing(self, tmp_path):
+        """Test that a node steals the keys left by the other shards."""
+        claims = WorkClaims(str(tmp_path / "claims"))
+        straggler = Sharding(Shard(2, 2), claims)
+        straggler_keys = straggler.select(lambda: self.keys, lambda key: key)
+        first_key = next(straggler_keys)
+
+        fast_node = Sharding(Shard(1, 2), claims)
+        stolen = list(fast_node.select(lambda: self.keys, lambda key: key))
+
+        assert first_key not in stolen
+        assert sorted(stolen + [first_key]) == sorted(self.keys)
+        assert not list(straggler_keys)
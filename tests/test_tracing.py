@@ -0,0 +1,74 @@
+"""Module for TestTracer class declaration."""
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from picgenius.tracing import Tracer
+
+
+class TestTracer:
+    """Test Tracer"""
+
+    def teardown_method(self):
+        """Stop the tracer started by a test."""
+        Tracer.stop()
+
+    def test_disabled_spans_are_not_recorded(self):
+        """Test that spans are no-ops while no tracer is started."""
+        assert Tracer.span("decode") is Tracer.span("resize_and_crop")
+        with Tracer.span("decode", image="design"):
+            pass
+
+        function = lambda: None  # noqa: E731
+        assert Tracer.bind(function) is function
+
+    def test_nested_spans_inherit_args(self):
+        """Test that nested spans inherit the product and template of their parent."""
+        tracer = Tracer.start()
+        with Tracer.span("templates", product="product-1"):
+            with Tracer.span("template", template="bedroom"):
+                with Tracer.span("resize_and_crop"):
+                    pass
+
+        events = {event["name"]: event for event in tracer.events}
+        assert events["resize_and_crop"]["args"] == {
+            "product": "product-1",
+            "template": "bedroom",
+        }
+        assert events["templates"]["args"] == {"product": "product-1"}
+        assert events["templates"]["dur"] >= events["template"]["dur"]
+        assert events["template"]["ts"] >= events["templates"]["ts"]
+
+    def test_bind_to_other_threads(self):
+        """Test that functions submitted to other threads keep the spans args."""
+        tracer = Tracer.start()
+
+        def encode():
+            with Tracer.span("encode"):
+                return threading.get_ident()
+
+        with Tracer.span("formats", product="product-1"):
+            with ThreadPoolExecutor(1) as executor:
+                thread_id = executor.submit(Tracer.bind(encode)).result()
+
+        encode_event = next(
+            event for event in tracer.events if event["name"] == "encode"
+        )
+        assert encode_event["tid"] == thread_id
+        assert encode_event["args"] == {"product": "product-1"}
+
+    def test_chrome_trace_export(self, tmp_path):
+        """Test that the spans are saved in the Chrome trace event format."""
+        tracer = Tracer.start()
+        with Tracer.span("video", product="product-1"):
+            pass
+        Tracer.stop()
+        tracer.save(str(tmp_path / "trace.json"))
+
+        with open(tmp_path / "trace.json", encoding="utf-8") as trace_file:
+            trace = json.load(trace_file)
+        complete_events = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+        metadata_events = [e for e in trace["traceEvents"] if e["ph"] == "M"]
+        assert [event["name"] for event in complete_events] == ["video"]
+        assert metadata_events[0]["args"]["name"] == threading.current_thread().name
+        assert set(tracer.get_stage_durations()) == {"video"}
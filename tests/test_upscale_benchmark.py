@@ -0,0 +1,40 @@
+"""Module for TestUpscaleBenchmark class declaration."""
+import numpy as np
+
+from picgenius.benchmark import UpscaleBenchmark, UpscaleBenchmarkResult
+from picgenius.upscaling import InferenceSettings
+
+
+class TestUpscaleBenchmark:
+    """Test UpscaleBenchmark"""
+
+    def test_format_results(self):
+        """Test that the results are compared to the first one."""
+        results = [
+            UpscaleBenchmarkResult(InferenceSettings(), 2.0, 2.5),
+            UpscaleBenchmarkResult(
+                InferenceSettings(precision="bf16", channels_last=True),
+                0.5,
+                0.75,
+                psnr=41.234,
+            ),
+        ]
+        lines = UpscaleBenchmark.format_results(results).split("\n")
+
+        assert lines[0] == UpscaleBenchmark.TABLE_HEADER
+        assert lines[1].split() == ["fp32", "2.000s", "2.500s", "1.00x", "ref"]
+        assert lines[2].split() == [
+            "bf16+channels_last",
+            "0.500s",
+            "0.750s",
+            "4.00x",
+            "41.2",
+            "dB",
+        ]
+        assert len({len(line) for line in lines}) == 1
+
+    def test_compute_psnr(self):
+        """Test the PSNR of identical and differing pixels."""
+        reference = np.zeros((4, 4, 3), dtype=np.float32)
+        assert UpscaleBenchmark.compute_psnr(reference, reference) == float("inf")
+        assert UpscaleBenchmark.compute_psnr(reference, reference + 255) == 0
@@ -0,0 +1,78 @@
+"""Module for TestUpscaleCache class declaration."""
+import os
+
+from PIL import Image
+
+from picgenius.upscaling import UpscaleCache
+
+
+class TestUpscaleCache:
+    """Test UpscaleCache"""
+
+    def test_build_key(self):
+        """Test that each key input changes the key."""
+        key = UpscaleCache.build_key("hash", "x4", "weights")
+        assert key == UpscaleCache.build_key("hash", "x4", "weights")
+        assert key != UpscaleCache.build_key("other", "x4", "weights")
+        assert key != UpscaleCache.build_key("hash", "x8", "weights")
+        assert key != UpscaleCache.build_key("hash", "x4", "other")
+
+    def test_store_and_fetch(self, tmp_path):
+        """Test that a stored file is copied to the destination."""
+        cache = UpscaleCache(str(tmp_path / "cache"))
+        source = tmp_path / "upscaled.jpg"
+        source.write_bytes(b"upscaled")
+        destination = tmp_path / "output.jpg"
+
+        assert not cache.fetch("abcdef", "jpg", str(destination))
+        cache.store("abcdef", "jpg", str(source))
+        assert cache.fetch("abcdef", "jpg", str(destination))
+        assert destination.read_bytes() == b"upscaled"
+
+    def test_outputs_dont_share_entries(self, tmp_path):
+        """Test that outputs and entries are independent files."""
+        cache = UpscaleCache(str(tmp_path / "cache"))
+        source = tmp_path / "upscaled.jpg"
+        source.write_bytes(b"upscaled")
+        destination = tmp_path / "output.jpg"
+
+        entry_path = cache.store("abcdef", "jpg", str(source))
+        assert cache.fetch("abcdef", "jpg", str(destination))
+        assert os.stat(entry_path).st_ino != os.stat(source).st_ino
+        assert os.stat(entry_path).st_ino != os.stat(destination).st_ino
+
+        os.utime(destination, ns=(1, 1))
+        cache.lookup("abcdef", "jpg")
+        assert os.stat(destination).st_mtime_ns == 1
+
+        with open(destination, "r+b") as output_file:
+            output_file.write(b"edited")
+        assert open(entry_path, "rb").read() == b"upscaled"
+
+    def test_store_and_load_image(self, tmp_path):
+        """Test image round trip through the cache."""
+        cache = UpscaleCache(str(tmp_path / "cache"))
+        image = Image.new("RGB", (8, 4), (255, 0, 0))
+
+        assert cache.load_image("abcdef") is None
+        cache.store_image("abcdef", image)
+        cached_image = cache.load_image("abcdef")
+        assert cached_image.size == (8, 4)
+        assert cached_image.getpixel((0, 0)) == (255, 0, 0)
+
+    def test_evict_least_recently_used(self, tmp_path):
+        """Test that the least recently used entries are evicted first."""
+        cache = UpscaleCache(str(tmp_path / "cache"), max_size=20)
+        source = tmp_path / "source"
+        source.write_bytes(b"0123456789")
+
+        cache.store("aa0001", "jpg", str(source))
+        os.utime(cache.get_entry_path("aa0001", "jpg"), ns=(1, 1))
+        cache.store("bb0002", "jpg", str(source))
+        os.utime(cache.get_entry_path("bb0002", "jpg"), ns=(2, 2))
+        assert cache.lookup("aa0001", "jpg") is not None
+
+        cache.store("cc0003", "jpg", str(source))
+        assert cache.lookup("aa0001", "jpg") is not None
+        assert cache.lookup("bb0002", "jpg") is None
+        assert cache.lookup("cc0003", "jpg") is not None
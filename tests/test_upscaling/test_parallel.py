@@ -0,0 +1,96 @@
+"""Module for TestParallelUpscaler class declaration."""
+import numpy as np
+from PIL import Image
+
+from picgenius.upscaling import parallel
+from picgenius.upscaling.parallel import ParallelUpscaler
+
+
+class _InlineExecutor:
+    """Executor mapping in the calling thread, in place of the worker processes."""
+
+    def map(self, function, iterable):
+        """Returns the function applied to every item, in order."""
+        return map(function, iterable)
+
+    def shutdown(self):
+        """Nothing to stop."""
+
+
+class TestParallelUpscaler:
+    """Test ParallelUpscaler"""
+
+    upscaled_tiles: list[np.ndarray]
+
+    def setup_method(self):
+        """Setup test data."""
+        self.upscaled_tiles = []
+
+    def _fake_upscale_tile(self, tile: np.ndarray) -> np.ndarray:
+        self.upscaled_tiles.append(tile)
+        return tile.repeat(2, axis=0).repeat(2, axis=1)
+
+    @staticmethod
+    def _create_upscaler(tile_size: int, overlap: int) -> ParallelUpscaler:
+        # Skip __init__, which loads the weights and spawns the workers
+        upscaler = ParallelUpscaler.__new__(ParallelUpscaler)
+        upscaler.scale = 2
+        upscaler.tile_size = tile_size
+        upscaler.overlap = overlap
+        upscaler._executor = _InlineExecutor()  # pylint: disable=protected-access
+        return upscaler
+
+    def test_tile_boxes_cover_image(self):
+        """Test that the tile boxes cover the image and overlap inside it."""
+        upscaler = self._create_upscaler(tile_size=32, overlap=4)
+        boxes = list(upscaler.iter_tile_boxes(70, 100))
+
+        assert len(boxes) == 12
+        covered = np.zeros((70, 100), dtype=bool)
+        for left, top, right, bottom in boxes:
+            assert 0 <= left < right <= 100
+            assert 0 <= top < bottom <= 70
+            covered[top:bottom, left:right] = True
+        assert covered.all()
+        assert boxes[0] == (0, 0, 36, 36)
+        assert boxes[1] == (28, 0, 68, 36)
+        assert boxes[-1] == (92, 60, 100, 70)
+
+    def test_predict_stitches_tiles(self, monkeypatch):
+        """Test that the stitched tiles match upscaling the whole image."""
+        monkeypatch.setattr(parallel, "_upscale_tile", self._fake_upscale_tile)
+        upscaler = self._create_upscaler(tile_size=32, overlap=4)
+        pixels = np.random.default_rng(0).integers(0, 256, (70, 100, 3), np.uint8)
+
+        upscaled = upscaler.predict(Image.fromarray(pixels))
+
+        assert upscaled.size == (200, 140)
+        assert len(self.upscaled_tiles) == 12
+        expected = pixels.repeat(2, axis=0).repeat(2, axis=1)
+        assert np.array_equal(np.asarray(upscaled), expected)
+
+    def test_seams_are_blended(self):
+        """Test that the overlap of two tiles is blended linearly."""
+        upscaler = self._create_upscaler(tile_size=8, overlap=2)
+        output = np.empty((16, 32, 3), np.uint8)
+        boxes = list(upscaler.iter_tile_boxes(8, 16))
+        assert boxes == [(0, 0, 10, 8), (6, 0, 16, 8)]
+
+        # pylint: disable=protected-access
+        upscaler._blend(output, boxes[0], np.zeros((16, 20, 3), np.uint8))
+        upscaler._blend(output, boxes[1], np.full((16, 20, 3), 200, np.uint8))
+
+        row = output[5, :, 0]
+        assert (row[:12] == 0).all()
+        ramp = np.rint(200 * (np.arange(8) + 0.5) / 8)
+        assert np.array_equal(row[12:20], ramp.astype(np.uint8))
+        assert (row[20:] == 200).all()
+        assert (output == output[:1]).all()
+
+    def test_get_ramp(self):
+        """Test the blending weights."""
+        # pylint: disable=protected-access
+        ramp = ParallelUpscaler._get_ramp(6, 4)
+        assert ramp.tolist() == [0.125, 0.375, 0.625, 0.875, 1.0, 1.0]
+        assert ParallelUpscaler._get_ramp(3, 0).tolist() == [1.0, 1.0, 1.0]
+        assert ParallelUpscaler._get_ramp(2, 4).tolist() == [0.25, 0.75]
@@ -0,0 +1,62 @@
+"""Module for TestUpscalePlan class declaration."""
+import pytest
+from PIL import Image
+
+from picgenius import processing as im
+from picgenius.upscaling import UpscalePlan
+
+
+class TestUpscalePlan:
+    """Test UpscalePlan"""
+
+    inferences: list[tuple[tuple[int, int], int]]
+
+    def setup_method(self):
+        """Setup test data."""
+        self.inferences = []
+
+    def _fake_upscale_image(self, image: Image.Image, scale: int, cpu: bool = False):
+        self.inferences.append((image.size, scale))
+        return image.resize((image.width * scale, image.height * scale))
+
+    def test_invalid_scale(self):
+        """Test that unavailable scales are rejected."""
+        with pytest.raises(ValueError):
+            UpscalePlan([3])
+
+    def test_shared_intermediates(self, monkeypatch):
+        """Test that x4, x10 and x12 share the first x4 inference."""
+        monkeypatch.setattr(im, "upscale_image", self._fake_upscale_image)
+        plan = UpscalePlan([12, 4, 10])
+        loads = []
+
+        def load_image():
+            loads.append(True)
+            return Image.new("RGB", (16, 16))
+
+        results = dict(plan.execute(load_image))
+
+        assert len(loads) == 1
+        assert results[4].size == (64, 64)
+        assert results[10].size == (160, 160)
+        assert results[12].size == (192, 192)
+        assert self.inferences.count(((16, 16), 4)) == 1
+        assert len(self.inferences) == 3
+        assert len(plan.get_nodes()) == 5
+
+    def test_lookup_skips_computed_chains(self, monkeypatch):
+        """Test that chains returned by lookup aren't computed again."""
+        monkeypatch.setattr(im, "upscale_image", self._fake_upscale_image)
+        plan = UpscalePlan([4, 10])
+        cached_x4 = Image.new("RGB", (64, 64))
+
+        def lookup(chain):
+            if UpscalePlan.get_chain_label(chain) == "x4":
+                return cached_x4
+            return None
+
+        results = dict(plan.execute(lambda: Image.new("RGB", (16, 16)), lookup=lookup))
+
+        assert results[4] is cached_x4
+        assert results[10].size == (160, 160)
+        assert self.inferences == [((40, 40), 4)]
@@ -0,0 +1,106 @@
+"""Module for TestUpscaler class declaration."""
+import numpy as np
+import pytest
+import torch
+
+from picgenius.upscaling import InferenceSettings, runtime
+from picgenius.upscaling.runtime import Upscaler
+
+
+class _DummyNetwork(torch.nn.Module):
+    """Tiny upscaling network, recording how it was called."""
+
+    def __init__(self, scale: int):
+        super().__init__()
+        self.conv = torch.nn.Conv2d(3, 3 * scale**2, 3, padding=1)
+        self.shuffle = torch.nn.PixelShuffle(scale)
+        self.calls: list[dict] = []
+
+    def forward(self, inputs: torch.Tensor) -> torch.Tensor:
+        """Upscale the inputs, recording the weights memory format and the precision."""
+        outputs = self.conv(inputs)
+        self.calls.append(
+            {
+                "channels_last": self.conv.weight.is_contiguous(
+                    memory_format=torch.channels_last
+                ),
+                "dtype": outputs.dtype,
+                "inference_mode": torch.is_inference_mode_enabled(),
+                "batch_size": inputs.shape[0],
+            }
+        )
+        return self.shuffle(outputs)
+
+
+class _DummyRealESRGAN:
+    """RealESRGAN holding a dummy network."""
+
+    def __init__(self, _device: torch.device, scale: int):
+        self.model = _DummyNetwork(scale)
+
+
+class _DummyWeightsLoader:
+    """Weights loader of the dummy network."""
+
+    def load_state_dict(self, scale: int) -> dict[str, torch.Tensor]:
+        """Returns the weights of a new dummy network."""
+        return _DummyNetwork(scale).state_dict()
+
+
+class TestUpscaler:
+    """Test Upscaler"""
+
+    patches: np.ndarray
+
+    def setup_method(self):
+        """Setup test data."""
+        self.patches = np.random.default_rng(0).integers(0, 256, (3, 8, 8, 3), np.uint8)
+
+    @staticmethod
+    def _create_upscaler(monkeypatch, settings: InferenceSettings) -> Upscaler:
+        monkeypatch.setattr(runtime, "RealESRGAN", _DummyRealESRGAN)
+        return Upscaler(2, torch.device("cpu"), settings, _DummyWeightsLoader())
+
+    def test_fp32(self, monkeypatch):
+        """Test that the default settings infer fp32 patches in inference mode."""
+        upscaler = self._create_upscaler(monkeypatch, InferenceSettings())
+        upscaled = upscaler.infer_patches(self.patches)
+
+        assert upscaled.shape == (3, 16, 16, 3)
+        assert upscaled.dtype == np.float32
+        assert upscaled.min() >= 0 and upscaled.max() <= 1
+        calls = upscaler.network.calls
+        assert calls == [
+            {
+                "channels_last": False,
+                "dtype": torch.float32,
+                "inference_mode": True,
+                "batch_size": 3,
+            }
+        ]
+
+    def test_bf16_and_channels_last(self, monkeypatch):
+        """Test that bf16 and channels_last are applied to the inference."""
+        settings = InferenceSettings(precision="bf16", channels_last=True, batch_size=2)
+        upscaler = self._create_upscaler(monkeypatch, settings)
+        upscaled = upscaler.infer_patches(self.patches)
+
+        assert upscaled.shape == (3, 16, 16, 3)
+        assert upscaled.dtype == np.float32
+        calls = upscaler.network.calls
+        assert [call["batch_size"] for call in calls] == [2, 1]
+        assert all(call["channels_last"] for call in calls)
+        assert all(call["dtype"] == torch.bfloat16 for call in calls)
+        assert all(call["inference_mode"] for call in calls)
+
+    def test_bf16_matches_fp32(self, monkeypatch):
+        """Test that bf16 stays close to fp32 with the same weights."""
+        fp32_upscaler = self._create_upscaler(monkeypatch, InferenceSettings())
+        bf16_upscaler = self._create_upscaler(
+            monkeypatch, InferenceSettings(precision="bf16")
+        )
+        bf16_upscaler.network.load_state_dict(fp32_upscaler.network.state_dict())
+
+        fp32 = fp32_upscaler.infer_patches(self.patches)
+        bf16 = bf16_upscaler.infer_patches(self.patches)
+        assert np.abs(fp32 - bf16).max() == pytest.approx(0, abs=0.05)
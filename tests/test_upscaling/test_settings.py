@@ -0,0 +1,48 @@
+"""Module for TestInferenceSettings class declaration."""
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from picgenius.upscaling import InferenceSettings
+
+
+class TestInferenceSettings:
+    """Test InferenceSettings"""
+
+    def test_defaults(self):
+        """Test that the defaults are the plain fp32 inference."""
+        settings = InferenceSettings()
+        assert settings.precision == "fp32"
+        assert not settings.channels_last
+        assert settings.intra_op_threads is None
+        assert settings.inter_op_threads is None
+        assert settings.batch_size is None
+        assert settings.flat_tile_tolerance is None
+        assert settings.flat_tile_resample == "bicubic"
+        assert settings.workers is None
+        assert settings.tile_size is None
+        assert settings.label == "fp32"
+
+    def test_unknown_precision(self):
+        """Test that an unknown precision is rejected."""
+        with pytest.raises(ValueError, match="fp16"):
+            InferenceSettings(precision="fp16")
+
+    def test_frozen_and_hashable(self):
+        """Test that settings can key the loaded models."""
+        settings = InferenceSettings(precision="bf16", channels_last=True)
+        with pytest.raises(FrozenInstanceError):
+            settings.precision = "fp32"  # type: ignore[misc]
+        assert {settings: 1}[InferenceSettings("bf16", True)] == 1
+        assert settings != InferenceSettings(channels_last=True)
+
+    def test_label(self):
+        """Test the label of every setting."""
+        settings = InferenceSettings(
+            precision="bf16",
+            channels_last=True,
+            intra_op_threads=4,
+            flat_tile_tolerance=2.5,
+            workers=3,
+        )
+        assert settings.label == "bf16+channels_last+4t+flat<=2.5+3w"
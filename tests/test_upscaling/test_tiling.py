@@ -0,0 +1,57 @@
+"""Module for TestTiledUpscaler class declaration."""
+import numpy as np
+from PIL import Image, ImageDraw
+
+from picgenius.upscaling import TiledUpscaler
+
+
+class TestTiledUpscaler:
+    """Test TiledUpscaler"""
+
+    inferred_tiles: int
+
+    def setup_method(self):
+        """Setup test data."""
+        self.inferred_tiles = 0
+
+    def _fake_infer_tiles(self, tiles: np.ndarray) -> np.ndarray:
+        self.inferred_tiles += len(tiles)
+        upscaled = tiles.repeat(2, axis=1).repeat(2, axis=2)
+        return upscaled.astype(np.float32) / 255
+
+    def _create_upscaler(self, tolerance: float) -> TiledUpscaler:
+        return TiledUpscaler(
+            self._fake_infer_tiles, 2, tile_size=32, padding=4, tolerance=tolerance
+        )
+
+    def test_flat_image_is_interpolated(self):
+        """Test that no tile of a uniform image is inferred."""
+        image = Image.new("RGB", (100, 70), (200, 30, 30))
+        upscaled, stats = self._create_upscaler(1.0).upscale(image)
+
+        assert upscaled.size == (200, 140)
+        assert stats.tiles == 12
+        assert stats.skipped == 12
+        assert self.inferred_tiles == 0
+        assert upscaled.getpixel((150, 100)) == (200, 30, 30)
+
+    def test_detailed_tiles_are_inferred(self):
+        """Test that only the tiles with details are inferred."""
+        image = Image.new("RGB", (96, 96), (255, 255, 255))
+        ImageDraw.Draw(image).rectangle((40, 40, 50, 50), fill=(0, 0, 0))
+        upscaled, stats = self._create_upscaler(1.0).upscale(image)
+
+        assert upscaled.size == (192, 192)
+        assert stats.tiles == 9
+        assert 0 < self.inferred_tiles < 9
+        assert stats.skipped == 9 - self.inferred_tiles
+        assert upscaled.getpixel((90, 90)) == (0, 0, 0)
+        assert upscaled.getpixel((10, 10)) == (255, 255, 255)
+
+    def test_negative_tolerance_infers_everything(self):
+        """Test that a negative tolerance disables interpolation."""
+        image = Image.new("RGB", (64, 64), (0, 0, 0))
+        _, stats = self._create_upscaler(-1).upscale(image)
+
+        assert stats.skipped_fraction == 0.0
+        assert self.inferred_tiles == 4
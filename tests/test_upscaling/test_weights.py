@@ -0,0 +1,32 @@
+"""Module for TestWeightsLoader class declaration."""
+import os
+
+import pytest
+import torch
+
+from picgenius.upscaling import WeightsLoader
+
+
+class TestWeightsLoader:
+    """Test WeightsLoader"""
+
+    def test_missing_weights_offline(self, tmp_path):
+        """Test that missing weights aren't downloaded by default."""
+        weights_loader = WeightsLoader(str(tmp_path))
+        assert weights_loader.get_identity(4) == "x4:missing"
+        with pytest.raises(FileNotFoundError):
+            weights_loader.load_state_dict(4)
+
+    def test_convert_once_and_mmap(self, tmp_path):
+        """Test that the checkpoint is converted once, then memory-mapped."""
+        weights_loader = WeightsLoader(str(tmp_path))
+        params = {"conv.weight": torch.ones(2, 3), "conv.bias": torch.zeros(2)}
+        torch.save({"params_ema": params}, weights_loader.get_checkpoint_path(4))
+
+        state_dict = weights_loader.load_state_dict(4)
+        assert torch.equal(state_dict["conv.weight"], params["conv.weight"])
+        assert os.path.exists(weights_loader.get_mmap_path(4))
+
+        mmap_mtime = os.stat(weights_loader.get_mmap_path(4)).st_mtime_ns
+        weights_loader.load_state_dict(4)
+        assert os.stat(weights_loader.get_mmap_path(4)).st_mtime_ns == mmap_mtime
@@ -0,0 +1,81 @@
+"""Module for TestDesignWatcher class declaration."""
+import os
+from typing import Optional
+
+from picgenius.controller import Controller
+from picgenius.discovery import DirectoryIndex
+from picgenius.models import ProductType
+from picgenius.watcher import DesignWatcher
+
+
+class TestDesignWatcher:
+    """Test DesignWatcher"""
+
+    product_type: ProductType
+
+    def setup_method(self):
+        """Setup test data."""
+        self.product_type = ProductType(designs_count=2, templates=[], formats=[])
+
+    def _create_product(self, root, name: str, mtime_ns: Optional[int] = 10**9):
+        os.makedirs(root / name)
+        for index in range(2):
+            design_path = root / name / f"design-{index}.png"
+            design_path.write_bytes(b"png")
+            if mtime_ns is not None:
+                os.utime(design_path, ns=(mtime_ns, mtime_ns))
+
+    def _create_watcher(self, root, settle: float) -> DesignWatcher:
+        controller = Controller(str(root), self.product_type, DirectoryIndex())
+        return DesignWatcher(controller, str(root / "products"), settle=settle)
+
+    def _get_ready_names(self, watcher: DesignWatcher) -> list[str]:
+        ready_names = []
+        for product_path, signature in watcher.poll():
+            watcher.rendered[product_path] = signature
+            ready_names.append(os.path.basename(product_path))
+        return sorted(ready_names)
+
+    def test_new_and_changed_products_are_ready(self, tmp_path):
+        """Test that only new or changed products are ready."""
+        self._create_product(tmp_path, "product-1")
+        watcher = self._create_watcher(tmp_path, settle=1.0)
+        watcher.set_baseline()
+        assert not self._get_ready_names(watcher)
+
+        self._create_product(tmp_path, "product-2")
+        assert self._get_ready_names(watcher) == ["product-2"]
+        assert not self._get_ready_names(watcher)
+
+        design_path = tmp_path / "product-1" / "design-0.png"
+        design_path.write_bytes(b"new png")
+        os.utime(design_path, ns=(2 * 10**9, 2 * 10**9))
+        assert self._get_ready_names(watcher) == ["product-1"]
+
+    def test_unsettled_products_are_debounced(self, tmp_path):
+        """Test that products modified within the settle delay wait."""
+        watcher = self._create_watcher(tmp_path, settle=60.0)
+        watcher.set_baseline()
+
+        self._create_product(tmp_path, "product-1", mtime_ns=None)
+        assert not self._get_ready_names(watcher)
+
+        watcher.settle = 0.0
+        assert self._get_ready_names(watcher) == ["product-1"]
+
+    def test_overwritten_designs_are_ready(self, tmp_path):
+        """Test that designs overwritten in place are noticed once settled."""
+        self._create_product(tmp_path, "product-1")
+        os.utime(tmp_path / "product-1", ns=(10**9, 10**9))
+        watcher = self._create_watcher(tmp_path, settle=1.0)
+        assert self._get_ready_names(watcher) == ["product-1"]
+        assert not self._get_ready_names(watcher)
+
+        # Overwritten in place, as cp does, the directory mtime doesn't change
+        design_path = tmp_path / "product-1" / "design-0.png"
+        with open(design_path, "wb") as design_file:
+            design_file.write(b"new png")
+        os.utime(design_path, ns=(2 * 10**9, 2 * 10**9))
+        assert os.stat(tmp_path / "product-1").st_mtime_ns == 10**9
+        assert self._get_ready_names(watcher) == ["product-1"]
+        assert not self._get_ready_names(watcher)